@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批次 OCR 命令列工具
+重新辨識資料夾中的所有圖片（例如更換 prompt 後重新處理 captured_images/），
+結果存入與 Flask 界面相同的 OCR 結果存儲，中斷（Ctrl+C）後再次執行會從上次的進度接續。
+
+用法:
+    python book_reader_batch.py captured_images --prompt "..." --workers 4
+"""
+
+import os
+import sys
+import argparse
+import threading
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='批次 OCR：重新辨識資料夾中的圖片')
+    parser.add_argument('directory', help='圖片資料夾')
+    parser.add_argument('--config', default='config.ini', help='設定檔（預設：config.ini）')
+    parser.add_argument('--prompt', default=None, help='OCR prompt（預設使用設定檔的 prompt）')
+    parser.add_argument('--workers', type=int, default=None, help='同時處理的圖片數量（預設使用 [BATCH] workers）')
+    parser.add_argument('--recursive', action='store_true', help='包含子資料夾')
+    parser.add_argument('--manifest', default=None, help='進度紀錄檔（預設為資料夾中的 [BATCH] manifest_name）')
+    parser.add_argument('--no-resume', action='store_true', help='忽略先前的進度，全部重新處理')
+    parser.add_argument('--no-store', action='store_true', help='不存入 OCR 結果存儲（只寫進度紀錄）')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if not os.path.isdir(args.directory):
+        print(f"錯誤: 找不到資料夾 {args.directory}")
+        return 2
+
+    import book_reader_flask
+    from ocr_batch import iter_directory
+
+    # 匯入時已以 config.ini 建立 reader；指定其他設定檔時另外建立
+    if os.path.abspath(args.config) == os.path.abspath('config.ini'):
+        reader = book_reader_flask.reader
+    else:
+        reader = book_reader_flask.BookReaderFlask(args.config)
+
+    manifest_path = args.manifest or os.path.join(args.directory, reader.batch_manifest_name)
+
+    total = sum(1 for _ in iter_directory(args.directory, args.recursive))
+
+    def on_page(record, stats):
+        done = stats['done'] + stats['resumed']
+        print(f"[{done}/{total}] {record['source']}: {record['status']}"
+              f"{'（' + record['error'] + '）' if record.get('error') else ''}，{record['ms']:.0f} ms，"
+              f"{stats['pages_per_minute']} 頁/分鐘", flush=True)
+
+    runner = reader.create_batch_runner(
+        iter_directory(args.directory, args.recursive),
+        prompt=args.prompt,
+        workers=args.workers,
+        manifest_path=manifest_path,
+        store_results=not args.no_store,
+        total=total,
+        on_page=on_page,
+        resume=not args.no_resume
+    )
+    print(f"批次 OCR: {total} 張圖片，{runner.workers} 個工作執行緒，進度紀錄 {manifest_path}")
+
+    # 以 Event 等待：Thread.join() 被 KeyboardInterrupt 中斷後會誤判執行緒已結束
+    finished = threading.Event()
+
+    def run():
+        try:
+            runner.run()
+        finally:
+            finished.set()
+
+    threading.Thread(target=run, name='ocr-batch', daemon=True).start()
+    try:
+        while not finished.wait(timeout=0.5):
+            pass
+    except KeyboardInterrupt:
+        print("\n中斷：等待處理中的圖片完成後停止（再次執行即可接續）", flush=True)
+        runner.cancel()
+        finished.wait()
+
+    stats = runner.stats()
+    print(f"\n{stats['status']}: 完成 {stats['completed']}、略過 {stats['skipped']}、錯誤 {stats['errors']}、"
+          f"先前已完成 {stats['resumed']}，耗時 {stats['elapsed_s']} 秒，{stats['pages_per_minute']} 頁/分鐘")
+    return 1 if stats['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,628 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+閱讀機器人基準測試
+不需要 USB 相機與 DeepSeek-OCR 伺服器：以模擬相機（fake_camera.py）取代 cv2.VideoCapture，
+以模擬 OCR 伺服器（mock_ocr_server.py）回應 /ocr，在暫存目錄以獨立的設定啟動 Flask 應用程式，
+透過 HTTP 量測：
+
+    capture  拍攝延遲（/api/camera/capture，含第一次開啟相機的冷啟動時間）
+    ocr      端對端 OCR 延遲百分位（/api/ocr/process?wait=1，可設定同時請求數與伺服器錯誤比例）
+    stream   N 個同時觀看者的預覽串流吞吐量（每位觀看者 FPS、頻寬、伺服器每幀 CPU 時間）
+    store    結果存儲的寫入與搜尋成本（OCRResultStore）
+    startup  以子行程啟動應用程式的匯入耗時、第一次回應與就緒時間（可指定歷史結果筆數）
+
+結果輸出為 JSON 報告，可用 --compare 與先前版本的報告比較。
+
+用法:
+    python book_reader_benchmark.py --output reports/bench.json
+    python book_reader_benchmark.py --scenarios ocr,stream --viewers 8 --compare reports/bench.json
+    python book_reader_benchmark.py --video page_flip.mp4 --ocr-error-rate 0.05
+    python book_reader_benchmark.py --scenarios stream --server async --viewers 50
+    python book_reader_benchmark.py --scenarios stream,capture --camera-format mjpeg
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import shutil
+import random
+import string
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import requests
+from werkzeug.serving import make_server
+
+import mock_ocr_server
+from fake_camera import make_capture_factory
+
+
+SCENARIOS = ('capture', 'ocr', 'stream', 'store', 'startup')
+REPORT_SCHEMA = 1
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# startup 情境的子行程：匯入應用程式後以 werkzeug 提供服務，第一行輸出埠號與匯入耗時
+STARTUP_CHILD = '''
+import sys, json, time
+started = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import book_reader_flask
+from werkzeug.serving import make_server
+server = make_server('127.0.0.1', 0, book_reader_flask.app, threaded=True)
+print(json.dumps({'port': server.server_port, 'import_ms': round((time.perf_counter() - started) * 1000, 1)}),
+      flush=True)
+server.serve_forever()
+'''
+
+
+def summarize(values_ms):
+    """
+    計算延遲分布（毫秒）
+
+    Args:
+        values_ms: 延遲列表（毫秒）
+
+    Returns:
+        dict: count、mean、min、p50、p90、p95、p99、max
+    """
+    values = sorted(values_ms)
+    if not values:
+        return {'count': 0}
+
+    def percentile(p):
+        # 線性內插
+        position = (len(values) - 1) * p / 100.0
+        lower = int(position)
+        upper = min(lower + 1, len(values) - 1)
+        return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+    return {
+        'count': len(values),
+        'mean': round(sum(values) / len(values), 2),
+        'min': round(values[0], 2),
+        'p50': round(percentile(50), 2),
+        'p90': round(percentile(90), 2),
+        'p95': round(percentile(95), 2),
+        'p99': round(percentile(99), 2),
+        'max': round(values[-1], 2)
+    }
+
+
+class _ServerThread:
+    """在背景執行緒以 werkzeug 提供 WSGI 應用程式（埠號 0 表示自動選擇）"""
+
+    def __init__(self, app, host='127.0.0.1', port=0):
+        self.server = make_server(host, port, app, threaded=True)
+        self.url = f'http://{host}:{self.server.server_port}'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+
+
+def write_config(workdir, args, ocr_url, legacy_results_file=''):
+    """
+    產生基準測試用的 config.ini（結果、快取與日誌都寫在暫存目錄）
+
+    OCR 結果快取與預分析關閉，每次請求都會送到模擬 OCR 伺服器；
+    斷路器門檻調高，錯誤比例測試時量測的是每次請求的結果而不是斷路器的快速失敗。
+    legacy_results_file 為舊版 JSON 結果檔（startup 情境量測首次啟動的匯入）。
+    """
+    width, height = args.resolution
+    config = f"""[API]
+api_url = {ocr_url}
+request_timeout = 60
+pool_maxsize = {max(4, args.ocr_concurrency * 2)}
+max_retries = {args.ocr_retries}
+circuit_failure_threshold = 1000000
+
+[CAMERA]
+camera_device = 0
+frame_width = {width}
+frame_height = {height}
+capture_delay = 0.2
+save_captured_image = true
+image_save_path = captured_images
+producer_idle_timeout = 0
+mjpeg_passthrough = {'true' if args.camera_format == 'mjpeg' else 'false'}
+
+[STREAM]
+max_fps = 60
+
+[OCR_QUEUE]
+worker_count = {args.ocr_concurrency}
+max_pending_jobs = {max(10, args.ocr_concurrency * 4)}
+
+[CACHE]
+enable = false
+
+[PREANALYSIS]
+backend = none
+
+[STORAGE]
+results_db = ocr_results.db
+legacy_results_file = {legacy_results_file}
+
+[LOGGING]
+log_level = WARNING
+log_file = logs/book_reader.log
+console_output = false
+"""
+    with open(os.path.join(workdir, 'config.ini'), 'w', encoding='utf-8') as f:
+        f.write(config)
+
+
+def run_capture(session, base_url, args):
+    """拍攝延遲：第一次拍攝包含開啟相機，之後從緩衝區挑選畫面"""
+    start = time.perf_counter()
+    response = session.post(f'{base_url}/api/camera/capture', timeout=30)
+    cold_ms = (time.perf_counter() - start) * 1000
+    response.raise_for_status()
+
+    latencies, frame_ages, failures = [], [], 0
+    for _ in range(args.capture_runs):
+        # 間隔一幀以上，避免連續拍攝總是取到同一組緩衝畫面
+        time.sleep(1.0 / max(args.camera_fps, 1))
+        start = time.perf_counter()
+        response = session.post(f'{base_url}/api/camera/capture', timeout=30)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if response.status_code != 200:
+            failures += 1
+            continue
+        latencies.append(elapsed_ms)
+        frame_ages.append(response.json().get('frame_age_ms') or 0)
+    return {
+        'cold_start_ms': round(cold_ms, 2),
+        'latency_ms': summarize(latencies),
+        'frame_age_ms': summarize(frame_ages),
+        'failures': failures
+    }
+
+
+def run_ocr(session, base_url, args):
+    """端對端 OCR 延遲：每個請求先拍攝再以拍攝 ID 同步等待結果"""
+    latencies, ocr_ms, upload_bytes = [], [], []
+    statuses = {}
+    lock = threading.Lock()
+
+    def one_request(_):
+        capture = session.post(f'{base_url}/api/camera/capture', timeout=30)
+        capture.raise_for_status()
+        start = time.perf_counter()
+        response = session.post(f'{base_url}/api/ocr/process?wait=1',
+                                json={'capture_id': capture.json()['capture_id']}, timeout=300)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        body = response.json()
+        status = body.get('status') if response.status_code == 200 else f'http_{response.status_code}'
+        with lock:
+            statuses[status] = statuses.get(status, 0) + 1
+            latencies.append(elapsed_ms)
+            if body.get('ocr_ms') is not None:
+                ocr_ms.append(body['ocr_ms'])
+            if body.get('upload_bytes') is not None:
+                upload_bytes.append(body['upload_bytes'])
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.ocr_concurrency) as executor:
+        list(executor.map(one_request, range(args.ocr_requests)))
+    wall_s = time.perf_counter() - started
+
+    completed = statuses.get('completed', 0)
+    return {
+        'requests': args.ocr_requests,
+        'concurrency': args.ocr_concurrency,
+        'statuses': statuses,
+        'error_rate': round(1 - completed / float(max(args.ocr_requests, 1)), 4),
+        'latency_ms': summarize(latencies),
+        'ocr_api_ms': summarize(ocr_ms),
+        'avg_upload_bytes': round(sum(upload_bytes) / len(upload_bytes)) if upload_bytes else None,
+        'pages_per_minute': round(completed / wall_s * 60, 2) if wall_s else None,
+        'wall_s': round(wall_s, 2)
+    }
+
+
+def _count_stream(session, url, duration, boundary, result):
+    """讀取串流 duration 秒並計算收到的畫面數與位元組數"""
+    frames, nbytes, first_frame_ms = 0, 0, None
+    tail = b''
+    start = time.perf_counter()
+    try:
+        with session.get(url, stream=True, timeout=(5, 10)) as response:
+            for chunk in response.iter_content(chunk_size=65536):
+                nbytes += len(chunk)
+                data = tail + chunk
+                found = data.count(boundary)
+                if found:
+                    frames += found
+                    if first_frame_ms is None:
+                        first_frame_ms = (time.perf_counter() - start) * 1000
+                # 保留結尾，避免分隔字串被切在兩個區塊之間
+                tail = data[-(len(boundary) - 1):]
+                if time.perf_counter() - start >= duration:
+                    break
+    except requests.RequestException as e:
+        result['error'] = str(e)
+    elapsed = time.perf_counter() - start
+    result.update({
+        'frames': frames,
+        'fps': round(frames / elapsed, 2),
+        'bytes_per_second': round(nbytes / elapsed),
+        'first_frame_ms': round(first_frame_ms, 1) if first_frame_ms is not None else None
+    })
+
+
+def run_stream(session, base_url, args):
+    """N 個同時觀看者的預覽串流（關閉變化偵測，量測每幀編碼與傳送的最大負載）"""
+    if args.stream_transport == 'mjpeg':
+        path, boundary = '/api/camera/mjpeg', b'Content-Type: image/jpeg'
+    else:
+        path, boundary = '/api/camera/stream', b'data: {"frame"'
+    url = f'{base_url}{path}?fps={args.stream_fps}&gate=0'
+
+    before = session.get(f'{base_url}/api/camera/stream/stats', timeout=10).json()[args.stream_transport]
+    cpu_before = time.process_time()
+    started = time.perf_counter()
+    viewers = [{} for _ in range(args.viewers)]
+    threads = [
+        threading.Thread(target=_count_stream, args=(requests.Session(), url, args.stream_duration, boundary, viewer))
+        for viewer in viewers
+    ]
+    for thread in threads:
+        thread.start()
+    # 串流期間行程內的執行緒數（開發伺服器每個連線一個執行緒；扣除觀看者執行緒）
+    peak_threads = 0
+    while any(thread.is_alive() for thread in threads):
+        peak_threads = max(peak_threads, threading.active_count() - sum(t.is_alive() for t in threads))
+        time.sleep(0.5)
+    for thread in threads:
+        thread.join()
+    wall_s = time.perf_counter() - started
+    cpu_s = time.process_time() - cpu_before
+    after = session.get(f'{base_url}/api/camera/stream/stats', timeout=10).json()[args.stream_transport]
+
+    frames_sent = after['frames_sent'] - before['frames_sent']
+    cpu_seconds = after['cpu_seconds'] - before['cpu_seconds']
+    viewer_fps = [viewer['fps'] for viewer in viewers]
+    return {
+        'transport': args.stream_transport,
+        'server': args.server,
+        'camera_format': args.camera_format,
+        'viewers': args.viewers,
+        'target_fps': args.stream_fps,
+        'camera_fps': args.camera_fps,
+        'viewer_fps': summarize(viewer_fps),
+        'aggregate_fps': round(sum(viewer_fps), 2),
+        'bytes_per_second': sum(viewer['bytes_per_second'] for viewer in viewers),
+        'first_frame_ms': summarize([v['first_frame_ms'] for v in viewers if v['first_frame_ms'] is not None]),
+        'server_frames_sent': frames_sent,
+        'server_frames_dropped': after['frames_dropped'] - before['frames_dropped'],
+        'server_cpu_ms_per_frame': round(cpu_seconds * 1000 / frames_sent, 3) if frames_sent else None,
+        # 同一行程內含觀看者執行緒，僅供版本間相對比較
+        'process_cpu_percent': round(cpu_s / wall_s * 100, 1),
+        'peak_server_threads': peak_threads,
+        'errors': [viewer['error'] for viewer in viewers if 'error' in viewer]
+    }
+
+
+def _bench_result(index, text, rng):
+    """產生一筆模擬 OCR 結果"""
+    return {
+        'id': f'bench_{index:06d}',
+        'datetime': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'status': 'completed',
+        # 每筆加入不同的英數字，避免全文索引只有相同內容
+        'text': text + ''.join(rng.choice(string.ascii_lowercase) for _ in range(16)),
+        'timestamp': datetime.now().isoformat()
+    }
+
+
+def run_store(workdir, args):
+    """結果存儲的寫入成本（每次 add() 為一次交易）與搜尋延遲"""
+    from ocr_result_store import OCRResultStore
+
+    db_path = os.path.join(workdir, 'bench_store.db')
+    store = OCRResultStore(db_path)
+    rng = random.Random(args.seed)
+    text = mock_ocr_server.build_text(args.ocr_chars)
+
+    write_ms = []
+    for index in range(args.store_writes):
+        result = _bench_result(index, text, rng)
+        start = time.perf_counter()
+        store.add(result)
+        write_ms.append((time.perf_counter() - start) * 1000)
+
+    search_ms = []
+    for query in ('陽光', '古老的橋', '早餐店 麻雀', '第一章'):
+        for _ in range(5):
+            start = time.perf_counter()
+            store.search(query, limit=20)
+            search_ms.append((time.perf_counter() - start) * 1000)
+
+    size = sum(os.path.getsize(path) for path in (db_path, db_path + '-wal') if os.path.exists(path))
+    return {
+        'writes': args.store_writes,
+        'text_chars': len(text),
+        'fts_enabled': store.fts_enabled,
+        'write_ms': summarize(write_ms),
+        'search_ms': summarize(search_ms),
+        'db_bytes_per_result': round(size / max(args.store_writes, 1))
+    }
+
+
+def _start_once(directory, session):
+    """
+    以子行程啟動應用程式一次
+
+    Returns:
+        dict: 匯入耗時、第一次回應（/healthz）、首頁、就緒（/readyz 200）與第一頁歷史結果距啟動的毫秒數
+    """
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, '-c', STARTUP_CHILD, PACKAGE_DIR], cwd=directory,
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    try:
+        line = process.stdout.readline()
+        if not line:
+            raise RuntimeError('應用程式子行程啟動失敗')
+        info = json.loads(line)
+        base_url = f"http://127.0.0.1:{info['port']}"
+
+        def elapsed_ms():
+            return round((time.perf_counter() - started) * 1000, 1)
+
+        session.get(f'{base_url}/healthz', timeout=30).raise_for_status()
+        result = {'import_ms': info['import_ms'], 'first_response_ms': elapsed_ms()}
+        session.get(f'{base_url}/', timeout=30).raise_for_status()
+        result['index_ms'] = elapsed_ms()
+        while session.get(f'{base_url}/readyz', timeout=30).status_code != 200:
+            if time.perf_counter() - started > 120:
+                raise RuntimeError('等待 /readyz 逾時')
+            time.sleep(0.005)
+        result['ready_ms'] = elapsed_ms()
+        session.get(f'{base_url}/api/ocr/results', timeout=60).raise_for_status()
+        result['first_results_page_ms'] = elapsed_ms()
+        return result
+    finally:
+        process.terminate()
+        process.wait(10)
+
+
+def run_startup(workdir, args, ocr_url):
+    """
+    啟動時間：第一次啟動（匯入 --history 筆舊版 ocr_results.json）與之後重新啟動（資料庫已有相同筆數）
+    """
+    directory = os.path.join(workdir, 'startup')
+    os.makedirs(directory, exist_ok=True)
+    write_config(directory, args, ocr_url, legacy_results_file='ocr_results.json')
+    rng = random.Random(args.seed)
+    text = mock_ocr_server.build_text(args.ocr_chars)
+    # 舊版檔案最新的在前面
+    history = [_bench_result(index, text, rng) for index in reversed(range(args.history))]
+    with open(os.path.join(directory, 'ocr_results.json'), 'w', encoding='utf-8') as f:
+        json.dump(history, f, ensure_ascii=False)
+
+    session = requests.Session()
+    runs = [_start_once(directory, session) for _ in range(1 + args.startup_runs)]
+    return {
+        'history': args.history,
+        'first_start': runs[0],
+        'restart': {key: summarize([run[key] for run in runs[1:]]) for key in runs[0]}
+    }
+
+
+def collect_meta():
+    """執行環境資訊（比較報告時確認是否在同一台機器上執行）"""
+    def git(*command):
+        try:
+            return subprocess.run(['git', *command], cwd=PACKAGE_DIR, capture_output=True, text=True,
+                                  timeout=5).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            return None
+
+    return {
+        'git_commit': git('rev-parse', 'HEAD'),
+        'git_describe': git('describe', '--always', '--dirty'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'opencv': cv2.__version__
+    }
+
+
+def flatten(data, prefix=''):
+    """將巢狀字典攤平成 {'a.b.c': 數值}（只保留數值）"""
+    items = {}
+    for key, value in data.items():
+        name = f'{prefix}.{key}' if prefix else str(key)
+        if isinstance(value, dict):
+            items.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            items[name] = value
+    return items
+
+
+def compare_reports(baseline, current):
+    """
+    比較兩份報告的數值
+
+    Returns:
+        list: [(指標, 基準值, 目前值, 變化百分比或 None), ...]
+    """
+    base_values = flatten(baseline.get('scenarios', {}))
+    rows = []
+    for name, value in flatten(current.get('scenarios', {})).items():
+        if name not in base_values:
+            continue
+        base = base_values[name]
+        change = round((value - base) / abs(base) * 100, 1) if base else None
+        rows.append((name, base, value, change))
+    return rows
+
+
+def print_comparison(rows, baseline_meta):
+    """輸出比較表"""
+    print(f"\n與基準報告比較（{baseline_meta.get('git_describe') or '未知版本'}）:")
+    width = max((len(name) for name, *_ in rows), default=10)
+    print(f"{'指標'.ljust(width)}  {'基準':>12}  {'目前':>12}  {'變化':>8}")
+    for name, base, value, change in rows:
+        change_text = f'{change:+.1f}%' if change is not None else '-'
+        print(f'{name.ljust(width)}  {base:>12}  {value:>12}  {change_text:>8}')
+
+
+def parse_resolution(value):
+    try:
+        width, height = (int(part) for part in value.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError('解析度格式為 寬x高，例如 1280x720')
+    return width, height
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='閱讀機器人基準測試（模擬相機與模擬 OCR 伺服器）')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help=f'執行的情境，以逗號分隔（預設：{",".join(SCENARIOS)}）')
+    parser.add_argument('--output', help='JSON 報告輸出路徑（預設只輸出到終端機）')
+    parser.add_argument('--compare', help='與先前的 JSON 報告比較')
+    parser.add_argument('--seed', type=int, default=0, help='隨機種子（預設：0）')
+    parser.add_argument('--server', choices=('werkzeug', 'async'), default='werkzeug',
+                        help='應用程式伺服器：werkzeug 開發伺服器或 book_reader_server.py（預設：werkzeug）')
+    parser.add_argument('--keep-workdir', action='store_true', help='保留暫存目錄（日誌、資料庫與拍攝的圖片）')
+
+    camera = parser.add_argument_group('模擬相機')
+    camera.add_argument('--video', help='以影片檔作為相機畫面（預設為合成書頁）')
+    camera.add_argument('--camera-fps', type=float, default=30.0, help='相機 FPS（預設：30）')
+    camera.add_argument('--resolution', type=parse_resolution, default=(1280, 720), help='相機解析度（預設：1280x720）')
+    camera.add_argument('--camera-drop-rate', type=float, default=0.0, help='相機讀取失敗的機率（預設：0）')
+    camera.add_argument('--camera-format', choices=('bgr', 'mjpeg'), default='bgr',
+                        help='相機輸出格式：bgr 或 mjpeg（開啟 [CAMERA] mjpeg_passthrough，預覽直接轉送相機的 JPEG；預設：bgr）')
+
+    ocr = parser.add_argument_group('模擬 OCR 伺服器')
+    ocr.add_argument('--ocr-latency', type=float, default=0.5, help='OCR 延遲秒數（預設：0.5）')
+    ocr.add_argument('--ocr-jitter', type=float, default=0.2, help='延遲的隨機變動比例（預設：0.2）')
+    ocr.add_argument('--ocr-error-rate', type=float, default=0.0, help='OCR 伺服器回傳錯誤的機率（預設：0）')
+    ocr.add_argument('--ocr-error-status', type=int, default=500, help='錯誤時的 HTTP 狀態碼（預設：500）')
+    ocr.add_argument('--ocr-retries', type=int, default=0, help='用戶端重試次數（預設：0）')
+    ocr.add_argument('--ocr-chars', type=int, default=600, help='OCR 回傳字元數（預設：600）')
+
+    runs = parser.add_argument_group('情境參數')
+    runs.add_argument('--capture-runs', type=int, default=30, help='拍攝次數（預設：30）')
+    runs.add_argument('--ocr-requests', type=int, default=30, help='OCR 請求數（預設：30）')
+    runs.add_argument('--ocr-concurrency', type=int, default=2, help='同時 OCR 請求數與工作執行緒數（預設：2）')
+    runs.add_argument('--viewers', type=int, default=4, help='同時觀看串流的人數（預設：4）')
+    runs.add_argument('--stream-duration', type=float, default=10.0, help='串流量測秒數（預設：10）')
+    runs.add_argument('--stream-fps', type=float, default=15.0, help='每位觀看者要求的 FPS（預設：15）')
+    runs.add_argument('--stream-transport', choices=('mjpeg', 'sse'), default='mjpeg', help='串流方式（預設：mjpeg）')
+    runs.add_argument('--history', type=int, default=2000, help='startup 情境的歷史結果筆數（預設：2000）')
+    runs.add_argument('--startup-runs', type=int, default=3, help='startup 情境重新啟動次數（預設：3）')
+    runs.add_argument('--store-writes', type=int, default=500, help='結果存儲寫入筆數（預設：500）')
+
+    args = parser.parse_args()
+    if args.video:
+        # 執行時會切換到暫存目錄
+        args.video = os.path.abspath(args.video)
+    args.scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f'未知的情境: {", ".join(sorted(unknown))}')
+    return args
+
+
+def main():
+    args = parse_args()
+    # 不輸出每個 HTTP 請求的存取紀錄
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    workdir = tempfile.mkdtemp(prefix='book_reader_bench_')
+    report = {
+        'schema': REPORT_SCHEMA,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'meta': collect_meta(),
+        'args': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        'scenarios': {}
+    }
+
+    ocr_server = _ServerThread(mock_ocr_server.create_app(
+        latency=args.ocr_latency, chunk_delay=0.0, chars=args.ocr_chars, stream_format='none',
+        jitter=args.ocr_jitter, error_rate=args.ocr_error_rate, error_status=args.ocr_error_status,
+        seed=args.seed
+    )).start()
+    write_config(workdir, args, ocr_server.url)
+
+    # 匯入時以目前目錄的 config.ini 建立全域 reader
+    original_cwd = os.getcwd()
+    os.chdir(workdir)
+    app_server = None
+    try:
+        sys.path.insert(0, PACKAGE_DIR)
+        import book_reader_flask
+
+        reader = book_reader_flask.reader
+        reader.capture_factory = make_capture_factory(
+            video=args.video, fps=args.camera_fps, drop_rate=args.camera_drop_rate, seed=args.seed
+        )
+        if args.server == 'async':
+            from book_reader_server import BookReaderServer
+            app_server = BookReaderServer.from_config(
+                book_reader_flask.app, reader, book_reader_flask.stream_stats, book_reader_flask._parse_stream_args,
+                host='127.0.0.1', port=0
+            ).start_in_thread()
+        else:
+            app_server = _ServerThread(book_reader_flask.app).start()
+        session = requests.Session()
+
+        for name in args.scenarios:
+            print(f'執行情境 {name} ...', flush=True)
+            if name == 'capture':
+                result = run_capture(session, app_server.url, args)
+            elif name == 'ocr':
+                result = run_ocr(session, app_server.url, args)
+            elif name == 'stream':
+                result = run_stream(session, app_server.url, args)
+            elif name == 'store':
+                result = run_store(workdir, args)
+            else:
+                result = run_startup(workdir, args, ocr_server.url)
+            report['scenarios'][name] = result
+            print(json.dumps(result, ensure_ascii=False, indent=2))
+
+        reader.release_camera()
+    finally:
+        if app_server is not None:
+            app_server.stop()
+        ocr_server.stop()
+        os.chdir(original_cwd)
+        if args.keep_workdir:
+            print(f'暫存目錄: {workdir}')
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        output_dir = os.path.dirname(args.output)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f'報告已寫入 {args.output}')
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print_comparison(compare_reports(baseline, report), baseline.get('meta', {}))
+
+
+if __name__ == '__main__':
+    main()
@@ -8,34 +8,47 @@
 import os
 import sys
 import time
+# 模組載入起點（/healthz 回報匯入耗時）
+_IMPORT_STARTED = time.perf_counter()
 import json
 import logging
 import configparser
+import difflib
 from datetime import datetime
 from pathlib import Path
+from collections import OrderedDict, deque
 import cv2
-import requests
 import numpy as np
-from flask import Flask, render_template, request, jsonify, Response, session
+from flask import Flask, render_template, request, jsonify, Response, session, send_file
+from werkzeug.security import safe_join
 from flask_cors import CORS
 from dotenv import load_dotenv
 import threading
 from typing import Dict, List, Optional
 import base64
 import gc
+from concurrent.futures import ThreadPoolExecutor
+
+from camera_frame_producer import CameraFrameProducer, FrameChangeDetector
+from ocr_job_queue import OCRJobQueue, QueueFullError
+from ocr_api_client import OCRApiClient, CircuitOpenError, is_stream_response, iter_stream_text
+from ocr_result_cache import OCRResultCache, perceptual_hash
+from ocr_result_store import OCRResultStore, normalize_image_path
+from page_preprocessor import PagePreprocessor
+from page_tiler import PageTiler
+from capture_store import Capture, CaptureStore
+from thumbnail_store import ThumbnailStore
+from image_store import ImageStore
+from result_events import ResultEventBus
+from camera_discovery import CameraDiscovery
+from lazy_subsystem import LazySubsystem
+from metrics import MetricsRegistry, BYTES_BUCKETS, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from text_presence_detector import TextPresenceDetector
+from ocr_batch import OCRBatchRunner, BatchItem, iter_directory
 
 # 載入 .env 環境變數
 load_dotenv()
 
-# 嘗試匯入 OpenAI Vision 服務
-try:
-    from openai_vision_service import OpenAIVisionService
-    OPENAI_VISION_AVAILABLE = True
-except ImportError as e:
-    OPENAI_VISION_AVAILABLE = False
-    print(f"警告: 無法匯入 OpenAI Vision 服務 ({e})")
-    print("將跳過圖像預分析功能")
-
 app = Flask(__name__, 
             template_folder='templates',
             static_folder='static')
@@ -44,12 +57,92 @@ CORS(app)
 
 # 設定 static 目錄，允許訪問 captured_images
 
-# 全域相機連接（單例模式）
-camera_cap = None
-current_camera_device = None  # 追蹤當前使用的相機設備 ID
+# 全域相機影像生產者（每個設備一個背景執行緒，所有串流與拍照共用）
+camera_producers = {}  # device_id -> CameraFrameProducer
 camera_lock = threading.Lock()
 
 
+class StreamStats:
+    """串流傳輸統計（用於比較 SSE 與 MJPEG 的頻寬與伺服器 CPU 成本）"""
+    
+    def __init__(self):
+        """初始化統計計數"""
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.active_connections = 0
+        self.total_connections = 0
+        self.frames_sent = 0
+        self.frames_skipped = 0  # 變化偵測判定未改變而略過的畫面
+        self.frames_dropped = 0  # 相機已讀取但沒有送給這個連線的畫面（傳送較慢或 FPS 上限）
+        self.bytes_sent = 0
+        self._sent_times = deque(maxlen=1024)  # 最近送出畫面的時間（計算實際 FPS）
+        self.cpu_seconds = 0.0  # 編碼與封裝每幀所花的執行緒 CPU 時間（含變化偵測）
+    
+    def connection_opened(self):
+        """記錄新的串流連線"""
+        with self._lock:
+            self.active_connections += 1
+            self.total_connections += 1
+    
+    def connection_closed(self):
+        """記錄串流連線結束"""
+        with self._lock:
+            self.active_connections = max(0, self.active_connections - 1)
+    
+    def record_frame(self, nbytes, cpu_seconds):
+        """記錄一幀傳送的位元組數與 CPU 時間"""
+        with self._lock:
+            self._sent_times.append(time.monotonic())
+            self.frames_sent += 1
+            self.bytes_sent += nbytes
+            self.cpu_seconds += cpu_seconds
+    
+    def record_skip(self, cpu_seconds):
+        """記錄一幀因畫面未改變而略過"""
+        with self._lock:
+            self.frames_skipped += 1
+            self.cpu_seconds += cpu_seconds
+    
+    def record_drop(self, count):
+        """記錄略過的相機畫面數"""
+        with self._lock:
+            self.frames_dropped += count
+    
+    def fps(self, window=5.0):
+        """最近 window 秒內所有連線實際送出的 FPS"""
+        with self._lock:
+            cutoff = time.monotonic() - window
+            return sum(1 for sent_at in self._sent_times if sent_at >= cutoff) / window
+    
+    def snapshot(self):
+        """回傳統計資料字典"""
+        fps = self.fps()
+        with self._lock:
+            elapsed = max(time.time() - self.started_at, 1e-6)
+            frames = max(self.frames_sent, 1)
+            return {
+                'active_connections': self.active_connections,
+                'total_connections': self.total_connections,
+                'frames_sent': self.frames_sent,
+                'frames_skipped': self.frames_skipped,
+                'frames_dropped': self.frames_dropped,
+                'fps': round(fps, 1),
+                'bytes_sent': self.bytes_sent,
+                'avg_frame_bytes': round(self.bytes_sent / frames),
+                'avg_cpu_ms_per_frame': round(self.cpu_seconds * 1000 / frames, 3),
+                'cpu_seconds': round(self.cpu_seconds, 3),
+                'bytes_per_second': round(self.bytes_sent / elapsed),
+                'uptime_seconds': round(elapsed, 1)
+            }
+
+
+# 各傳輸方式的串流統計
+stream_stats = {
+    'sse': StreamStats(),
+    'mjpeg': StreamStats()
+}
+
+
 class BookReaderFlask:
     """閱讀機器人 Flask 界面類別"""
     
@@ -59,19 +152,40 @@ class BookReaderFlask:
         
         Args:
             config_file: 設定檔路徑
+        
+        讀取結果資料庫、載入快取與建立 API 用戶端等較慢的工作延到第一次使用或背景預熱（[STARTUP] warmup），
+        匯入模組後即可開始回應請求；各子系統狀態由 /readyz 回報。
         """
+        init_started = time.perf_counter()
+        self.started_at = time.time()
         self.config = self._load_config(config_file)
         self._setup_logging()
+        # 延遲建立的子系統（依註冊順序預熱）
+        self.subsystems = OrderedDict()
+        self._setup_metrics()
         self._setup_camera()
+        self._setup_stream()
         self._setup_api()
+        self._setup_preanalysis()
         self._setup_openai_vision()
+        self._setup_ocr_queue()
+        self._setup_ocr_cache()
+        self._setup_preprocess()
+        self._setup_tiling()
         self._create_directories()
+        self._setup_thumbnails()
+        
+        # OCR 結果存儲（SQLite，多個 OCR 工作執行緒會同時寫入）
+        self._setup_result_store()
+        self._setup_image_store()
+        self._setup_batch()
         
-        # OCR 結果存儲文件
-        self.ocr_results_file = 'ocr_results.json'
-        self._load_ocr_results()
+        self.warmup_enabled = self.config.getboolean('STARTUP', 'warmup', fallback=True)
+        self.startup_timings = {'init_ms': round((time.perf_counter() - init_started) * 1000, 1)}
+        if self.warmup_enabled:
+            self.start_warmup()
         
-        self.logger.info("閱讀機器人 Flask 界面初始化完成")
+        self.logger.info(f"閱讀機器人 Flask 界面初始化完成（{self.startup_timings['init_ms']} ms）")
         self.logger.info(f"API 伺服器: {self.api_url}")
     
     def _load_config(self, config_file):
@@ -117,9 +231,101 @@ class BookReaderFlask:
         self.logger = logging.getLogger('BookReaderFlask')
         self.logger.setLevel(getattr(logging, log_level))
         
+        # 重新匯入模組或建立第二個 BookReaderFlask（如批次命令列工具）時換掉先前加入的處理器，避免日誌重複輸出
+        for handler in [h for h in self.logger.handlers if getattr(h, '_book_reader_handler', False)]:
+            self.logger.removeHandler(handler)
+            handler.close()
         for handler in handlers:
+            handler._book_reader_handler = True
             self.logger.addHandler(handler)
     
+    def _setup_metrics(self):
+        """設定執行指標（/metrics，Prometheus 文字格式）"""
+        self.metrics_enabled = self.config.getboolean('METRICS', 'enable', fallback=True)
+        self.metrics = MetricsRegistry(namespace='book_reader')
+        # stage: capture（拍攝）、encode（JPEG 編碼）、preanalysis（預分析）、preprocess（頁面前處理）、
+        # ocr_api（每次 OCR API 請求，分塊時每個區塊一次）、persist（存圖與寫入資料庫）
+        self.stage_seconds = self.metrics.histogram(
+            'stage_duration_seconds', '拍攝到 OCR 各階段耗時（秒）', ('stage',))
+        self.ocr_results_total = self.metrics.counter(
+            'ocr_results_total', 'OCR 處理結果數（success / cached / skipped / error）', ('outcome',))
+        self.ocr_requests_total = self.metrics.counter(
+            'ocr_api_requests_total', 'OCR API 請求數（success / http_error / circuit_open / error）', ('outcome',))
+        self.payload_bytes = self.metrics.histogram(
+            'payload_bytes', '傳輸大小（位元組，capture：拍攝 JPEG、ocr_upload：送往 OCR API）', ('kind',),
+            buckets=BYTES_BUCKETS)
+        # 串流、相機、佇列等既有統計在讀取 /metrics 時收集
+        self.metrics.register_collector(self._collect_runtime_metrics)
+    
+    def _collect_runtime_metrics(self):
+        """
+        收集串流、相機、OCR 佇列、斷路器與快取的即時狀態
+        
+        Returns:
+            list: [(名稱, 類型, 說明, [(標籤字典, 數值), ...]), ...]
+        """
+        streams = {transport: (stats.snapshot(), stats) for transport, stats in stream_stats.items()}
+        with camera_lock:
+            producers = list(camera_producers.items())
+        queue = self.ocr_queue.stats()
+        # 讀取指標不觸發延遲子系統的建立
+        ocr_client = self.subsystems['ocr_api'].peek()
+        ocr_cache = self.subsystems['ocr_cache'].peek() if 'ocr_cache' in self.subsystems else None
+        families = [
+            ('stream_subscribers', 'gauge', '目前的預覽串流連線數',
+             [({'transport': t}, snap['active_connections']) for t, (snap, _) in streams.items()]),
+            ('stream_fps', 'gauge', '最近 5 秒實際送出的預覽 FPS（所有連線合計）',
+             [({'transport': t}, snap['fps']) for t, (snap, _) in streams.items()]),
+            ('stream_frames_sent_total', 'counter', '送出的預覽畫面數',
+             [({'transport': t}, snap['frames_sent']) for t, (snap, _) in streams.items()]),
+            ('stream_frames_skipped_total', 'counter', '畫面未改變而略過的預覽畫面數',
+             [({'transport': t}, snap['frames_skipped']) for t, (snap, _) in streams.items()]),
+            ('stream_frames_dropped_total', 'counter', '相機已讀取但未送給連線的畫面數（傳送較慢或 FPS 上限）',
+             [({'transport': t}, snap['frames_dropped']) for t, (snap, _) in streams.items()]),
+            ('stream_bytes_total', 'counter', '送出的預覽串流位元組數',
+             [({'transport': t}, snap['bytes_sent']) for t, (snap, _) in streams.items()]),
+            ('camera_opened', 'gauge', '相機是否已開啟（1 / 0）',
+             [({'device': d}, int(p.opened)) for d, p in producers]),
+            ('camera_subscribers', 'gauge', '影像生產者的訂閱者數',
+             [({'device': d}, p.subscriber_count) for d, p in producers]),
+            ('camera_mjpeg_passthrough', 'gauge', '預覽是否直接轉送相機的 MJPEG 畫面（1 / 0）',
+             [({'device': d}, int(p.frame_format == 'mjpeg')) for d, p in producers]),
+            ('camera_frames_read_total', 'counter', '相機讀取成功的畫面數（重新開啟相機時歸零）',
+             [({'device': d}, p.frames_read) for d, p in producers]),
+            ('camera_failed_reads_total', 'counter', '相機讀取失敗次數（重新開啟相機時歸零）',
+             [({'device': d}, p.failed_reads) for d, p in producers]),
+            ('ocr_queue_pending', 'gauge', '等待中的 OCR 工作數', [({}, queue['pending'])]),
+            ('ocr_queue_running', 'gauge', '執行中的 OCR 工作數', [({}, queue['running'])]),
+            ('subsystem_ready', 'gauge', '延遲建立的子系統是否已就緒（1 / 0）',
+             [({'subsystem': name}, int(subsystem.ready)) for name, subsystem in self.subsystems.items()]),
+        ]
+        if ocr_client is not None:
+            circuit_state = ocr_client.breaker.state
+            families.append(('ocr_circuit_state', 'gauge', 'OCR API 斷路器狀態（目前狀態為 1）',
+                             [({'state': state}, int(state == circuit_state))
+                              for state in ('closed', 'open', 'half_open')]))
+        image_store = self.subsystems['image_store'].peek() if 'image_store' in self.subsystems else None
+        if image_store is not None:
+            images = image_store.stats()
+            families.extend([
+                ('image_store_bytes', 'gauge', '照片存儲的照片總大小', [({}, images['bytes'])]),
+                ('image_store_files', 'gauge', '照片存儲的照片數', [({}, images['files'])]),
+                ('image_store_evicted_total', 'counter', '因超過容量上限刪除的照片數（referenced：被結果引用）',
+                 [({'referenced': 'false'}, images['evicted'] - images['evicted_referenced']),
+                  ({'referenced': 'true'}, images['evicted_referenced'])]),
+            ])
+        if self.thumbnails is not None:
+            thumbnails = self.thumbnails.stats()
+            families.append(('thumbnails_total', 'counter', '縮圖產生次數（background：存檔時、on_demand：第一次要求時、failed：失敗）',
+                             [({'kind': 'background'}, thumbnails['generated']),
+                              ({'kind': 'on_demand'}, thumbnails['on_demand']),
+                              ({'kind': 'failed'}, thumbnails['failed'])]))
+        if ocr_cache is not None:
+            cache = ocr_cache.stats()
+            families.append(('ocr_cache_lookups_total', 'counter', 'OCR 結果快取查詢次數',
+                             [({'result': 'hit'}, cache['hits']), ({'result': 'miss'}, cache['misses'])]))
+        return families
+    
     def _setup_camera(self):
         """設定攝影機"""
         self.camera_device = self.config.getint('CAMERA', 'camera_device', fallback=0)
@@ -128,9 +334,75 @@ class BookReaderFlask:
         self.capture_delay = self.config.getfloat('CAMERA', 'capture_delay', fallback=0.5)
         self.save_captured_image = self.config.getboolean('CAMERA', 'save_captured_image', fallback=True)
         self.image_save_path = self.config.get('CAMERA', 'image_save_path', fallback='captured_images')
+        # 照片存儲管理的照片（以內容命名，不會再變更）與其縮圖的瀏覽器快取秒數
+        self.image_cache_max_age = self.config.getint('CAMERA', 'image_cache_max_age', fallback=31536000)
+        self.frame_buffer_size = self.config.getint('CAMERA', 'frame_buffer_size', fallback=4)
+        self.producer_idle_timeout = self.config.getfloat('CAMERA', 'producer_idle_timeout', fallback=30.0)
+        # 要求相機輸出 MJPG，預覽直接轉送相機的 JPEG（拍照與 OCR 時才解碼）
+        self.mjpeg_passthrough = self.config.getboolean('CAMERA', 'mjpeg_passthrough', fallback=False)
+        # 建立 VideoCapture 的函數（None 表示 cv2.VideoCapture；基準測試以模擬相機取代）
+        self.capture_factory = None
+        
+        # 零快門延遲：拍攝時從緩衝區最近 N 幀挑選最清晰的畫面，不需等待相機開啟與新畫面
+        self.best_of_frames = max(1, self.config.getint('CAMERA', 'best_of_frames', fallback=5))
+        self.best_of_max_age = self.config.getfloat('CAMERA', 'best_of_max_age', fallback=1.0)
+        self.frame_buffer_size = max(self.frame_buffer_size, self.best_of_frames)
+        # 保持相機開啟：沒有預覽時緩衝區仍持續更新，拍攝不需重新開啟相機
+        self.keep_camera_warm = self.config.getboolean('CAMERA', 'keep_camera_warm', fallback=False)
+        if self.keep_camera_warm:
+            self.producer_idle_timeout = 0
+        
+        # 拍攝的畫面只編碼一次 JPEG，以拍攝 ID 暫存供顯示與 OCR 使用
+        self.capture_jpeg_quality = self.config.getint('CAMERA', 'capture_jpeg_quality', fallback=95)
+        self.capture_store = CaptureStore(
+            max_captures=self.config.getint('CAMERA', 'capture_cache_size', fallback=8),
+            ttl=self.config.getfloat('CAMERA', 'capture_ttl', fallback=600.0),
+            logger=self.logger
+        )
+        
+        # 相機列表快取：以 video4linux 設備資訊列舉，頁面載入不開啟相機
+        self.camera_discovery = CameraDiscovery(
+            probe=self.detect_available_cameras,
+            in_use=lambda: set(camera_producers.keys()),
+            poll_interval=self.config.getfloat('CAMERA', 'device_poll_interval', fallback=2.0),
+            use_querycap=self.config.getboolean('CAMERA', 'query_device_caps', fallback=True),
+            logger=self.logger
+        )
+        self.camera_discovery.start()
+        # 相機只回報狀態，不影響就緒（沒有接相機時仍可瀏覽與搜尋結果）
+        self._register_subsystem('camera', self._warm_camera, required=False)
         
         self.logger.info(f"攝影機設定完成: 裝置 {self.camera_device}, 解析度 {self.frame_width}x{self.frame_height}")
     
+    def _setup_stream(self):
+        """設定預覽串流參數"""
+        self.preview_transport = self.config.get('STREAM', 'preview_transport', fallback='mjpeg').strip().lower()
+        if self.preview_transport not in ('mjpeg', 'sse'):
+            self.logger.warning(f"未知的預覽傳輸方式 {self.preview_transport}，改用 mjpeg")
+            self.preview_transport = 'mjpeg'
+        self.stream_jpeg_quality = self.config.getint('STREAM', 'jpeg_quality', fallback=85)
+        self.stream_max_fps = self.config.getfloat('STREAM', 'max_fps', fallback=30.0)
+        
+        # 變化偵測：畫面靜止時（書本放著不動）不重複編碼與傳送
+        self.stream_change_detection = self.config.getboolean('STREAM', 'change_detection', fallback=True)
+        self.stream_change_pixel_threshold = self.config.getint('STREAM', 'change_pixel_threshold', fallback=12)
+        self.stream_change_ratio_threshold = self.config.getfloat('STREAM', 'change_ratio_threshold', fallback=0.01)
+        self.stream_keepalive_interval = self.config.getfloat('STREAM', 'keepalive_interval', fallback=2.0)
+        
+        self.logger.info(
+            f"預覽串流設定完成: {self.preview_transport}, "
+            f"JPEG 品質 {self.stream_jpeg_quality}, 最高 {self.stream_max_fps} FPS, "
+            f"變化偵測 {'啟用' if self.stream_change_detection else '停用'}"
+        )
+    
+    def create_change_detector(self):
+        """建立預覽串流用的畫面變化偵測器"""
+        return FrameChangeDetector(
+            pixel_threshold=self.stream_change_pixel_threshold,
+            ratio_threshold=self.stream_change_ratio_threshold,
+            keepalive_interval=self.stream_keepalive_interval
+        )
+    
     def _setup_api(self):
         """設定 API 相關參數"""
         api_url = self.config.get('API', 'api_url', fallback='http://172.30.19.20:5000')
@@ -138,60 +410,446 @@ class BookReaderFlask:
         self.api_url = api_url.rstrip('/') + ocr_endpoint
         self.request_timeout = self.config.getint('API', 'request_timeout', fallback=30)
         self.ocr_prompt = self.config.get('OCR', 'prompt', fallback='<image>\\nFree OCR.')
+        self._register_subsystem('ocr_api', self._create_ocr_client)
+        
+        # 串流辨識：請求 OCR 伺服器邊辨識邊回傳文字，不支援的伺服器回傳一般 JSON 時自動沿用整份回應
+        self.ocr_streaming = self.config.getboolean('API', 'streaming', fallback=False)
+        self.stream_partial_interval = self.config.getfloat('API', 'stream_partial_interval', fallback=0.2)
     
-    def _setup_openai_vision(self):
-        """設定 OpenAI Vision 圖像預分析功能"""
-        self.enable_preanalysis = self.config.getboolean('OPENAI', 'enable_preanalysis', fallback=False)
+    def _create_ocr_client(self):
+        """建立 OCR API 用戶端（持久連線池、重試與斷路器）"""
+        api_url = self.config.get('API', 'api_url', fallback='http://172.30.19.20:5000')
+        health_endpoint = self.config.get('API', 'health_endpoint', fallback='/health').strip()
+        return OCRApiClient(
+            self.api_url,
+            timeout=self.request_timeout,
+            health_url=api_url.rstrip('/') + health_endpoint if health_endpoint else None,
+            pool_connections=self.config.getint('API', 'pool_connections', fallback=1),
+            pool_maxsize=self.config.getint('API', 'pool_maxsize', fallback=4),
+            max_retries=self.config.getint('API', 'max_retries', fallback=2),
+            backoff_base=self.config.getfloat('API', 'retry_backoff_base', fallback=0.5),
+            backoff_max=self.config.getfloat('API', 'retry_backoff_max', fallback=5.0),
+            retry_on_timeout=self.config.getboolean('API', 'retry_on_timeout', fallback=False),
+            failure_threshold=self.config.getint('API', 'circuit_failure_threshold', fallback=3),
+            reset_timeout=self.config.getfloat('API', 'circuit_reset_timeout', fallback=30.0),
+            probe_interval=self.config.getfloat('API', 'circuit_probe_interval', fallback=5.0),
+            logger=self.logger
+        )
+    
+    def _setup_preanalysis(self):
+        """
+        設定預分析後端（判斷畫面是否包含文字，空白畫面跳過 OCR）
+        
+        none: 不預分析；local: 本機 OpenCV 偵測；openai: OpenAI Vision；
+        hybrid: 本機偵測，只有不確定的畫面才詢問 OpenAI
+        """
+        # 未設定 [PREANALYSIS] 時沿用舊的 [OPENAI] enable_preanalysis
+        legacy_openai = self.config.getboolean('OPENAI', 'enable_preanalysis', fallback=False)
+        default_backend = 'openai' if legacy_openai else 'none'
+        self.preanalysis_backend = self.config.get('PREANALYSIS', 'backend', fallback=default_backend).strip().lower()
+        if self.preanalysis_backend not in ('none', 'local', 'openai', 'hybrid'):
+            self.logger.warning(f"未知的預分析後端 {self.preanalysis_backend}，改用 {default_backend}")
+            self.preanalysis_backend = default_backend
         
-        self.openai_service = None
+        self.text_detector = None
+        if self.preanalysis_backend in ('local', 'hybrid'):
+            self.text_detector = TextPresenceDetector(
+                text_threshold=self.config.getfloat('PREANALYSIS', 'local_text_threshold', fallback=0.04),
+                blank_threshold=self.config.getfloat('PREANALYSIS', 'local_blank_threshold', fallback=0.01)
+            )
+        self.logger.info(f"預分析後端: {self.preanalysis_backend}")
+    
+    def _setup_openai_vision(self):
+        """設定 OpenAI Vision 圖像預分析功能（預分析後端為 openai 或 hybrid 時使用）"""
+        self.enable_preanalysis = self.preanalysis_backend in ('openai', 'hybrid')
         
         if not self.enable_preanalysis:
             self.logger.info("OpenAI 圖像預分析功能已停用")
             return
         
-        if not OPENAI_VISION_AVAILABLE:
-            self.logger.warning("OpenAI Vision 服務不可用，已停用預分析功能")
+        if not os.getenv('OPENAI_API_KEY'):
+            self.logger.warning("未設定 OPENAI_API_KEY，已停用預分析功能")
             self.enable_preanalysis = False
             return
         
-        # 初始化 OpenAI Vision 服務
-        openai_api_key = os.getenv('OPENAI_API_KEY')
-        openai_model = self.config.get('OPENAI', 'model', fallback='gpt-4o-mini')
+        # 匯入 OpenAI 套件較慢，第一次預分析或背景預熱時才建立
+        self._register_subsystem('openai', self._create_openai_service, required=False)
+    
+    def _create_openai_service(self):
+        """
+        建立 OpenAI Vision 服務
         
-        if not openai_api_key:
-            self.logger.warning("未設定 OPENAI_API_KEY，已停用預分析功能")
+        Returns:
+            OpenAIVisionService，服務不可用時回傳 None 並停用預分析
+        """
+        try:
+            from openai_vision_service import OpenAIVisionService
+        except ImportError as e:
+            self.logger.warning(f"無法匯入 OpenAI Vision 服務 ({e})，已停用預分析功能")
             self.enable_preanalysis = False
+            return None
+        
+        service = OpenAIVisionService(
+            api_key=os.getenv('OPENAI_API_KEY'),
+            model=self.config.get('OPENAI', 'model', fallback='gpt-4o-mini')
+        )
+        self.logger.info("✅ OpenAI 圖像預分析功能已啟用")
+        return service
+    
+    def _setup_ocr_queue(self):
+        """設定 OCR 非同步工作佇列"""
+        worker_count = self.config.getint('OCR_QUEUE', 'worker_count', fallback=2)
+        max_pending = self.config.getint('OCR_QUEUE', 'max_pending_jobs', fallback=10)
+        max_finished = self.config.getint('OCR_QUEUE', 'max_finished_jobs', fallback=200)
+        
+        # 工作執行緒數量即為同時送往 DeepSeek-OCR 伺服器的請求上限
+        self.ocr_queue = OCRJobQueue(
+            self._run_ocr_job,
+            worker_count=worker_count,
+            max_pending=max_pending,
+            max_finished=max_finished,
+            logger=self.logger
+        )
+        
+        self.logger.info(f"OCR 工作佇列設定完成: {worker_count} 個工作執行緒，等待上限 {max_pending}")
+        
+        # 推測執行：需要詢問 OpenAI 時同時以預設 prompt 開始 OCR，預分析判定無文字則捨棄結果
+        # 每個工作執行緒最多同時一個推測 OCR，送往 DeepSeek-OCR 的請求上限不變
+        self.speculative_ocr = (
+            self.config.getboolean('PREANALYSIS', 'speculative_ocr', fallback=False)
+            and self.enable_preanalysis
+        )
+        self.rerun_on_custom_prompt = self.config.getboolean('PREANALYSIS', 'rerun_on_custom_prompt', fallback=False)
+        self.rerun_prompt_similarity = self.config.getfloat('PREANALYSIS', 'rerun_prompt_similarity', fallback=0.8)
+        self.speculative_executor = None
+        self.speculative_lock = threading.Lock()
+        self.speculative_stats = {'runs': 0, 'used': 0, 'rerun': 0, 'discarded': 0, 'saved_ms_total': 0.0}
+        if self.speculative_ocr:
+            self.speculative_executor = ThreadPoolExecutor(max_workers=worker_count,
+                                                           thread_name_prefix='ocr-speculative')
+            self.logger.info(
+                f"推測執行 OCR 已啟用（建議 prompt 不同時{'重新執行' if self.rerun_on_custom_prompt else '沿用推測結果'}）"
+            )
+    
+    def _setup_ocr_cache(self):
+        """設定 OCR 結果快取（同一頁重複拍攝時直接回傳先前結果）"""
+        if not self.config.getboolean('CACHE', 'enable', fallback=True):
+            self.logger.info("OCR 結果快取已停用")
+            return
+        # 快取檔隨使用量增大，第一次 OCR 或背景預熱時才載入
+        self._register_subsystem('ocr_cache', self._create_ocr_cache, required=False)
+    
+    def _create_ocr_cache(self):
+        """載入 OCR 結果快取"""
+        cache = OCRResultCache(
+            cache_file=self.config.get('CACHE', 'cache_file', fallback='ocr_cache.json'),
+            max_entries=self.config.getint('CACHE', 'max_entries', fallback=500),
+            max_distance=self.config.getint('CACHE', 'max_distance', fallback=4),
+            logger=self.logger
+        )
+        self.logger.info(
+            f"OCR 結果快取已啟用: 最多 {cache.max_entries} 筆，"
+            f"漢明距離容許值 {cache.max_distance}"
+        )
+        return cache
+    
+    def _setup_preprocess(self):
+        """設定送往 OCR 前的頁面前處理"""
+        self.preprocessor = None
+        if not self.config.getboolean('PREPROCESS', 'enable', fallback=False):
+            self.logger.info("頁面前處理已停用")
             return
         
-        self.openai_service = OpenAIVisionService(
-            api_key=openai_api_key,
-            model=openai_model
+        self.preprocessor = PagePreprocessor(
+            crop_page=self.config.getboolean('PREPROCESS', 'crop_page', fallback=True),
+            deskew=self.config.getboolean('PREPROCESS', 'deskew', fallback=True),
+            max_skew_angle=self.config.getfloat('PREPROCESS', 'max_skew_angle', fallback=5.0),
+            color_mode=self.config.get('PREPROCESS', 'color_mode', fallback='grayscale').strip().lower(),
+            target_text_height=self.config.getint('PREPROCESS', 'target_text_height', fallback=32),
+            max_long_side=self.config.getint('PREPROCESS', 'max_long_side', fallback=2048),
+            jpeg_quality_max=self.config.getint('PREPROCESS', 'jpeg_quality_max', fallback=90),
+            jpeg_quality_min=self.config.getint('PREPROCESS', 'jpeg_quality_min', fallback=60),
+            max_upload_kb=self.config.getint('PREPROCESS', 'max_upload_kb', fallback=300),
+            logger=self.logger
         )
+        self.logger.info(f"頁面前處理已啟用: 色彩模式 {self.preprocessor.color_mode}，"
+                         f"目標文字高度 {self.preprocessor.target_text_height}px")
+    
+    def _setup_tiling(self):
+        """
+        設定分塊 OCR（高解析度、雙欄或文字密集的頁面切成區塊同時辨識）
         
-        self.logger.info("✅ OpenAI 圖像預分析功能已啟用")
+        停用時仍建立分塊器，供 /api/ocr/tiling/compare 比較整張與分塊的結果
+        """
+        self.tiling_enabled = self.config.getboolean('TILING', 'enable', fallback=False)
+        self.tiling_min_long_side = self.config.getint('TILING', 'min_long_side', fallback=1600)
+        self.tiler = PageTiler(
+            max_columns=self.config.getint('TILING', 'max_columns', fallback=2),
+            max_tile_side=self.config.getint('TILING', 'max_tile_side', fallback=1024),
+            overlap=self.config.getfloat('TILING', 'overlap', fallback=0.05),
+            layout=self.config.get('TILING', 'layout', fallback='auto').strip().lower(),
+            # 判斷橫排或直排（與預分析共用本機文字偵測器）
+            text_detector=self.text_detector or TextPresenceDetector(),
+            logger=self.logger
+        )
+        # 區塊同時送出的數量（注意 [API] pool_maxsize 與 OCR 伺服器的負載；執行緒在第一次使用時才建立）
+        workers = self.config.getint('TILING', 'workers', fallback=3)
+        self.tile_executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='ocr-tile')
+        if not self.tiling_enabled:
+            return
+        self.logger.info(
+            f"分塊 OCR 已啟用: 長邊 >= {self.tiling_min_long_side}px 時分塊，"
+            f"最多 {self.tiler.max_columns} 欄，區塊上限 {self.tiler.max_tile_side}px，{workers} 個同時請求"
+        )
     
     def _create_directories(self):
         """建立必要的目錄"""
         if self.save_captured_image:
             os.makedirs(self.image_save_path, exist_ok=True)
     
-    def _load_ocr_results(self):
-        """載入 OCR 結果"""
-        if os.path.exists(self.ocr_results_file):
+    def _setup_thumbnails(self):
+        """設定結果歷史縮圖（存檔時在背景產生，歷史列表不下載原始照片）"""
+        self.thumbnails = None
+        if not self.config.getboolean('THUMBNAILS', 'enable', fallback=True):
+            self.logger.info("結果歷史縮圖已停用")
+            return
+        sizes = [int(size) for size in self.config.get('THUMBNAILS', 'sizes', fallback='320,640').split(',')
+                 if size.strip()]
+        self.thumbnails = ThumbnailStore(
+            self.image_save_path,
+            self.config.get('THUMBNAILS', 'path', fallback='thumbnails'),
+            sizes=sizes,
+            jpeg_quality=self.config.getint('THUMBNAILS', 'jpeg_quality', fallback=75),
+            logger=self.logger
+        )
+        self.logger.info(f"結果歷史縮圖: 寬度 {', '.join(str(size) for size in self.thumbnails.sizes)}px")
+    
+    def _setup_result_store(self):
+        """設定 OCR 結果存儲（第一次使用或背景預熱時開啟）"""
+        self.results_page_size = self.config.getint('STORAGE', 'results_page_size', fallback=20)
+        # 結果變更事件（/api/ocr/results/events 推送給開著的網頁）
+        self.result_events = ResultEventBus(max_events=self.config.getint('STORAGE', 'events_buffer', fallback=200))
+        self._register_subsystem('result_store', self._create_result_store)
+    
+    def _create_result_store(self):
+        """開啟 OCR 結果存儲（首次啟動時自動匯入舊版 ocr_results.json）"""
+        store = OCRResultStore(
+            db_path=self.config.get('STORAGE', 'results_db', fallback='ocr_results.db'),
+            legacy_json=self.config.get('STORAGE', 'legacy_results_file', fallback='ocr_results.json'),
+            image_root=self.image_save_path,
+            logger=self.logger
+        )
+        self.logger.info(f"OCR 結果存儲: {store.db_path}（{store.count()} 筆）")
+        return store
+    
+    def _setup_image_store(self):
+        """設定照片存儲（內容雜湊命名、容量上限，第一次使用或背景預熱時開啟索引）"""
+        if self.save_captured_image:
+            self._register_subsystem('image_store', self._create_image_store, required=False)
+    
+    def _create_image_store(self):
+        """開啟照片存儲並啟動背景整理（超過容量上限時刪除最近最少檢視的照片）"""
+        store = ImageStore(
+            self.image_save_path,
+            index_db=self.config.get('IMAGES', 'index_db', fallback='image_index.db'),
+            max_bytes=int(self.config.getfloat('IMAGES', 'max_mb', fallback=0) * 1048576),
+            max_files=self.config.getint('IMAGES', 'max_files', fallback=0),
+            min_free_bytes=int(self.config.getfloat('IMAGES', 'min_free_mb', fallback=200) * 1048576),
+            low_watermark=self.config.getfloat('IMAGES', 'low_watermark', fallback=0.9),
+            evict_referenced=self.config.getboolean('IMAGES', 'evict_referenced', fallback=False),
+            compaction_interval=self.config.getfloat('IMAGES', 'compaction_interval', fallback=60.0),
+            is_referenced=lambda paths: self.result_store.referenced_images(paths),
+            on_evict=self._on_image_evicted,
+            logger=self.logger
+        )
+        store.start()
+        stats = store.stats()
+        limits = [f"{store.max_bytes / 1048576:.0f} MB" if store.max_bytes else '',
+                  f"{store.max_files} 張" if store.max_files else '',
+                  f"磁碟保留 {store.min_free_bytes / 1048576:.0f} MB" if store.min_free_bytes else '']
+        self.logger.info(
+            f"照片存儲: {store.root}（{stats['files']} 張，{stats['bytes'] / 1048576:.1f} MB；"
+            f"上限: {'、'.join(limit for limit in limits if limit) or '不限'}）"
+        )
+        return store
+    
+    def _on_image_evicted(self, name, path, referenced):
+        """照片被淘汰後刪除縮圖，並移除引用此照片的結果的照片連結（結果文字保留）"""
+        if self.thumbnails is not None:
+            self.thumbnails.remove(name)
+        if referenced:
+            for seq in self.result_store.detach_image(path):
+                result = self.result_store.get_by_seq(seq)
+                if result is not None:
+                    self.result_events.publish('updated', result=self.with_image_urls([result])[0])
+    
+    @property
+    def image_store(self):
+        """照片存儲，未保存拍攝照片時為 None（第一次存取時開啟）"""
+        subsystem = self.subsystems.get('image_store')
+        return subsystem.get() if subsystem is not None else None
+    
+    def _setup_batch(self):
+        """設定批次 OCR（重新辨識資料夾或多檔上傳的圖片）"""
+        self.batch_workers = self.config.getint(
+            'BATCH', 'workers', fallback=self.config.getint('OCR_QUEUE', 'worker_count', fallback=2)
+        )
+        self.batch_manifest_name = self.config.get('BATCH', 'manifest_name', fallback='.ocr_batch_manifest.jsonl')
+        self.batch_runs = OrderedDict()
+        self.batch_lock = threading.Lock()
+    
+    def _register_subsystem(self, name, factory, required=True):
+        """
+        註冊延遲建立的子系統
+        
+        Args:
+            name: 子系統名稱
+            factory: 建立函數
+            required: 是否為就緒的必要條件
+        """
+        self.subsystems[name] = LazySubsystem(name, factory, required=required, logger=self.logger)
+    
+    @property
+    def result_store(self):
+        """OCR 結果存儲（第一次存取時開啟）"""
+        return self.subsystems['result_store'].get()
+    
+    @property
+    def ocr_client(self):
+        """OCR API 用戶端（第一次存取時建立）"""
+        return self.subsystems['ocr_api'].get()
+    
+    @property
+    def ocr_cache(self):
+        """OCR 結果快取，停用時為 None（第一次存取時載入）"""
+        subsystem = self.subsystems.get('ocr_cache')
+        return subsystem.get() if subsystem is not None else None
+    
+    @property
+    def openai_service(self):
+        """OpenAI Vision 服務，停用或不可用時為 None（第一次存取時建立）"""
+        subsystem = self.subsystems.get('openai')
+        return subsystem.get() if subsystem is not None else None
+    
+    def _warm_camera(self):
+        """相機子系統：取得第一次設備列舉，保持相機開啟時啟動影像生產者"""
+        self.camera_discovery.get()
+        if self.keep_camera_warm:
+            self.logger.info(f"保持相機開啟: 啟動設備 {self.camera_device} 的影像生產者")
+            self.get_camera_producer()
+        return self.camera_discovery
+    
+    def start_warmup(self):
+        """在背景依序建立所有延遲的子系統（第一個請求不需等待讀取資料庫與快取）"""
+        threading.Thread(target=self._warmup, name='startup-warmup', daemon=True).start()
+    
+    def _warmup(self):
+        start = time.perf_counter()
+        for subsystem in list(self.subsystems.values()):
             try:
-                with open(self.ocr_results_file, 'r', encoding='utf-8') as f:
-                    self.ocr_results = json.load(f)
-            except Exception as e:
-                self.logger.error(f"載入 OCR 結果失敗: {e}")
-                self.ocr_results = []
-        else:
-            self.ocr_results = []
+                subsystem.get()
+            except Exception:
+                # 錯誤已記錄，第一次使用時會重試
+                pass
+        self.startup_timings['warmup_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        self.logger.info(f"背景預熱完成（{self.startup_timings['warmup_ms']} ms）")
+    
+    def readiness(self):
+        """
+        子系統就緒狀態（不觸發建立）
+        
+        Returns:
+            dict: {ready: 必要子系統是否都已就緒, subsystems, camera, ocr_circuit, startup}
+        """
+        subsystems = {name: subsystem.status() for name, subsystem in self.subsystems.items()}
+        ocr_client = self.subsystems['ocr_api'].peek()
+        with camera_lock:
+            opened = [device_id for device_id, producer in camera_producers.items() if producer.opened]
+        return {
+            'ready': all(status['state'] == 'ready' for status in subsystems.values() if status['required']),
+            'subsystems': subsystems,
+            'camera': dict(self.camera_discovery.info(), opened_devices=opened),
+            'ocr_circuit': ocr_client.breaker.state if ocr_client is not None else None,
+            'startup': self.startup_timings
+        }
+    
+    def create_batch_runner(self, items, prompt=None, workers=None, manifest_path=None, store_results=True,
+                            total=None, on_page=None, resume=True):
+        """
+        建立批次 OCR 執行器（使用本物件的 process_ocr() 與結果存儲）
+        
+        Args:
+            items: BatchItem 的可迭代物件
+            prompt: OCR prompt（None 使用預設 prompt）
+            workers: 同時處理的圖片數量（None 使用 [BATCH] workers）
+            manifest_path: 進度紀錄檔路徑（None 不紀錄）
+            store_results: 是否存入 OCR 結果存儲
+            total: 圖片總數
+            on_page: 每頁完成時的回呼
+            resume: 是否接續 manifest 中已完成的圖片（False 時批次開始執行才刪除舊的 manifest）
+            
+        Returns:
+            OCRBatchRunner
+        """
+        return OCRBatchRunner(
+            self, items,
+            prompt=prompt,
+            workers=workers or self.batch_workers,
+            manifest_path=manifest_path,
+            store_results=store_results,
+            total=total,
+            logger=self.logger,
+            on_page=on_page,
+            resume=resume
+        )
+    
+    def start_batch(self, runner):
+        """
+        在背景執行批次 OCR（同一時間只執行一個批次，避免與其他批次搶奪 OCR 伺服器）
+        
+        Args:
+            runner: OCRBatchRunner
+            
+        Returns:
+            bool: 是否已啟動（已有批次執行中時回傳 False）
+        """
+        with self.batch_lock:
+            if any(run.status in ('pending', 'running') for run in self.batch_runs.values()):
+                return False
+            self.batch_runs[runner.id] = runner
+            # 只保留最近的批次紀錄
+            while len(self.batch_runs) > 20:
+                self.batch_runs.popitem(last=False)
+            runner.status = 'running'
+        threading.Thread(target=runner.run, name=f'ocr-batch-{runner.id[:8]}', daemon=True).start()
+        return True
+    
+    def list_cameras(self, refresh=False):
+        """
+        取得可用相機列表（來自快取，不存取設備）
+        
+        Args:
+            refresh: 是否立即重新列舉
+            
+        Returns:
+            list: 相機資訊字典列表
+        """
+        cameras = self.camera_discovery.get(refresh=refresh)
+        if not cameras and self.camera_discovery.info()['refresh_count'] == 0:
+            # 背景偵測尚未完成：先列出設定的設備
+            cameras = [{
+                'id': self.camera_device,
+                'name': f'Camera {self.camera_device}',
+                'device_path': f'/dev/video{self.camera_device}'
+            }]
+        return cameras
     
-    def detect_available_cameras(self, max_check=10):
+    def detect_available_cameras(self, skip_ids=(), max_check=10):
         """
-        偵測可用的相機設備
+        開啟設備並讀取一幀以偵測可用的相機（沒有 video4linux 時由 CameraDiscovery 在背景呼叫）
         
         Args:
+            skip_ids: 跳過的設備編號（使用中的設備，開啟會干擾串流）
             max_check: 最多檢查的相機設備數量
             
         Returns:
@@ -200,6 +858,8 @@ class BookReaderFlask:
         available_cameras = []
         
         for device_id in range(max_check):
+            if device_id in skip_ids:
+                continue
             cap = None
             try:
                 cap = cv2.VideoCapture(device_id)
@@ -236,142 +896,154 @@ class BookReaderFlask:
         Returns:
             bool: 是否設定成功
         """
-        # 釋放舊的相機連接
-        global camera_cap, current_camera_device
-        with camera_lock:
-            if camera_cap is not None:
-                try:
-                    camera_cap.release()
-                    self.logger.info(f"已釋放舊相機設備: {current_camera_device}")
-                except Exception as e:
-                    self.logger.warning(f"釋放舊相機時發生錯誤: {e}")
-                camera_cap = None
-                current_camera_device = None
-                # 等待資源完全釋放
-                time.sleep(0.3)
-        
-        # 測試新設備是否可用
-        test_cap = None
+        # 透過新設備的影像生產者測試是否可用（不另外開啟測試用的 VideoCapture）
         try:
-            test_cap = cv2.VideoCapture(device_id)
-            if test_cap.isOpened():
-                # 設定解析度
-                test_cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.frame_width)
-                test_cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.frame_height)
-                # 讀取一幀測試
-                ret, _ = test_cap.read()
-                if ret:
-                    self.camera_device = device_id
-                    self.logger.info(f"相機設備已切換為: {device_id}")
-                    return True
-                else:
-                    self.logger.warning(f"相機設備 {device_id} 無法讀取畫面")
-            else:
-                self.logger.warning(f"無法打開相機設備 {device_id}")
+            producer = self.get_camera_producer(device_id)
+            if producer.wait_for_frame(0, timeout=self.capture_delay + 3.0) is None:
+                self.logger.warning(f"相機設備 {device_id} 無法讀取畫面: {producer.last_error}")
+                self.release_camera(device_id, only_idle=True)
+                # 設備可能已移除，讓相機列表重新列舉
+                self.camera_discovery.invalidate()
+                return False
         except Exception as e:
             self.logger.error(f"設定相機設備 {device_id} 時發生錯誤: {e}")
-        finally:
-            if test_cap is not None:
-                test_cap.release()
-        
-        return False
-    
-    def _save_ocr_results(self):
-        """保存 OCR 結果"""
-        try:
-            with open(self.ocr_results_file, 'w', encoding='utf-8') as f:
-                json.dump(self.ocr_results, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            self.logger.error(f"保存 OCR 結果失敗: {e}")
+            return False
+
+        old_device = self.camera_device
+        self.camera_device = device_id
+        self.logger.info(f"相機設備已切換為: {device_id}")
+
+        # 釋放舊設備（仍有串流訂閱者時保留，由閒置逾時自動釋放）
+        if old_device != device_id:
+            self.release_camera(old_device, only_idle=True)
+
+        return True
     
-    def get_camera(self, device_id=None):
+    def get_camera_producer(self, device_id=None):
         """
-        獲取相機連接（單例模式）
-        
+        獲取相機影像生產者（每個設備一個，所有串流與拍照共用）
+
         Args:
             device_id: 相機設備編號，如果為 None 則使用 self.camera_device
-            
+
         Returns:
-            VideoCapture 物件或 None
+            CameraFrameProducer 物件（已啟動）
         """
-        global camera_cap, current_camera_device
-        
-        # 如果指定了 device_id，使用指定的設備
         target_device = device_id if device_id is not None else self.camera_device
-        
+
         with camera_lock:
-            # 如果相機已打開且設備編號相同，直接返回
-            if camera_cap is not None and camera_cap.isOpened() and current_camera_device == target_device:
-                return camera_cap
-            
-            # 設備不同或已關閉，釋放舊連接
-            if camera_cap is not None:
-                camera_cap.release()
-                camera_cap = None
-                current_camera_device = None
-            
-            # 初始化新相機連接
-            camera_cap = cv2.VideoCapture(target_device)
-            if camera_cap.isOpened():
-                camera_cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.frame_width)
-                camera_cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.frame_height)
-                time.sleep(self.capture_delay)
-                current_camera_device = target_device
-                self.logger.info(f"相機初始化成功: 設備 {target_device}")
-            else:
-                self.logger.error(f"無法打開相機設備 {target_device}")
-                camera_cap = None
-                current_camera_device = None
-                return None
-        
-        return camera_cap
-    
-    def get_camera_frame(self):
-        """從 USB Camera 讀取一幀影像"""
-        cap = self.get_camera()
-        if cap is None:
-            return None
-        
-        ret, frame = cap.read()
-        if not ret:
+            producer = camera_producers.get(target_device)
+
+            # 解析度變更時需重新開啟相機
+            if producer is not None and (producer.frame_width != self.frame_width or
+                                         producer.frame_height != self.frame_height):
+                self.logger.info(f"相機設備 {target_device} 解析度變更，重新啟動影像生產者")
+                producer.stop()
+                producer = None
+
+            if producer is None or not producer.is_alive():
+                producer = CameraFrameProducer(
+                    target_device,
+                    self.frame_width,
+                    self.frame_height,
+                    warmup_delay=self.capture_delay,
+                    buffer_size=self.frame_buffer_size,
+                    idle_timeout=self.producer_idle_timeout,
+                    logger=self.logger,
+                    capture_factory=self.capture_factory,
+                    mjpeg_passthrough=self.mjpeg_passthrough
+                )
+                producer.start()
+                camera_producers[target_device] = producer
+
+        return producer
+
+    def release_camera(self, device_id=None, only_idle=False):
+        """
+        停止影像生產者並釋放相機
+
+        Args:
+            device_id: 相機設備編號，如果為 None 則釋放所有設備
+            only_idle: 為 True 時只釋放沒有串流訂閱者的設備
+        """
+        with camera_lock:
+            device_ids = list(camera_producers.keys()) if device_id is None else [device_id]
+            for target_device in device_ids:
+                producer = camera_producers.get(target_device)
+                if producer is None:
+                    continue
+                if only_idle and producer.subscriber_count > 0:
+                    continue
+                producer.stop()
+                del camera_producers[target_device]
+                self.logger.info(f"已釋放相機設備: {target_device}")
+
+    def get_camera_frame(self, timeout=None):
+        """
+        從影像生產者取得一幀在呼叫之後才讀取的新畫面
+
+        Args:
+            timeout: 最長等待時間（秒），預設為相機初始化時間加 2 秒
+
+        Returns:
+            frame: 影像（numpy array），失敗則返回 None
+        """
+        producer = self.get_camera_producer()
+        if timeout is None:
+            timeout = self.capture_delay + 2.0
+
+        latest = producer.wait_for_frame(producer.latest_seq, timeout=timeout)
+        if latest is None:
             return None
-        
-        return frame
+
+        return producer.decode(latest)
     
     def capture_frame(self):
         """
-        從 USB Camera 拍攝一張照片
+        從 USB Camera 拍攝一張照片，編碼一次 JPEG 後以拍攝 ID 暫存
         
         Returns:
-            frame: 拍攝的影像（numpy array），失敗則返回 None
-            
-        Raises:
-            Exception: 如果相機無法打開或讀取失敗，會記錄詳細錯誤訊息
+            Capture: 拍攝（含原始畫面與 JPEG 資料），失敗則返回 None
         """
         try:
-            cap = self.get_camera()
-            if cap is None:
-                self.logger.error(f"無法獲取相機連接（設備 {self.camera_device}）")
-                return None
+            shutter_time = time.time()
+            producer = self.get_camera_producer()
             
-            ret, frame = cap.read()
-            if not ret or frame is None:
-                self.logger.error(f"無法從相機讀取畫面（設備 {self.camera_device}）")
+            # 從緩衝區最近的畫面挑選最清晰的一幀（按下按鈕瞬間的畫面常有動態模糊）
+            entry, sharpness = producer.sharpest_frame(self.best_of_frames, self.best_of_max_age)
+            if entry is None:
+                # 緩衝區沒有夠新的畫面（相機剛開啟）：等待下一幀
+                self.logger.info("緩衝區沒有最近的畫面，等待相機讀取新畫面")
+                entry = producer.wait_for_frame(producer.latest_seq, timeout=self.capture_delay + 2.0)
+                sharpness = producer.sharpness(entry) if entry is not None else None
+            # MJPEG 直通時在此才解碼完整解析度的畫面
+            image = producer.decode(entry) if entry is not None else None
+            if image is None:
+                reason = producer.last_error if entry is None else '畫面解碼失敗'
+                self.logger.error(f"無法從相機讀取畫面（設備 {self.camera_device}）: {reason or '逾時'}")
                 return None
+
+            # 緩衝區中的畫面由所有訂閱者共用，複製一份避免被修改
+            frame = image.copy()
             
-            # 儲存拍攝的圖片
-            if self.save_captured_image:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                image_path = os.path.join(self.image_save_path, f"capture_{timestamp}.jpg")
-                cv2.imwrite(image_path, frame)
-                self.logger.info(f"照片已儲存至: {image_path}")
-            
-            return frame
+            # 唯一一次 JPEG 編碼：同一份資料用於瀏覽器顯示、OpenAI 預分析、OCR 與存檔
+            with self.stage_seconds.time(stage='encode'):
+                _, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.capture_jpeg_quality])
+            capture = Capture(CaptureStore.new_id(), frame, encoded.tobytes(),
+                              sharpness=sharpness, frame_age=shutter_time - entry[1])
+            self.capture_store.add(capture)
+            self.stage_seconds.observe(time.time() - shutter_time, stage='capture')
+            self.payload_bytes.observe(len(capture.jpeg_bytes), kind='capture')
+            self.logger.info(
+                f"照片已拍攝: {capture.id}（{len(capture.jpeg_bytes) / 1024:.1f} KB，"
+                f"清晰度 {sharpness:.1f}，拍攝延遲 {(time.time() - shutter_time) * 1000:.0f} ms）"
+            )
+            return capture
         except Exception as e:
             self.logger.error(f"拍攝照片時發生錯誤: {e}")
             return None
     
-    def send_to_ocr_api(self, frame, custom_prompt=None, user_prompt=None):
+    def send_to_ocr_api(self, frame, custom_prompt=None, user_prompt=None, image_bytes=None, on_partial=None):
         """
         將影像送到 DeepSeek-OCR API 進行辨識
         
@@ -379,6 +1051,8 @@ class BookReaderFlask:
             frame: 要辨識的影像（numpy array）
             custom_prompt: 自訂的 OCR prompt（OpenAI 預分析結果）
             user_prompt: 使用者輸入的 prompt
+            image_bytes: 已編碼的 JPEG 資料（例如前處理結果），提供時不再重新編碼 frame
+            on_partial: 串流辨識時每收到一段文字呼叫 on_partial(新增文字)
             
         Returns:
             辨識結果文字，若失敗則回傳 None
@@ -386,11 +1060,13 @@ class BookReaderFlask:
         self.logger.info("準備將照片送至 OCR API...")
         
         # 將影像編碼為 JPEG 格式
-        _, img_encoded = cv2.imencode('.jpg', frame)
+        if image_bytes is None:
+            _, img_encoded = cv2.imencode('.jpg', frame)
+            image_bytes = img_encoded.tobytes()
         
         # 準備檔案
         files = {
-            'file': ('image.jpg', img_encoded.tobytes(), 'image/jpeg')
+            'file': ('image.jpg', image_bytes, 'image/jpeg')
         }
         
         # 準備提示詞
@@ -409,22 +1085,28 @@ class BookReaderFlask:
         data = {}
         if prompt_to_use:
             data['prompt'] = prompt_to_use
+        headers = None
+        if self.ocr_streaming:
+            data['stream'] = '1'
+            headers = {'Accept': 'text/event-stream, application/json'}
         
         # 發送請求
         self.logger.info(f"發送請求至: {self.api_url}")
         
+        self.payload_bytes.observe(len(image_bytes), kind='ocr_upload')
+        request_start = time.perf_counter()
         try:
-            response = requests.post(
-                self.api_url,
-                files=files,
-                data=data,
-                timeout=self.request_timeout
-            )
+            response = self.ocr_client.post(files, data=data, stream=self.ocr_streaming, headers=headers)
             
             # 檢查回應
             if response.status_code == 200:
-                result = response.json()
-                text = result.get('text', '')
+                if is_stream_response(response):
+                    text = self._read_ocr_stream(response, on_partial)
+                else:
+                    result = response.json()
+                    text = result.get('text', '')
+                self.stage_seconds.observe(time.perf_counter() - request_start, stage='ocr_api')
+                self.ocr_requests_total.inc(outcome='success')
                 
                 # 詳細日誌：記錄返回結果的完整資訊
                 self.logger.info(f"OCR API 返回結果:")
@@ -439,97 +1121,645 @@ class BookReaderFlask:
                 
                 return text
             else:
-                error_msg = response.json().get('error', '未知錯誤')
+                self.stage_seconds.observe(time.perf_counter() - request_start, stage='ocr_api')
+                self.ocr_requests_total.inc(outcome='http_error')
+                # 代理伺服器的 502/503/504 回應可能是 HTML 或空白，不是 JSON
+                try:
+                    body = response.json()
+                    error_msg = body.get('error', '未知錯誤') if isinstance(body, dict) else str(body)[:200]
+                except ValueError:
+                    error_msg = response.text[:200] or '未知錯誤'
                 self.logger.error(f"OCR API 錯誤: HTTP {response.status_code}, {error_msg}")
                 return None
+        except CircuitOpenError as e:
+            self.ocr_requests_total.inc(outcome='circuit_open')
+            self.logger.error(f"OCR API 請求略過: {e}")
+            return None
         except Exception as e:
+            self.ocr_requests_total.inc(outcome='error')
             self.logger.error(f"OCR API 請求失敗: {e}")
             return None
     
-    def process_ocr(self, frame, user_prompt=None):
+    def _read_ocr_stream(self, response, on_partial=None):
+        """
+        讀取串流 OCR 回應
+        
+        Args:
+            response: 串流格式的 requests.Response
+            on_partial: 每收到一段文字呼叫 on_partial(新增文字)
+            
+        Returns:
+            str: 完整文字（伺服器在結束事件提供完整文字時以其為準）
+        """
+        parts = []
+        final_text = None
+        try:
+            for delta, full_text in iter_stream_text(response):
+                if delta:
+                    parts.append(delta)
+                    if on_partial is not None:
+                        on_partial(delta)
+                if full_text is not None:
+                    final_text = full_text
+        finally:
+            response.close()
+        self.logger.info(f"OCR 串流接收完成: {len(parts)} 段")
+        return final_text if final_text is not None else ''.join(parts)
+    
+    def _local_preanalysis(self, frame, info):
+        """
+        本機文字偵測
+        
+        Args:
+            frame: 要分析的影像
+            info: 預分析資訊字典（寫入本機偵測結果）
+            
+        Returns:
+            tuple: (是否執行 OCR, None)；需要詢問 OpenAI 時回傳 None
+        """
+        if self.text_detector is not None:
+            local = self.text_detector.detect(frame)
+            info['local'] = local
+            self.logger.info(
+                f"本機文字偵測: {local['verdict']}（分數 {local['score']}，{local['lines']} 行，{local['ms']} ms）"
+            )
+            if local['verdict'] == TextPresenceDetector.TEXT:
+                return True, None
+            if local['verdict'] == TextPresenceDetector.BLANK:
+                info['reason'] = f"本機偵測未發現文字（文字行面積比例 {local['score']}）"
+                return False, None
+        
+        if not (self.enable_preanalysis and self.openai_service):
+            # 沒有 OpenAI 可詢問（或本機不確定）：保守起見仍執行 OCR
+            return True, None
+        return None
+    
+    def _openai_preanalysis(self, frame, image_bytes, info):
+        """
+        以 OpenAI Vision 預分析
+        
+        Args:
+            frame: 要分析的影像
+            image_bytes: frame 已編碼的 JPEG 資料
+            info: 預分析資訊字典（寫入 OpenAI 耗時與跳過原因）
+            
+        Returns:
+            tuple: (是否執行 OCR, OpenAI 建議的 prompt 或 None)
+        """
+        try:
+            if image_bytes is None:
+                _, img_encoded = cv2.imencode('.jpg', frame)
+                image_bytes = img_encoded.tobytes()
+            
+            start_time = time.time()
+            should_perform_ocr, result = self.openai_service.should_perform_ocr(image_bytes)
+            info['openai_ms'] = round((time.time() - start_time) * 1000, 1)
+            if should_perform_ocr:
+                return True, result
+            info['reason'] = result
+            return False, None
+        except Exception as e:
+            self.logger.error(f"OpenAI 預分析失敗: {e}")
+        
+        return True, None
+    
+    def _prepare_upload(self, frame, image_bytes=None):
+        """
+        準備送往 OCR API 的 JPEG（頁面前處理：裁切、校正、灰階、縮小、調整 JPEG 品質）
+        
+        Args:
+            frame: 要處理的影像
+            image_bytes: frame 已編碼的 JPEG 資料
+            
+        Returns:
+            tuple: (上傳的 JPEG 資料, 前處理資訊字典或 None, 前處理後的影像)
+        """
+        preprocess_info = None
+        upload_bytes = image_bytes
+        image = frame
+        if self.preprocessor is not None:
+            try:
+                with self.stage_seconds.time(stage='preprocess'):
+                    preprocessed = self.preprocessor.process(frame)
+                upload_bytes = preprocessed.jpeg_bytes
+                image = preprocessed.image
+                preprocess_info = preprocessed.to_dict()
+                self.logger.info(
+                    f"頁面前處理完成: {preprocess_info['input_size']} -> {preprocess_info['output_size']}，"
+                    f"{len(upload_bytes) / 1024:.1f} KB（品質 {preprocessed.quality}），"
+                    f"耗時 {preprocess_info['timings_ms']['total']} ms"
+                )
+            except Exception as e:
+                self.logger.error(f"頁面前處理失敗，改送原始影像: {e}")
+        if upload_bytes is None:
+            _, img_encoded = cv2.imencode('.jpg', frame)
+            upload_bytes = img_encoded.tobytes()
+        return upload_bytes, preprocess_info, image
+    
+    def _timed_ocr(self, frame, upload_bytes, custom_prompt=None, user_prompt=None, on_partial=None, image=None):
+        """
+        呼叫 OCR API 並計時（啟用分塊且影像夠大時改為分塊 OCR）
+        
+        Args:
+            image: 前處理後的影像，提供時才考慮分塊
+            
+        Returns:
+            tuple: (辨識結果文字或 None, 耗時毫秒, 分塊資訊字典或 None)
+        """
+        start_time = time.time()
+        tiling_info = None
+        text = None
+        if self.tiling_enabled and image is not None and max(image.shape[:2]) >= self.tiling_min_long_side:
+            text, tiling_info = self.tiled_ocr(image, custom_prompt=custom_prompt, user_prompt=user_prompt)
+        if text is None:
+            # 未分塊、只有一個區塊或分塊失敗：整張送出
+            text = self.send_to_ocr_api(frame, custom_prompt=custom_prompt, user_prompt=user_prompt,
+                                        image_bytes=upload_bytes, on_partial=on_partial)
+        return text, round((time.time() - start_time) * 1000, 1), tiling_info
+    
+    def tiled_ocr(self, image, custom_prompt=None, user_prompt=None):
+        """
+        分塊 OCR：依版面切成欄與區塊，同時送出後依閱讀順序接回文字
+        
+        Args:
+            image: 頁面影像（通常為前處理後的影像）
+            custom_prompt: OpenAI 預分析建議的 prompt
+            user_prompt: 使用者輸入的 prompt
+            
+        Returns:
+            tuple: (文字，只有一個區塊或任一區塊失敗時為 None, 分塊資訊字典)
+        """
+        start_time = time.time()
+        tiles, info = self.tiler.split(image)
+        info['split_ms'] = round((time.time() - start_time) * 1000, 1)
+        if len(tiles) <= 1:
+            info['fallback'] = '只有一個區塊'
+            return None, info
+        
+        def run_tile(tile):
+            tile_start = time.time()
+            if self.preprocessor is not None:
+                tile_bytes, _ = self.preprocessor.encode(tile.image)
+            else:
+                _, encoded = cv2.imencode('.jpg', tile.image)
+                tile_bytes = encoded.tobytes()
+            text = self.send_to_ocr_api(tile.image, custom_prompt=custom_prompt, user_prompt=user_prompt,
+                                        image_bytes=tile_bytes)
+            return text, len(tile_bytes), round((time.time() - tile_start) * 1000, 1)
+        
+        outputs = list(self.tile_executor.map(run_tile, tiles))
+        info['tiles_detail'] = [
+            dict(tile.to_dict(), upload_bytes=size, ms=ms, chars=len(text or ''))
+            for tile, (text, size, ms) in zip(tiles, outputs)
+        ]
+        failed = [tile.index for tile, (text, _, _) in zip(tiles, outputs) if text is None]
+        if failed:
+            # 缺少任何區塊的文字就不完整，改為整張送出
+            self.logger.warning(f"分塊 OCR 有 {len(failed)} 個區塊失敗，改為整張送出")
+            info['fallback'] = f'區塊 {failed} 失敗'
+            return None, info
+        
+        text, info['dedup_chars'] = self.tiler.stitch(tiles, [text for text, _, _ in outputs])
+        info['ms'] = round((time.time() - start_time) * 1000, 1)
+        self.logger.info(
+            f"分塊 OCR 完成: {info['layout']}，{info['groups']} 欄 {len(tiles)} 塊，"
+            f"去除重複 {info['dedup_chars']} 字元，耗時 {info['ms']} ms"
+        )
+        return text, info
+    
+    def compare_tiling(self, frame, user_prompt=None):
+        """
+        以同一張影像比較整張 OCR 與分塊 OCR 的延遲與完整度（依序執行，互不搶奪 OCR 伺服器）
+        
+        Args:
+            frame: 要辨識的影像
+            user_prompt: 使用者輸入的 prompt
+            
+        Returns:
+            dict: single / tiled 的耗時、字元數與行數，以及兩者文字的相似度
+        """
+        upload_bytes, preprocess_info, image = self._prepare_upload(frame)
+        
+        start_time = time.time()
+        single_text = self.send_to_ocr_api(frame, user_prompt=user_prompt, image_bytes=upload_bytes)
+        single_ms = round((time.time() - start_time) * 1000, 1)
+        
+        start_time = time.time()
+        tiled_text, tiling_info = self.tiled_ocr(image, user_prompt=user_prompt)
+        tiled_ms = round((time.time() - start_time) * 1000, 1)
+        
+        def summary(text, ms):
+            text = text or ''
+            return {
+                'ms': ms,
+                'chars': len(''.join(text.split())),
+                'lines': len([line for line in text.splitlines() if line.strip()]),
+                'text': text
+            }
+        
+        # 相似度以去除空白後的文字計算（分塊接回時換行位置可能不同）
+        similarity = None
+        if single_text and tiled_text:
+            similarity = round(difflib.SequenceMatcher(
+                None, ''.join(single_text.split()), ''.join(tiled_text.split()), autojunk=False
+            ).ratio(), 3)
+        return {
+            'image_size': [image.shape[1], image.shape[0]],
+            'preprocess': preprocess_info,
+            'single': dict(summary(single_text, single_ms), upload_bytes=len(upload_bytes)),
+            'tiled': dict(summary(tiled_text, tiled_ms), tiling=tiling_info),
+            'similarity': similarity
+        }
+    
+    def _speculative_ocr_task(self, frame, image_bytes, user_prompt):
+        """
+        推測執行的 OCR（與 OpenAI 預分析同時進行，使用使用者 prompt 或預設 prompt）
+        
+        Returns:
+            tuple: (上傳的 JPEG 資料, 前處理資訊字典或 None, 前處理後的影像,
+                    辨識結果文字或 None, OCR 耗時毫秒, 分塊資訊字典或 None)
+        """
+        upload_bytes, preprocess_info, image = self._prepare_upload(frame, image_bytes)
+        text, ocr_ms, tiling_info = self._timed_ocr(frame, upload_bytes, user_prompt=user_prompt, image=image)
+        return upload_bytes, preprocess_info, image, text, ocr_ms, tiling_info
+    
+    @staticmethod
+    def _normalize_prompt(prompt):
+        """正規化 prompt（統一換行表示、空白與大小寫）以比較差異"""
+        prompt = (prompt or '').replace('\\n', '\n').lower()
+        return ' '.join(prompt.split())
+    
+    def _should_rerun_ocr(self, custom_prompt, user_prompt):
+        """
+        判斷推測執行後是否需要以 OpenAI 建議的 prompt 重新 OCR
+        
+        使用者 prompt 優先於建議 prompt，有使用者 prompt 時推測結果即為最終結果；
+        建議 prompt 與預設 prompt 的相似度低於 rerun_prompt_similarity 才重新執行。
+        """
+        if not self.rerun_on_custom_prompt or not custom_prompt:
+            return False
+        if user_prompt and user_prompt.strip():
+            return False
+        similarity = difflib.SequenceMatcher(
+            None, self._normalize_prompt(custom_prompt), self._normalize_prompt(self.ocr_prompt)
+        ).ratio()
+        return similarity < self.rerun_prompt_similarity
+    
+    def _record_speculative(self, outcome, saved_ms=0.0):
+        """
+        累計推測執行統計
+        
+        Args:
+            outcome: used（採用推測結果）、rerun（以建議 prompt 重新 OCR）、discarded（預分析判定無文字）
+            saved_ms: 相較依序執行節省的毫秒數
+        """
+        with self.speculative_lock:
+            self.speculative_stats['runs'] += 1
+            self.speculative_stats[outcome] += 1
+            self.speculative_stats['saved_ms_total'] += saved_ms
+    
+    def get_speculative_stats(self):
+        """取得推測執行統計（含平均每頁節省的毫秒數）"""
+        with self.speculative_lock:
+            stats = dict(self.speculative_stats)
+        completed = stats['used'] + stats['rerun']
+        stats['saved_ms_total'] = round(stats['saved_ms_total'], 1)
+        stats['avg_saved_ms'] = round(stats['saved_ms_total'] / completed, 1) if completed else 0.0
+        return stats
+    
+    def process_ocr(self, frame, user_prompt=None, image_bytes=None, on_partial=None):
         """
         處理 OCR 辨識
         
         Args:
             frame: 要處理的影像
             user_prompt: 使用者輸入的 prompt
+            image_bytes: frame 已編碼的 JPEG 資料，提供時預分析與 OCR 直接使用，不再重新編碼
+            on_partial: 串流辨識時每收到一段文字呼叫 on_partial(新增文字)；
+                        推測執行的 OCR 可能被捨棄或重新執行，不轉送部分文字
             
         Returns:
             dict: 包含 OCR 結果的字典
         """
-        # 執行 OpenAI 預分析（如果啟用）
+        try:
+            result = self._process_ocr(frame, user_prompt=user_prompt, image_bytes=image_bytes, on_partial=on_partial)
+        except Exception:
+            self.ocr_results_total.inc(outcome='error')
+            raise
+        if result['status'] == 'completed':
+            outcome = 'cached' if result.get('cached') else 'success'
+        else:
+            outcome = result['status']
+        self.ocr_results_total.inc(outcome=outcome)
+        return result
+    
+    def _sent_prompt(self, custom_prompt=None, user_prompt=None):
+        """
+        送往 OCR API 的 prompt（與 send_to_ocr_api() 相同的優先順序：user_prompt > custom_prompt > 預設 prompt）
+        
+        Returns:
+            str: prompt
+        """
+        if user_prompt and user_prompt.strip():
+            return user_prompt.strip()
+        return custom_prompt or self.ocr_prompt
+    
+    def _process_ocr(self, frame, user_prompt=None, image_bytes=None, on_partial=None):
+        """process_ocr() 的處理流程（參數同 process_ocr()）"""
+        # 查詢快取：同一頁（感知雜湊相近）且 prompt 相同時直接回傳先前結果
+        phash = None
+        if self.ocr_cache is not None:
+            phash = perceptual_hash(frame)
+            entry, distance = self.ocr_cache.lookup(phash, self._sent_prompt(user_prompt=user_prompt))
+            if entry is not None:
+                self.logger.info(f"♻️ OCR 快取命中（漢明距離 {distance}），跳過 OCR")
+                return {
+                    'status': 'completed',
+                    'text': entry['text'],
+                    'cached': True,
+                    'cache_distance': distance,
+                    'timestamp': datetime.now().isoformat()
+                }
+        
+        # 執行預分析（如果啟用）
         custom_prompt = None
-        if self.enable_preanalysis and self.openai_service:
-            try:
-                _, img_encoded = cv2.imencode('.jpg', frame)
-                image_data = img_encoded.tobytes()
-                
-                should_perform_ocr, result = self.openai_service.should_perform_ocr(image_data)
-                
-                if should_perform_ocr:
-                    custom_prompt = result
-                    self.logger.info(f"✅ 圖像包含文字，將執行 OCR")
-                else:
-                    self.logger.info(f"❌ 圖像不包含文字，跳過 OCR")
-                    return {
-                        'status': 'skipped',
-                        'skip_reason': result,
-                        'timestamp': datetime.now().isoformat()
-                    }
-            except Exception as e:
-                self.logger.error(f"OpenAI 預分析失敗: {e}")
+        preanalysis = None
+        speculative = None
+        if self.preanalysis_backend != 'none':
+            preanalysis = {'backend': self.preanalysis_backend}
+            preanalysis_start = time.perf_counter()
+            decision = self._local_preanalysis(frame, preanalysis)
+            if decision is None:
+                # 需要詢問 OpenAI：推測模式下同時以預設 prompt 開始 OCR
+                if self.speculative_ocr:
+                    wall_start = time.time()
+                    speculative = self.speculative_executor.submit(
+                        self._speculative_ocr_task, frame, image_bytes, user_prompt
+                    )
+                decision = self._openai_preanalysis(frame, image_bytes, preanalysis)
+            self.stage_seconds.observe(time.perf_counter() - preanalysis_start, stage='preanalysis')
+            should_perform_ocr, custom_prompt = decision
+            if should_perform_ocr:
+                self.logger.info(f"✅ 圖像包含文字，將執行 OCR")
+            else:
+                self.logger.info(f"❌ 圖像不包含文字，跳過 OCR")
+                if speculative is not None:
+                    # 尚未開始的 OCR 直接取消；已送出的請求無法中斷，結果捨棄
+                    preanalysis['speculative'] = 'cancelled' if speculative.cancel() else 'discarded'
+                    self._record_speculative('discarded')
+                    self.logger.info(f"推測執行的 OCR 已{'取消' if preanalysis['speculative'] == 'cancelled' else '捨棄'}")
+                return {
+                    'status': 'skipped',
+                    'skip_reason': preanalysis.get('reason'),
+                    'preanalysis': preanalysis,
+                    'timestamp': datetime.now().isoformat()
+                }
         
-        # 執行 OCR（使用 user_prompt 或 custom_prompt）
-        text = self.send_to_ocr_api(frame, custom_prompt=custom_prompt, user_prompt=user_prompt)
+        if speculative is not None:
+            upload_bytes, preprocess_info, image, text, ocr_ms, tiling_info = speculative.result()
+            preanalysis_ms = preanalysis.get('openai_ms', 0.0)
+            preprocess_ms = preprocess_info['timings_ms']['total'] if preprocess_info else 0.0
+            rerun = self._should_rerun_ocr(custom_prompt, user_prompt)
+            # 未重新執行時最終結果來自使用者或預設 prompt
+            sent_custom_prompt = custom_prompt if rerun else None
+            final_ocr_ms = ocr_ms
+            if rerun:
+                self.logger.info("OpenAI 建議的 Prompt 與預設不同，重新執行 OCR")
+                text, final_ocr_ms, tiling_info = self._timed_ocr(frame, upload_bytes, custom_prompt=custom_prompt,
+                                                                  user_prompt=user_prompt, image=image)
+            elif custom_prompt:
+                self.logger.info("採用預設 Prompt 的推測結果（未以 OpenAI 建議的 Prompt 重新執行）")
+            
+            # 依序執行的耗時 = 預分析 + 前處理 + 最終 OCR；牆鐘時間自送出推測 OCR 起算
+            wall_ms = round((time.time() - wall_start) * 1000, 1)
+            sequential_ms = round(preanalysis_ms + preprocess_ms + final_ocr_ms, 1)
+            saved_ms = round(sequential_ms - wall_ms, 1)
+            self._record_speculative('rerun' if rerun else 'used', saved_ms)
+            self.logger.info(f"推測執行: 牆鐘 {wall_ms} ms，依序執行估計 {sequential_ms} ms，節省 {saved_ms} ms")
+            
+            timing = {
+                'upload_bytes': len(upload_bytes),
+                'ocr_ms': final_ocr_ms,
+                'speculative': {
+                    'rerun': rerun,
+                    'speculative_ocr_ms': ocr_ms,
+                    'preanalysis_ms': preanalysis_ms,
+                    'wall_ms': wall_ms,
+                    'sequential_ms': sequential_ms,
+                    'saved_ms': saved_ms
+                }
+            }
+        else:
+            upload_bytes, preprocess_info, image = self._prepare_upload(frame, image_bytes)
+            
+            # 記錄第一段串流文字的延遲（使用者開始看到文字的時間）
+            first_partial_at = []
+            forward_partial = None
+            if on_partial is not None:
+                def forward_partial(delta):
+                    if not first_partial_at:
+                        first_partial_at.append(time.time())
+                    on_partial(delta)
+            
+            # 執行 OCR（使用 user_prompt 或 custom_prompt）
+            sent_custom_prompt = custom_prompt
+            ocr_start = time.time()
+            text, ocr_ms, tiling_info = self._timed_ocr(frame, upload_bytes, custom_prompt=custom_prompt,
+                                                        user_prompt=user_prompt, on_partial=forward_partial,
+                                                        image=image)
+            timing = {
+                'upload_bytes': len(upload_bytes),
+                'ocr_ms': ocr_ms
+            }
+            if first_partial_at:
+                timing['first_partial_ms'] = round((first_partial_at[0] - ocr_start) * 1000, 1)
+        if tiling_info is not None:
+            timing['tiling'] = tiling_info
+            if 'fallback' not in tiling_info:
+                timing['upload_bytes'] = sum(tile['upload_bytes'] for tile in tiling_info['tiles_detail'])
+        if preprocess_info is not None:
+            timing['preprocess'] = preprocess_info
+        if preanalysis is not None:
+            timing['preanalysis'] = preanalysis
         
         if text is not None and text.strip():
-            return {
+            if phash is not None:
+                # 以實際送出的 prompt 保存（OpenAI 建議的 prompt 產生的文字不會被當成預設 prompt 的結果）
+                self.ocr_cache.store(phash, self._sent_prompt(sent_custom_prompt, user_prompt), text)
+            return dict(timing, **{
                 'status': 'completed',
                 'text': text,
+                'cached': False,
                 'timestamp': datetime.now().isoformat()
-            }
+            })
         else:
-            return {
+            return dict(timing, **{
                 'status': 'error',
                 'error': 'OCR API 返回空結果',
                 'timestamp': datetime.now().isoformat()
-            }
+            })
     
-    def add_ocr_result(self, frame, result):
+    def add_ocr_result(self, frame, result, image_bytes=None, image_path=None):
         """
-        添加 OCR 結果到列表
+        添加 OCR 結果到存儲
         
         Args:
             frame: 原始影像
             result: OCR 結果字典
+            image_bytes: frame 已編碼的 JPEG 資料，提供時直接寫入檔案，不再重新編碼
+            image_path: 已存在的圖片路徑（例如批次 OCR 的來源圖片），提供時直接引用，不另存副本
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        persist_start = time.perf_counter()
+        # 包含微秒，同一秒內完成的多個 OCR 工作 ID 不會重複
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
         
-        # 保存圖片
-        if self.save_captured_image:
-            image_path = os.path.join(self.image_save_path, f"capture_{timestamp}.jpg")
-            cv2.imwrite(image_path, frame)
-            # 保存相對路徑（相對於 static 目錄）
+        # 保存圖片（以內容雜湊命名，超過容量上限時由照片存儲在背景淘汰舊照片）
+        if image_path is not None:
+            # 與照片存儲的路徑同為絕對路徑，照片淘汰時才能找到引用的結果
+            image_path = normalize_image_path(image_path)
             result['image_path'] = image_path
+        elif self.image_store is not None:
+            if image_bytes is None:
+                _, encoded = cv2.imencode('.jpg', frame)
+                image_bytes = encoded.tobytes()
+            image_path = self.image_store.path(self.image_store.put(image_bytes))
+            result['image_path'] = image_path
+        
+        # 在背景產生縮圖（圖片目錄以外的圖片沒有可訪問的 URL，不產生）
+        if self.thumbnails is not None and image_path is not None:
+            filename = self.thumbnails.relative_name(image_path)
+            if filename is not None:
+                self.thumbnails.schedule(filename, frame)
         
-        # 添加到結果列表
+        # 添加到結果存儲（只新增一列，歷史紀錄不設上限）
         result['id'] = timestamp
         result['datetime'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        seq = self.result_store.add(result)
+        self.stage_seconds.observe(time.perf_counter() - persist_start, stage='persist')
+        # 推送給開著的網頁（只傳這一筆，不需重新載入歷史）
+        self.result_events.publish('added', result=self.with_image_urls([dict(result, seq=seq)])[0])
         
-        self.ocr_results.insert(0, result)  # 插入到開頭，最新的在前面
+        self.logger.info(f"OCR 結果已添加: {result['id']}")
+    
+    def with_image_urls(self, results):
+        """
+        將圖片路徑轉換為可訪問的 URL（image_url 與各寬度縮圖的 thumbnail_urls）
         
-        # 限制結果數量（保留最近 100 條）
-        if len(self.ocr_results) > 100:
-            self.ocr_results = self.ocr_results[:100]
+        Args:
+            results: 結果字典列表（直接修改）
         
-        # 保存到文件
-        self._save_ocr_results()
+        Returns:
+            list: 同一個列表
+        """
+        save_path = os.path.abspath(self.image_save_path)
+        for result in results:
+            if result.get('image_path'):
+                # 圖片目錄以外的圖片（例如以 CLI 批次處理其他資料夾）沒有可訪問的 URL
+                filename = os.path.relpath(os.path.abspath(result['image_path']), save_path)
+                if not filename.startswith(os.pardir):
+                    filename = filename.replace(os.sep, '/')
+                    result['image_url'] = '/captured_images/' + filename
+                    if self.thumbnails is not None:
+                        # 寬度 -> URL，瀏覽器依顯示寬度挑選（srcset）
+                        result['thumbnail_urls'] = {
+                            str(size): f'/thumbnails/{size}/{filename}' for size in self.thumbnails.sizes
+                        }
+        return results
+    
+    def submit_ocr_job(self, frame, user_prompt=None, image_bytes=None, rotation=0, max_size=0, capture_id=None):
+        """
+        將 OCR 工作排入非同步佇列
         
-        self.logger.info(f"OCR 結果已添加: {result['id']}")
+        Args:
+            frame: 要處理的影像
+            user_prompt: 使用者輸入的 prompt
+            image_bytes: frame 已編碼的 JPEG 資料（拍攝時的編碼）
+            rotation: 順時針旋轉角度（0 / 90 / 180 / 270）
+            max_size: 長邊上限（像素），0 表示不縮小
+            capture_id: 拍攝 ID（記錄在結果中）
+            
+        Returns:
+            OCRJob: 新建立的工作
+            
+        Raises:
+            QueueFullError: 等待中的工作已達上限
+        """
+        return self.ocr_queue.submit({
+            'frame': frame,
+            'user_prompt': user_prompt,
+            'image_bytes': image_bytes,
+            'rotation': rotation,
+            'max_size': max_size,
+            'capture_id': capture_id
+        })
+    
+    @staticmethod
+    def transform_frame(frame, rotation=0, max_size=0):
+        """
+        旋轉與縮小影像（取代瀏覽器端的 processImage）
+        
+        Args:
+            frame: 影像
+            rotation: 順時針旋轉角度（0 / 90 / 180 / 270）
+            max_size: 長邊上限（像素），0 表示不縮小
+            
+        Returns:
+            tuple: (影像, 是否有變更)
+        """
+        changed = False
+        rotate_codes = {
+            90: cv2.ROTATE_90_CLOCKWISE,
+            180: cv2.ROTATE_180,
+            270: cv2.ROTATE_90_COUNTERCLOCKWISE
+        }
+        if rotation in rotate_codes:
+            frame = cv2.rotate(frame, rotate_codes[rotation])
+            changed = True
+        
+        height, width = frame.shape[:2]
+        if max_size and max(height, width) > max_size:
+            scale = max_size / float(max(height, width))
+            frame = cv2.resize(frame, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_AREA)
+            changed = True
+        return frame, changed
+    
+    def _run_ocr_job(self, job):
+        """
+        OCR 工作執行緒的處理函數：執行 OCR 並保存結果
+        
+        Args:
+            job: OCRJob 物件
+            
+        Returns:
+            dict: OCR 結果字典
+        """
+        payload = job.payload
+        frame, changed = self.transform_frame(payload['frame'], payload.get('rotation', 0), payload.get('max_size', 0))
+        image_bytes = payload.get('image_bytes')
+        if changed:
+            # 旋轉或縮小後重新編碼一次，供預分析、OCR 與存檔共用
+            with self.stage_seconds.time(stage='encode'):
+                _, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.capture_jpeg_quality])
+            image_bytes = encoded.tobytes()
+        
+        # 串流辨識的部分文字以 partial 事件推送給瀏覽器
+        on_partial = None
+        if self.ocr_streaming:
+            def on_partial(delta):
+                job.add_partial(delta, self.stream_partial_interval)
+        
+        result = self.process_ocr(frame, user_prompt=payload.get('user_prompt'), image_bytes=image_bytes,
+                                  on_partial=on_partial)
+        if payload.get('capture_id'):
+            result['capture_id'] = payload['capture_id']
+        self.add_ocr_result(frame, result, image_bytes=image_bytes)
+        return result
 
 
 # 初始化 BookReader
 reader = BookReaderFlask()
+reader.startup_timings['import_ms'] = round((time.perf_counter() - _IMPORT_STARTED) * 1000, 1)
+reader.logger.info(f"模組載入完成（{reader.startup_timings['import_ms']} ms）")
 
 
 @app.route('/')
@@ -538,33 +1768,74 @@ def index():
     # 預設 prompt
     default_prompt = "這是一本繁體中文書的內頁screen, 請OCR 並用繁體中文輸出結果。"
     
-    # 偵測可用相機
-    available_cameras = reader.detect_available_cameras()
+    # 相機列表來自快取（不開啟設備）
+    available_cameras = reader.list_cameras()
     current_camera_id = reader.camera_device
     
     return render_template('book_reader.html', 
                          default_prompt=default_prompt,
                          available_cameras=available_cameras,
-                         current_camera_id=current_camera_id)
+                         current_camera_id=current_camera_id,
+                         preview_transport=reader.preview_transport)
+
+
+def _send_image(path, filename):
+    """
+    以 ETag 提供圖片（瀏覽器以 If-None-Match 重新驗證時回傳 304）
+    
+    照片存儲管理的照片（以內容雜湊命名的 store/ 與舊版 capture_*.jpg）及其縮圖不會再變更，可長期快取；
+    批次 OCR 引用的其他圖片可能被使用者替換，每次使用前重新驗證。
+    
+    Args:
+        path: 圖片檔案路徑
+        filename: 圖片在圖片目錄中的相對路徑
+    """
+    if ImageStore.is_managed(filename):
+        # 記錄檢視時間，淘汰時保留最近檢視過的照片
+        if reader.image_store is not None:
+            reader.image_store.touch(filename)
+        response = send_file(path, max_age=reader.image_cache_max_age)
+        response.cache_control.immutable = True
+        return response
+    return send_file(path, max_age=0)
 
 
 @app.route('/captured_images/<path:filename>')
 def captured_images(filename):
     """提供 captured_images 目錄中的圖片"""
-    from flask import send_from_directory
-    image_path = os.path.join(reader.image_save_path, filename)
-    if os.path.exists(image_path):
-        directory = os.path.dirname(image_path)
-        return send_from_directory(directory, filename)
-    return 'File not found', 404
+    # filename 可包含子資料夾（批次 OCR 引用的圖片），safe_join 會拒絕跳出目錄的路徑
+    image_path = safe_join(os.path.abspath(reader.image_save_path), filename)
+    if image_path is None or not os.path.isfile(image_path):
+        return 'File not found', 404
+    return _send_image(image_path, filename)
 
 
-@app.route('/api/camera/stream')
-def camera_stream():
-    """相機串流（Server-Sent Events）"""
-    # 從查詢參數獲取相機設備 ID 和解析度
-    camera_id = request.args.get('camera_id', type=int)
-    resolution = request.args.get('resolution', type=str)
+@app.route('/thumbnails/<int:size>/<path:filename>')
+def thumbnail(size, filename):
+    """圖片目錄中圖片的縮圖（背景尚未產生或舊的歷史結果在此時產生）"""
+    if reader.thumbnails is None:
+        return 'File not found', 404
+    path = reader.thumbnails.get(filename, size)
+    if path is None:
+        return 'File not found', 404
+    return _send_image(path, filename)
+
+
+def _parse_stream_args(args=None):
+    """
+    解析串流連線參數
+    
+    Args:
+        args: 查詢參數（werkzeug MultiDict），預設為目前請求的 request.args
+              （book_reader_server.py 的事件迴圈串流不經過 Flask 請求）
+    
+    Returns:
+        tuple: (相機設備 ID, JPEG 品質, 最高 FPS, 變化偵測器或 None)
+    """
+    if args is None:
+        args = request.args
+    camera_id = args.get('camera_id', type=int)
+    resolution = args.get('resolution', type=str)
     
     # 如果提供了解析度參數，更新設定
     if resolution:
@@ -576,85 +1847,134 @@ def camera_stream():
         except Exception as e:
             reader.logger.warning(f"解析解析度參數失敗: {e}")
     
-    def generate():
-        consecutive_errors = 0
-        max_consecutive_errors = 10  # 連續錯誤超過10次則停止
-        cap = None
-        last_camera_id = None
+    # 每個連線可自訂 JPEG 品質與 FPS，未提供時使用 config.ini 的設定
+    quality = args.get('quality', type=int) or reader.stream_jpeg_quality
+    quality = max(10, min(100, quality))
+    fps = args.get('fps', type=float) or reader.stream_max_fps
+    fps = max(1.0, min(60.0, fps))
+    
+    # 變化偵測可由連線參數 gate=0/1 覆寫
+    gate = args.get('gate', type=str)
+    change_detection = reader.stream_change_detection if gate is None else gate not in ('0', 'false')
+    detector = reader.create_change_detector() if change_detection else None
+    
+    target_device = camera_id if camera_id is not None else reader.camera_device
+    return target_device, quality, fps, detector
+
+
+def _subscribe_frames(target_device, fps, detector=None, stats=None):
+    """
+    訂閱共用的影像生產者，依 FPS 上限產生畫面
+    
+    Args:
+        target_device: 相機設備 ID
+        fps: 最高傳送 FPS
+        detector: 畫面變化偵測器，提供時略過與上次送出相比沒有改變的畫面
+        stats: 串流統計（記錄略過與丟棄的畫面）
         
+    Yields:
+        tuple: ('frame', (seq, timestamp, frame), producer)、('error', 訊息, producer)
+               或連續錯誤過多時的 ('fatal', 訊息, producer)
+    """
+    consecutive_errors = 0
+    max_consecutive_errors = 10  # 連續錯誤超過10次則停止
+    min_interval = 1.0 / fps
+    producer = None
+    last_seq = 0
+    last_sent = 0.0
+    
+    def advance(seq):
+        # 兩次送出（或略過）之間相機讀取的其他畫面記為丟棄
+        if stats is not None and last_seq and seq > last_seq + 1:
+            stats.record_drop(seq - last_seq - 1)
+        return seq
+    
+    try:
+        while True:
+            # 訂閱共用的影像生產者（不再各自開啟相機）；生產者被停止時（如切換解析度）重新訂閱
+            if producer is None or not producer.is_alive():
+                if producer is not None:
+                    producer.unsubscribe()
+                producer = reader.get_camera_producer(target_device)
+                producer.subscribe()
+                last_seq = 0
+                reader.logger.info(f"串流已訂閱相機設備 {target_device}（訂閱者 {producer.subscriber_count}）")
+            
+            latest = producer.wait_for_frame(last_seq, timeout=max(1.0, reader.capture_delay + 0.5))
+            if latest is None:
+                consecutive_errors += 1
+                error = producer.last_error or '無法讀取相機畫面'
+                if consecutive_errors <= max_consecutive_errors:
+                    yield 'error', error, producer
+                else:
+                    yield 'fatal', '相機讀取失敗，請檢查連接', producer
+                    return
+                continue
+            
+            consecutive_errors = 0  # 重置錯誤計數
+            
+            # 限制傳送速率，等待後改用最新的畫面（在變化偵測之前，送出的畫面即是偵測比較的畫面）
+            elapsed = time.monotonic() - last_sent
+            if elapsed < min_interval:
+                time.sleep(min_interval - elapsed)
+                latest = producer.latest() or latest
+            
+            # 畫面沒有明顯變化時略過（到達保活間隔仍會送出）
+            if detector is not None:
+                cpu_start = time.thread_time()
+                # MJPEG 直通時只解碼縮小的灰階影像
+                image = producer.analysis_image(latest, detector.sample_width)
+                send = image is not None and detector.should_send(image)[0]
+                if not send:
+                    last_seq = advance(latest[0])
+                    if stats is not None:
+                        stats.record_skip(time.thread_time() - cpu_start)
+                    continue
+            
+            last_sent = time.monotonic()
+            
+            last_seq = advance(latest[0])
+            yield 'frame', latest, producer
+    finally:
+        # 取消訂閱（相機由生產者管理，閒置逾時後自動釋放）
+        if producer is not None:
+            producer.unsubscribe()
+            reader.logger.info("串流結束，已取消訂閱相機")
+
+
+@app.route('/api/camera/stream')
+def camera_stream():
+    """
+    相機串流（Server-Sent Events）
+    
+    查詢參數 frames=0 時只傳送狀態與錯誤訊息（搭配 /api/camera/mjpeg 使用），
+    否則以 base64 JSON 傳送畫面（舊方式）。
+    """
+    target_device, quality, fps, detector = _parse_stream_args()
+    
+    if request.args.get('frames', '1') == '0':
+        return Response(_generate_stream_status(target_device), mimetype='text/event-stream')
+    
+    def generate():
+        stats = stream_stats['sse']
+        stats.connection_opened()
+        frames = _subscribe_frames(target_device, fps, detector, stats)
         try:
-            while True:
-                # 只在首次或相機ID變更時獲取相機
-                if cap is None or camera_id != last_camera_id:
-                    # 釋放舊相機（如果是獨立實例）
-                    if cap is not None:
-                        cap.release()
-                        cap = None
-                        time.sleep(0.2)  # 等待資源釋放
-                    
-                    # 創建獨立的相機實例（不使用全局單例，避免資源競爭）
-                    target_device = camera_id if camera_id is not None else reader.camera_device
-                    cap = cv2.VideoCapture(target_device)
-                    
-                    if cap.isOpened():
-                        cap.set(cv2.CAP_PROP_FRAME_WIDTH, reader.frame_width)
-                        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, reader.frame_height)
-                        time.sleep(reader.capture_delay)  # 等待相機初始化
-                        reader.logger.info(f"串流相機初始化成功: 設備 {target_device}")
-                    else:
-                        reader.logger.warning(f"串流無法打開相機設備 {target_device}")
-                    
-                    last_camera_id = camera_id
-                    
-                    if cap is None or not cap.isOpened():
-                        consecutive_errors += 1
-                        if consecutive_errors <= max_consecutive_errors:
-                            yield f"data: {json.dumps({'error': '無法打開相機'})}\n\n"
-                        else:
-                            yield f"data: {json.dumps({'error': '相機無法打開，請檢查設備'})}\n\n"
-                            break
-                        time.sleep(0.5)  # 等待後重試
-                        continue
+            for kind, payload, producer in frames:
+                if kind != 'frame':
+                    yield f"data: {json.dumps({'error': payload})}\n\n"
+                    continue
                 
-                # 讀取畫面
-                if cap is not None and cap.isOpened():
-                    ret, frame = cap.read()
-                    if ret and frame is not None:
-                        # 轉換 BGR 到 RGB
-                        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                        # 編碼為 JPEG
-                        _, buffer = cv2.imencode('.jpg', frame_rgb, [cv2.IMWRITE_JPEG_QUALITY, 85])
-                        frame_bytes = buffer.tobytes()
-                        frame_base64 = base64.b64encode(frame_bytes).decode('utf-8')
-                        
-                        yield f"data: {json.dumps({'frame': frame_base64})}\n\n"
-                        consecutive_errors = 0  # 重置錯誤計數
-                    else:
-                        consecutive_errors += 1
-                        if consecutive_errors <= max_consecutive_errors:
-                            yield f"data: {json.dumps({'error': '無法讀取相機畫面'})}\n\n"
-                        else:
-                            yield f"data: {json.dumps({'error': '相機讀取失敗，請檢查連接'})}\n\n"
-                            # 標記相機需要重新獲取
-                            if cap is not None:
-                                cap.release()
-                            cap = None
-                            consecutive_errors = 0
-                            time.sleep(0.5)  # 等待後重試
-                            continue
-                else:
-                    # 相機已關閉，需要重新獲取
-                    if cap is not None:
-                        cap.release()
-                    cap = None
-                    consecutive_errors += 1
-                    if consecutive_errors <= max_consecutive_errors:
-                        yield f"data: {json.dumps({'error': '相機連接已斷開'})}\n\n"
-                    else:
-                        yield f"data: {json.dumps({'error': '相機連接失敗，請檢查設備'})}\n\n"
-                        break
+                cpu_start = time.thread_time()
+                # 與 MJPEG 串流共用編碼快取（MJPEG 直通時直接使用相機的 JPEG）
+                frame_bytes = producer.encode_jpeg(payload, quality)
+                if frame_bytes is None:
+                    continue
+                frame_base64 = base64.b64encode(frame_bytes).decode('utf-8')
+                message = f"data: {json.dumps({'frame': frame_base64})}\n\n"
+                stats.record_frame(len(message), time.thread_time() - cpu_start)
                 
-                time.sleep(0.033)  # 約 30 FPS
+                yield message
         except GeneratorExit:
             # 客戶端斷開連接
             reader.logger.info("客戶端斷開串流連接")
@@ -662,21 +1982,149 @@ def camera_stream():
             reader.logger.error(f"串流發生錯誤: {e}")
             yield f"data: {json.dumps({'error': f'串流錯誤: {str(e)}'})}\n\n"
         finally:
-            # 清理資源
-            if cap is not None:
-                cap.release()
-                reader.logger.info("串流結束，已釋放相機資源")
+            frames.close()
+            stats.connection_closed()
     
     return Response(generate(), mimetype='text/event-stream')
 
 
+def _generate_stream_status(target_device):
+    """
+    僅傳送狀態與錯誤的 SSE 串流（不傳送畫面、不編碼）
+    
+    訂閱生產者但不計為觀看者：與 MJPEG 連線並存時，MJPEG 連線中斷也不會因閒置逾時
+    停止相機後又立即重新開啟（與 book_reader_server 的狀態串流相同）
+    
+    Args:
+        target_device: 相機設備 ID
+    """
+    producer = None
+    last_seq = 0
+    last_frames_read = 0
+    last_report = time.monotonic()
+    
+    try:
+        while True:
+            if producer is None or not producer.is_alive():
+                if producer is not None:
+                    producer.unsubscribe()
+                producer = reader.get_camera_producer(target_device)
+                producer.subscribe()
+                last_seq = 0
+                last_frames_read = producer.frames_read
+            
+            latest = producer.wait_for_frame(last_seq, timeout=max(1.0, reader.capture_delay + 0.5))
+            if latest is None:
+                yield f"data: {json.dumps({'error': producer.last_error or '無法讀取相機畫面'})}\n\n"
+                continue
+            last_seq = latest[0]
+            
+            # 每秒回報一次狀態
+            now = time.monotonic()
+            camera_fps = (producer.frames_read - last_frames_read) / max(now - last_report, 1e-6)
+            last_frames_read = producer.frames_read
+            last_report = now
+            # 不計入狀態串流本身的訂閱
+            subscribers = producer.subscriber_count - 1
+            yield f"data: {json.dumps({'status': 'streaming', 'camera_fps': round(camera_fps, 1), 'subscribers': subscribers})}\n\n"
+            time.sleep(1.0)
+    except GeneratorExit:
+        reader.logger.info("客戶端斷開串流狀態連接")
+    finally:
+        if producer is not None:
+            producer.unsubscribe()
+
+
+@app.route('/api/camera/mjpeg')
+def camera_mjpeg():
+    """
+    相機串流（multipart/x-mixed-replace JPEG，可直接給 <img> 使用）
+    
+    查詢參數：camera_id、resolution、quality（JPEG 品質）、fps（最高 FPS）、gate（變化偵測 0/1）
+    """
+    target_device, quality, fps, detector = _parse_stream_args()
+    
+    def generate():
+        stats = stream_stats['mjpeg']
+        stats.connection_opened()
+        frames = _subscribe_frames(target_device, fps, detector, stats)
+        try:
+            # 每個部分結尾立即送出下一個 boundary，瀏覽器收到後即可顯示（畫面略過期間不會卡住最後一幀）
+            yield b'--frame\r\n'
+            for kind, payload, producer in frames:
+                if kind != 'frame':
+                    # 二進位串流無法夾帶錯誤訊息，由 SSE 狀態通道回報
+                    reader.logger.debug(f"MJPEG 串流略過錯誤: {payload}")
+                    continue
+                
+                cpu_start = time.thread_time()
+                # 同一畫面與品質只編碼一次，所有觀看者共用
+                jpeg = producer.encode_jpeg(payload, quality)
+                if jpeg is None:
+                    continue
+                part = (b'Content-Type: image/jpeg\r\nContent-Length: ' +
+                        str(len(jpeg)).encode() + b'\r\n\r\n' + jpeg + b'\r\n--frame\r\n')
+                stats.record_frame(len(part), time.thread_time() - cpu_start)
+                
+                yield part
+        except GeneratorExit:
+            reader.logger.info("客戶端斷開 MJPEG 串流連接")
+        except Exception as e:
+            reader.logger.error(f"MJPEG 串流發生錯誤: {e}")
+        finally:
+            frames.close()
+            stats.connection_closed()
+    
+    response = Response(generate(), mimetype='multipart/x-mixed-replace; boundary=frame')
+    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
+    return response
+
+
+@app.route('/api/camera/stream/stats', methods=['GET'])
+def camera_stream_stats():
+    """串流傳輸統計（比較 SSE 與 MJPEG 的頻寬與伺服器 CPU 成本）"""
+    return jsonify({transport: stats.snapshot() for transport, stats in stream_stats.items()})
+
+
+@app.route('/metrics')
+def metrics():
+    """執行指標（Prometheus 文字格式）"""
+    if not reader.metrics_enabled:
+        return jsonify({'error': '執行指標未啟用'}), 404
+    return Response(reader.metrics.render(), content_type=METRICS_CONTENT_TYPE)
+
+
+@app.route('/healthz')
+def healthz():
+    """存活檢查：行程能回應即回傳 200（不觸發任何子系統建立）"""
+    return jsonify({
+        'status': 'ok',
+        'uptime_s': round(time.time() - reader.started_at, 1),
+        'startup': reader.startup_timings
+    })
+
+
+@app.route('/readyz')
+def readyz():
+    """就緒檢查：必要子系統（結果存儲、OCR API 用戶端）都已建立時回傳 200，否則 503"""
+    status = reader.readiness()
+    return jsonify(status), 200 if status['ready'] else 503
+
+
 @app.route('/api/camera/list', methods=['GET'])
 def get_camera_list():
-    """獲取可用相機列表"""
-    cameras = reader.detect_available_cameras()
+    """
+    獲取可用相機列表
+    
+    查詢參數:
+        refresh: 1 表示立即重新列舉（預設使用背景更新的快取）
+    """
+    refresh = request.args.get('refresh', '0').lower() in ('1', 'true', 'yes')
+    cameras = reader.list_cameras(refresh=refresh)
     return jsonify({
         'cameras': cameras,
-        'current_camera_id': reader.camera_device
+        'current_camera_id': reader.camera_device,
+        'discovery': reader.camera_discovery.info()
     })
 
 
@@ -707,8 +2155,6 @@ def set_camera():
 @app.route('/api/camera/resolution', methods=['POST'])
 def set_camera_resolution():
     """設定相機解析度"""
-    global camera_cap, current_camera_device
-    
     data = request.json
     width = data.get('width')
     height = data.get('height')
@@ -722,18 +2168,14 @@ def set_camera_resolution():
         reader.frame_height = int(height)
         reader.logger.info(f"相機解析度已更新為: {width}x{height}")
         
-        # 強制釋放並重新初始化相機，以套用新的解析度
-        with camera_lock:
-            if camera_cap is not None:
-                camera_cap.release()
-                camera_cap = None
-                current_camera_device = None
-                reader.logger.info("已釋放相機資源，等待重新初始化")
-        
-        # 在鎖外等待更長時間，讓相機資源完全釋放
-        time.sleep(1.0)  # 增加等待時間到 1 秒
-        
-        # 重新初始化相機（下次拍攝時會自動初始化）
+        # 停止影像生產者並釋放相機，以套用新的解析度
+        reader.release_camera()
+        reader.logger.info("已釋放相機資源，等待重新初始化")
+
+        # 等待相機資源完全釋放
+        time.sleep(1.0)
+
+        # 重新初始化相機（串流訂閱者或下次拍攝時會以新解析度重新啟動生產者）
         reader.logger.info("相機將在下次使用時以新解析度初始化")
         
         return jsonify({
@@ -754,9 +2196,9 @@ def set_camera_resolution():
 def camera_capture():
     """拍攝照片"""
     try:
-        frame = reader.capture_frame()
+        capture = reader.capture_frame()
         
-        if frame is None:
+        if capture is None:
             error_msg = (
                 f'無法拍攝照片。可能的原因：\n'
                 f'1. 相機設備 {reader.camera_device} 無法打開\n'
@@ -770,13 +2212,16 @@ def camera_capture():
                 'error': error_msg
             }), 500
         
-        # 轉換為 base64
-        _, buffer = cv2.imencode('.jpg', frame)
-        frame_base64 = base64.b64encode(buffer).decode('utf-8')
-        
+        # 只回傳拍攝 ID 與圖片網址，影像不以 base64 往返
+        height, width = capture.frame.shape[:2]
         return jsonify({
             'success': True,
-            'frame': frame_base64
+            'capture_id': capture.id,
+            'image_url': f'/api/camera/captures/{capture.id}.jpg',
+            'width': width,
+            'height': height,
+            'sharpness': round(capture.sharpness, 1) if capture.sharpness is not None else None,
+            'frame_age_ms': round(capture.frame_age * 1000, 1)
         })
     except Exception as e:
         error_msg = f'拍攝照片時發生未預期的錯誤: {str(e)}'
@@ -787,23 +2232,61 @@ def camera_capture():
         }), 500
 
 
+@app.route('/api/camera/captures/<capture_id>.jpg')
+def get_capture_image(capture_id):
+    """拍攝的照片（拍攝時編碼的 JPEG，不重新編碼）"""
+    capture = reader.capture_store.get(capture_id)
+    if capture is None:
+        return jsonify({'error': f'找不到拍攝 {capture_id}（可能已逾時）'}), 404
+    response = Response(capture.jpeg_bytes, mimetype='image/jpeg')
+    response.headers['Cache-Control'] = 'private, max-age=600'
+    return response
+
+
 @app.route('/api/ocr/process', methods=['POST'])
 def ocr_process():
-    """處理 OCR 辨識"""
-    data = request.json
+    """
+    處理 OCR 辨識
     
-    # 獲取 base64 編碼的圖片
-    frame_base64 = data.get('frame')
-    if not frame_base64:
-        return jsonify({'error': '沒有提供圖片'}), 400
+    JSON 參數：
+        capture_id: /api/camera/capture 回傳的拍攝 ID（建議）
+        frame: base64 編碼的 JPEG（沒有 capture_id 時使用，例如 SSE 預覽的畫面）
+        prompt: 使用者輸入的 prompt
+        rotation: 順時針旋轉角度（0 / 90 / 180 / 270）
+        max_size: 長邊上限（像素），0 表示不縮小
+    """
+    data = request.json or {}
     
-    # 解碼圖片
     try:
-        frame_bytes = base64.b64decode(frame_base64)
-        nparr = np.frombuffer(frame_bytes, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-    except Exception as e:
-        return jsonify({'error': f'圖片解碼失敗: {e}'}), 400
+        rotation = int(data.get('rotation', 0)) % 360
+        max_size = int(data.get('max_size', 0))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'rotation 與 max_size 必須是整數'}), 400
+    if rotation not in (0, 90, 180, 270):
+        return jsonify({'error': 'rotation 只能是 0、90、180 或 270'}), 400
+    
+    capture_id = data.get('capture_id')
+    if capture_id:
+        # 以拍攝 ID 取得伺服器端保存的畫面與 JPEG 資料
+        capture = reader.capture_store.get(capture_id)
+        if capture is None:
+            return jsonify({'error': f'找不到拍攝 {capture_id}（可能已逾時），請重新拍攝'}), 404
+        frame, frame_bytes = capture.frame, capture.jpeg_bytes
+    else:
+        # 獲取 base64 編碼的圖片
+        frame_base64 = data.get('frame')
+        if not frame_base64:
+            return jsonify({'error': '沒有提供圖片'}), 400
+        
+        # 解碼圖片（保留原始 JPEG 資料，未旋轉縮小時直接送出）
+        try:
+            frame_bytes = base64.b64decode(frame_base64)
+            nparr = np.frombuffer(frame_bytes, np.uint8)
+            frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        except Exception as e:
+            return jsonify({'error': f'圖片解碼失敗: {e}'}), 400
+        if frame is None:
+            return jsonify({'error': '圖片解碼失敗'}), 400
     
     # 獲取使用者輸入的 prompt
     # 如果為空字串或 None，後端會使用預設 prompt（從 config.ini 讀取）
@@ -811,38 +2294,289 @@ def ocr_process():
     if not user_prompt:
         user_prompt = None  # 設為 None，讓 process_ocr 使用預設 prompt
     
-    # 處理 OCR（prompt 會附加到 DeepSeek-OCR API 請求中）
-    result = reader.process_ocr(frame, user_prompt=user_prompt)
+    # 排入 OCR 工作佇列（prompt 會附加到 DeepSeek-OCR API 請求中），立即回傳工作 ID
+    try:
+        job = reader.submit_ocr_job(frame, user_prompt=user_prompt, image_bytes=frame_bytes,
+                                    rotation=rotation, max_size=max_size, capture_id=capture_id)
+    except QueueFullError as e:
+        reader.logger.warning(f"拒絕 OCR 請求: {e}")
+        response = jsonify({'error': f'{e}，請稍後再試'})
+        response.headers['Retry-After'] = '5'
+        return response, 503
+    
+    # wait=true 時維持舊的同步行為（等待結果後回傳）
+    if data.get('wait') or request.args.get('wait') == '1':
+        if not job.wait(timeout=reader.request_timeout * 2 + 30):
+            return jsonify({'job_id': job.id, 'status': job.status, 'error': '等待 OCR 結果逾時'}), 504
+        if job.status == 'failed':
+            return jsonify({'job_id': job.id, 'status': 'error', 'error': job.error}), 500
+        return jsonify(dict(job.result, job_id=job.id))
+    
+    return jsonify({
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': f'/api/ocr/jobs/{job.id}',
+        'events_url': f'/api/ocr/jobs/{job.id}/events',
+        'queue': reader.ocr_queue.stats()
+    }), 202
+
+
+@app.route('/api/ocr/batch', methods=['POST'])
+def start_ocr_batch():
+    """
+    批次 OCR（背景執行，立即回傳批次 ID）
+    
+    multipart/form-data：以 files 上傳多張圖片，prompt / workers 為表單欄位
+    JSON：{directory, prompt, workers, recursive, resume}，directory 為圖片目錄下的子資料夾（空字串為整個目錄），
+    進度紀錄存於該資料夾，resume 為 true 時略過以相同 prompt 已完成的圖片
+    """
+    if request.files:
+        data = request.form
+        uploads = [f for f in request.files.getlist('files') if f.filename]
+        if not uploads:
+            return jsonify({'error': '沒有提供圖片'}), 400
+        items = [BatchItem(upload.filename, data=upload.read()) for upload in uploads]
+        manifest_path = None
+        total = len(items)
+        directory = None
+    else:
+        data = request.get_json(silent=True) or {}
+        save_path = os.path.abspath(reader.image_save_path)
+        directory = os.path.abspath(os.path.join(save_path, data.get('directory') or ''))
+        if os.path.commonpath([save_path, directory]) != save_path:
+            return jsonify({'error': 'directory 必須位於圖片目錄內'}), 400
+        if not os.path.isdir(directory):
+            return jsonify({'error': f'找不到資料夾 {data.get("directory")}'}), 404
+        recursive = bool(data.get('recursive', False))
+        total = sum(1 for _ in iter_directory(directory, recursive))
+        items = iter_directory(directory, recursive)
+        manifest_path = os.path.join(directory, reader.batch_manifest_name)
+    
+    try:
+        workers = int(data.get('workers') or 0) or None
+    except (TypeError, ValueError):
+        return jsonify({'error': 'workers 必須是整數'}), 400
     
-    # 添加結果
-    reader.add_ocr_result(frame, result)
+    # resume 為 false 時由批次開始執行時才刪除舊的 manifest，已有批次執行中（409）時不影響其進度紀錄
+    runner = reader.create_batch_runner(items, prompt=data.get('prompt'), workers=workers,
+                                        manifest_path=manifest_path, total=total,
+                                        resume=bool(data.get('resume', True)))
+    if not reader.start_batch(runner):
+        return jsonify({'error': '已有批次 OCR 執行中'}), 409
     
-    return jsonify(result)
+    reader.logger.info(
+        f"批次 OCR 開始: {runner.id}，{total} 張圖片（{directory or '上傳'}），{runner.workers} 個工作執行緒"
+    )
+    return jsonify(dict(runner.stats(), status_url=f'/api/ocr/batch/{runner.id}')), 202
+
+
+@app.route('/api/ocr/batch/<batch_id>', methods=['GET'])
+def get_ocr_batch(batch_id):
+    """查詢批次 OCR 進度（各狀態頁數、每分鐘頁數）"""
+    runner = reader.batch_runs.get(batch_id)
+    if runner is None:
+        return jsonify({'error': f'找不到批次 {batch_id}'}), 404
+    return jsonify(runner.stats())
+
+
+@app.route('/api/ocr/batch/<batch_id>/cancel', methods=['POST'])
+def cancel_ocr_batch(batch_id):
+    """取消批次 OCR（處理中的圖片完成後停止，之後可以 resume 接續）"""
+    runner = reader.batch_runs.get(batch_id)
+    if runner is None:
+        return jsonify({'error': f'找不到批次 {batch_id}'}), 404
+    runner.cancel()
+    return jsonify(runner.stats())
+
+
+@app.route('/api/ocr/tiling/compare', methods=['POST'])
+def compare_tiling():
+    """
+    比較整張 OCR 與分塊 OCR（同步執行，不存入結果；不論 [TILING] enable 是否啟用）
+    
+    JSON：{capture_id 或 frame（base64）, prompt}
+    """
+    data = request.get_json(silent=True) or {}
+    capture_id = data.get('capture_id')
+    if capture_id:
+        capture = reader.capture_store.get(capture_id)
+        if capture is None:
+            return jsonify({'error': f'找不到拍攝 {capture_id}（可能已逾時），請重新拍攝'}), 404
+        frame = capture.frame
+    elif data.get('frame'):
+        try:
+            frame_bytes = base64.b64decode(data['frame'])
+            frame = cv2.imdecode(np.frombuffer(frame_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+        except Exception as e:
+            return jsonify({'error': f'圖片解碼失敗: {e}'}), 400
+        if frame is None:
+            return jsonify({'error': '圖片解碼失敗'}), 400
+    else:
+        return jsonify({'error': '沒有提供圖片'}), 400
+    
+    user_prompt = (data.get('prompt') or '').strip() or None
+    return jsonify(reader.compare_tiling(frame, user_prompt=user_prompt))
+
+
+@app.route('/api/ocr/backend', methods=['GET'])
+def get_ocr_backend_status():
+    """OCR 伺服器連線狀態（斷路器）、工作佇列、結果快取與推測執行狀態"""
+    cache_stats = reader.ocr_cache.stats() if reader.ocr_cache is not None else None
+    speculative_stats = reader.get_speculative_stats() if reader.speculative_ocr else None
+    return jsonify(dict(reader.ocr_client.status(), queue=reader.ocr_queue.stats(), cache=cache_stats,
+                        speculative=speculative_stats))
+
+
+@app.route('/api/ocr/jobs/<job_id>', methods=['GET'])
+def get_ocr_job(job_id):
+    """查詢 OCR 工作狀態"""
+    job = reader.ocr_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': f'找不到 OCR 工作 {job_id}'}), 404
+    return jsonify(job.to_dict())
+
+
+@app.route('/api/ocr/jobs/<job_id>/events')
+def ocr_job_events(job_id):
+    """OCR 工作事件（Server-Sent Events），工作結束後關閉連線"""
+    job = reader.ocr_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': f'找不到 OCR 工作 {job_id}'}), 404
+    
+    def generate():
+        index = 0
+        try:
+            while True:
+                events = job.wait_for_events(index, timeout=15.0)
+                if not events:
+                    # 保持連線（SSE 註解）
+                    yield ': keepalive\n\n'
+                    continue
+                for event in events:
+                    yield f"event: {event['event']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+                index += len(events)
+                if job.finished:
+                    break
+        except GeneratorExit:
+            reader.logger.info(f"客戶端斷開 OCR 工作事件連接: {job_id}")
+    
+    return Response(generate(), mimetype='text/event-stream')
 
 
 @app.route('/api/ocr/results', methods=['GET'])
 def get_ocr_results():
-    """獲取 OCR 結果列表"""
-    # 將圖片路徑轉換為可訪問的 URL
-    results = []
-    for result in reader.ocr_results:
-        result_copy = result.copy()
-        if 'image_path' in result_copy and result_copy['image_path']:
-            # 轉換為可訪問的 URL
-            filename = os.path.basename(result_copy['image_path'])
-            result_copy['image_url'] = f'/captured_images/{filename}'
-        results.append(result_copy)
-    return jsonify(results)
+    """
+    獲取 OCR 結果列表（游標分頁，最新的在前面）
+    
+    查詢參數：
+        limit: 每頁數量（預設 [STORAGE] results_page_size，最多 100）
+        cursor: 上一頁回傳的 next_cursor
+        since: 只回傳序號大於此值的結果（增量同步），回應的 complete 為 false 表示新增的結果超過 limit，需重新載入
+    
+    回應帶 ETag（結果有變更時才改變），If-None-Match 相符時回傳 304，不查詢資料庫
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', reader.results_page_size)), 1), 100)
+        cursor = request.args.get('cursor')
+        cursor = int(cursor) if cursor else None
+        since = request.args.get('since')
+        since = int(since) if since else None
+    except ValueError:
+        return jsonify({'error': 'limit、cursor 與 since 必須是整數'}), 400
+    
+    store = reader.result_store
+    latest_seq = store.latest_seq()
+    # 伺服器重新啟動或其他程序新增結果時 ETag 也會改變
+    etag = f'{reader.result_events.token}-{store.revision}-{latest_seq}'
+    if etag in request.if_none_match:
+        response = app.response_class(status=304)
+    elif since is not None:
+        results, complete = store.since(since, limit=limit)
+        response = jsonify({'results': reader.with_image_urls(results), 'latest_seq': latest_seq,
+                            'complete': complete})
+    else:
+        results, next_cursor = store.page(cursor=cursor, limit=limit)
+        response = jsonify({'results': reader.with_image_urls(results), 'next_cursor': next_cursor,
+                            'latest_seq': latest_seq})
+    response.set_etag(etag)
+    # 瀏覽器每次都以 If-None-Match 重新驗證
+    response.cache_control.no_cache = True
+    return response
+
+
+@app.route('/api/ocr/results/events')
+def ocr_result_events():
+    """
+    OCR 結果變更事件（Server-Sent Events）：added（新增的結果）、updated（照片被淘汰）、cleared、
+    reset（錯過的事件無法補送，網頁應重新載入歷史）
+    
+    瀏覽器重新連線時以 Last-Event-ID 補送錯過的事件。開發伺服器每個連線佔用一個執行緒；
+    正式環境伺服器（book_reader_server.py）在事件迴圈中服務此路由。
+    """
+    bus = reader.result_events
+    last_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id') or bus.last_id
+    
+    def generate():
+        event_id = last_id
+        try:
+            while True:
+                events, complete = bus.wait(event_id, timeout=15.0)
+                if not complete:
+                    event_id = bus.last_id
+                    yield bus.sse_message(event_id, 'reset', {})
+                    continue
+                if not events:
+                    # 保持連線（SSE 註解）
+                    yield ': keepalive\n\n'
+                    continue
+                for event in events:
+                    yield bus.sse_message(*event)
+                event_id = events[-1][0]
+        except GeneratorExit:
+            reader.logger.info("客戶端斷開 OCR 結果事件連接")
+    
+    return Response(generate(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+
+@app.route('/api/ocr/search', methods=['GET'])
+def search_ocr_results():
+    """
+    全文搜尋 OCR 結果（依相關度排序）
+    
+    查詢參數：
+        q: 查詢字串（多個詞以空白分隔，全部都必須出現）
+        limit: 回傳數量（預設 20，最多 100）
+        offset: 略過前幾筆
+    """
+    query = request.args.get('q', '').strip()
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), 100)
+        offset = max(int(request.args.get('offset', 0)), 0)
+    except ValueError:
+        return jsonify({'error': 'limit 與 offset 必須是整數'}), 400
+    
+    if not query:
+        return jsonify({'query': query, 'results': []})
+    
+    start_time = time.time()
+    results = reader.result_store.search(query, limit=limit, offset=offset)
+    return jsonify({
+        'query': query,
+        'results': reader.with_image_urls(results),
+        'elapsed_ms': round((time.time() - start_time) * 1000, 1)
+    })
 
 
 @app.route('/api/ocr/results/clear', methods=['POST'])
 def clear_ocr_results():
     """清除所有 OCR 結果"""
-    reader.ocr_results = []
-    reader._save_ocr_results()
+    reader.result_store.clear()
+    reader.result_events.publish('cleared')
     return jsonify({'success': True})
 
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=8502, debug=True, threaded=True)
+    # 開發用伺服器；正式環境請使用 book_reader_server.py
+    # （關閉重新載入器，避免 debug 模式在子行程再建立一次 BookReaderFlask 與相機）
+    app.run(host='0.0.0.0', port=8502, debug=True, threaded=True, use_reloader=False)
 
@@ -0,0 +1,696 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+閱讀機器人正式環境伺服器
+`app.run()` 的開發伺服器每個串流連線佔用一個執行緒，debug 重新載入器還會建立兩次 BookReaderFlask。
+本伺服器以 asyncio 事件迴圈處理 HTTP 連線：
+
+- 預覽串流（/api/camera/mjpeg、/api/camera/stream）直接在事件迴圈中服務，
+  每個相機設備由一個專用執行緒等待影像生產者的新畫面再通知所有連線，
+  JPEG 編碼在編碼執行緒池中進行（相同畫面與品質只編碼一次），連線數增加不會增加執行緒
+- OCR 結果變更事件（/api/ocr/results/events）也在事件迴圈中服務，每個開著的網頁不佔用執行緒
+- 其他請求交給固定大小的執行緒池執行 Flask 應用程式（WSGI）
+- 相機讀取（CameraFrameProducer）與 OCR（OCRJobQueue）仍在各自的背景執行緒
+
+用法:
+    python book_reader_server.py                  # 使用 config.ini 的 [SERVER] 設定
+    python book_reader_server.py --port 8502 --http-workers 16
+"""
+
+import io
+import sys
+import json
+import time
+import base64
+import signal
+import asyncio
+import argparse
+import threading
+from urllib.parse import unquote, parse_qsl
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.datastructures import MultiDict
+
+
+STREAM_ROUTES = ('/api/camera/mjpeg', '/api/camera/stream')
+RESULT_EVENTS_ROUTE = '/api/ocr/results/events'
+
+_REASONS = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 413: 'Payload Too Large',
+    500: 'Internal Server Error', 501: 'Not Implemented'
+}
+
+
+class FrameHub:
+    """
+    單一相機設備的畫面轉送
+
+    專用執行緒訂閱影像生產者並等待新畫面，透過 call_soon_threadsafe 交給事件迴圈；
+    連線以 wait() 等待下一幀，不需要各自的執行緒。
+    """
+
+    def __init__(self, book_reader, device_id, loop, encode_executor):
+        self.reader = book_reader
+        self.device_id = device_id
+        self.loop = loop
+        self.encode_executor = encode_executor
+        self.clients = 0
+        self.viewers = 0
+        self.entry = None
+        self.producer = None
+        self.error = None
+        self._next = loop.create_future()
+        self._encoding = {}
+        self._stop = None
+
+    def acquire(self, viewer=True):
+        """新增連線（第一個連線時啟動轉送執行緒）"""
+        self.clients += 1
+        if viewer:
+            self.viewers += 1
+        if self._stop is None:
+            self._stop = threading.Event()
+            threading.Thread(target=self._run, args=(self._stop,), name=f'frame-hub-{self.device_id}',
+                             daemon=True).start()
+
+    def release(self, viewer=True):
+        """移除連線（沒有連線時停止轉送執行緒，相機由影像生產者的閒置逾時釋放）"""
+        self.clients -= 1
+        if viewer:
+            self.viewers -= 1
+        if self.clients <= 0 and self._stop is not None:
+            self._stop.set()
+            self._stop = None
+
+    async def wait(self, after_seq, timeout):
+        """
+        等待比 after_seq 新的畫面
+
+        Returns:
+            tuple: (entry 或 None, 影像生產者, 錯誤訊息或 None)；逾時回傳 (None, 影像生產者, None)
+        """
+        if self.entry is not None and self.entry[0] > after_seq:
+            return self.entry, self.producer, None
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._next), timeout)
+        except asyncio.TimeoutError:
+            return None, self.producer, None
+
+    async def jpeg(self, entry, producer, quality):
+        """
+        取得畫面的 JPEG（同一畫面與品質只在編碼執行緒池中編碼一次，所有連線共用）
+
+        Returns:
+            tuple: (JPEG 資料或 None, 這次呼叫實際花費的編碼 CPU 秒數)
+        """
+        key = (entry[0], quality)
+        future = self._encoding.get(key)
+        if future is not None:
+            return (await asyncio.shield(future))[0], 0.0
+        future = self.loop.run_in_executor(self.encode_executor, self._encode, producer, entry, quality)
+        # 只保留最新畫面的編碼
+        self._encoding = {k: f for k, f in self._encoding.items() if k[0] >= entry[0]}
+        self._encoding[key] = future
+        return await asyncio.shield(future)
+
+    @staticmethod
+    def _encode(producer, entry, quality):
+        cpu_start = time.thread_time()
+        data = producer.encode_jpeg(entry, quality)
+        return data, time.thread_time() - cpu_start
+
+    def _publish(self, entry, producer, error):
+        """在事件迴圈中通知等待中的連線"""
+        if entry is not None:
+            self.entry = entry
+        self.producer = producer
+        self.error = error
+        future, self._next = self._next, self.loop.create_future()
+        future.set_result((entry, producer, error))
+
+    def _run(self, stop):
+        """轉送執行緒：等待影像生產者的新畫面"""
+        producer = None
+        last_seq = 0
+        try:
+            while not stop.is_set():
+                if producer is None or not producer.is_alive():
+                    # 影像生產者被停止（如切換解析度）時重新訂閱
+                    if producer is not None:
+                        producer.unsubscribe()
+                    producer = self.reader.get_camera_producer(self.device_id)
+                    producer.subscribe()
+                    last_seq = 0
+                entry = producer.wait_for_frame(last_seq, timeout=max(1.0, self.reader.capture_delay + 0.5))
+                if entry is None:
+                    error = producer.last_error or '無法讀取相機畫面'
+                    self.loop.call_soon_threadsafe(self._publish, None, producer, error)
+                    continue
+                last_seq = entry[0]
+                self.loop.call_soon_threadsafe(self._publish, entry, producer, None)
+        except RuntimeError:
+            # 事件迴圈已關閉
+            pass
+        finally:
+            if producer is not None:
+                producer.unsubscribe()
+
+
+class BookReaderServer:
+    """asyncio HTTP 伺服器：串流在事件迴圈中服務，其他請求交給 WSGI 執行緒池"""
+
+    def __init__(self, app, book_reader, stream_stats, parse_stream_args, host='0.0.0.0', port=8502,
+                 http_workers=16, encode_workers=2, write_timeout=10.0, keepalive_timeout=15.0,
+                 max_body_mb=100):
+        """
+        初始化伺服器
+
+        Args:
+            app: Flask 應用程式（WSGI）
+            book_reader: BookReaderFlask 物件
+            stream_stats: 各傳輸方式的 StreamStats
+            parse_stream_args: 解析串流查詢參數的函數
+            host: 監聽位址
+            port: 監聽埠（0 表示自動選擇）
+            http_workers: 執行 Flask 請求的執行緒數（OCR 工作事件等 Flask SSE 連線會佔用一個；
+                預覽串流與結果變更事件不佔用）
+            encode_workers: 預覽 JPEG 編碼執行緒數
+            write_timeout: 串流連線無法在此秒數內送出一幀時中斷（避免卡住的連線累積緩衝）
+            keepalive_timeout: keep-alive 連線閒置逾時（秒）
+            max_body_mb: 請求本文大小上限（MB）
+        """
+        self.app = app
+        self.reader = book_reader
+        self.stream_stats = stream_stats
+        self.parse_stream_args = parse_stream_args
+        self.host = host
+        self.port = port
+        self.write_timeout = write_timeout
+        self.keepalive_timeout = keepalive_timeout
+        self.max_body = int(max_body_mb * 1024 * 1024)
+        self.http_executor = ThreadPoolExecutor(max_workers=max(1, http_workers), thread_name_prefix='http')
+        self.encode_executor = ThreadPoolExecutor(max_workers=max(1, encode_workers),
+                                                  thread_name_prefix='stream-encode')
+        self.logger = book_reader.logger
+        self.loop = None
+        self.server = None
+        self.hubs = {}
+        self._stopped = None
+
+    @classmethod
+    def from_config(cls, app, book_reader, stream_stats, parse_stream_args, **overrides):
+        """依 config.ini 的 [SERVER] 建立伺服器（overrides 中不為 None 的值優先）"""
+        config = book_reader.config
+        options = {
+            'host': config.get('SERVER', 'host', fallback='0.0.0.0'),
+            'port': config.getint('SERVER', 'port', fallback=8502),
+            'http_workers': config.getint('SERVER', 'http_workers', fallback=16),
+            'encode_workers': config.getint('SERVER', 'encode_workers', fallback=2),
+            'write_timeout': config.getfloat('SERVER', 'write_timeout', fallback=10.0),
+            'keepalive_timeout': config.getfloat('SERVER', 'keepalive_timeout', fallback=15.0),
+            'max_body_mb': config.getfloat('SERVER', 'max_body_mb', fallback=100),
+        }
+        options.update({key: value for key, value in overrides.items() if value is not None})
+        return cls(app, book_reader, stream_stats, parse_stream_args, **options)
+
+    @property
+    def url(self):
+        return f'http://{self.host}:{self.port}'
+
+    # ------------------------------------------------------------------
+    # 啟動與停止
+    # ------------------------------------------------------------------
+
+    async def start(self):
+        """開始監聽"""
+        self.loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        self.server = await asyncio.start_server(self._handle, self.host, self.port, backlog=256)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.logger.info(
+            f"正式環境伺服器啟動: {self.url}（事件迴圈串流，WSGI 執行緒 {self.http_executor._max_workers} 個，"
+            f"編碼執行緒 {self.encode_executor._max_workers} 個）"
+        )
+
+    async def serve(self):
+        """監聽直到 stop()"""
+        await self.start()
+        await self._stopped.wait()
+        self.server.close()
+        await self.server.wait_closed()
+
+    def stop(self):
+        """停止伺服器（可從其他執行緒呼叫）"""
+        if self.loop is not None and self._stopped is not None:
+            self.loop.call_soon_threadsafe(self._stopped.set)
+
+    def start_in_thread(self):
+        """在背景執行緒執行事件迴圈（測試與基準測試用），回傳已開始監聽的伺服器"""
+        ready = threading.Event()
+
+        async def main():
+            await self.start()
+            ready.set()
+            await self._stopped.wait()
+            self.server.close()
+            await self.server.wait_closed()
+
+        threading.Thread(target=asyncio.run, args=(main(),), name='book-reader-server', daemon=True).start()
+        if not ready.wait(10):
+            raise RuntimeError('伺服器啟動逾時')
+        return self
+
+    def shutdown_executors(self):
+        self.http_executor.shutdown(wait=False, cancel_futures=True)
+        self.encode_executor.shutdown(wait=False, cancel_futures=True)
+
+    # ------------------------------------------------------------------
+    # HTTP 連線
+    # ------------------------------------------------------------------
+
+    async def _handle(self, stream_reader, writer):
+        """處理一個 TCP 連線（支援 keep-alive；串流回應結束後關閉連線）"""
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(stream_reader.readuntil(b'\r\n\r\n'), self.keepalive_timeout)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError,
+                        ConnectionError):
+                    break
+                request = self._parse_head(head)
+                if request is None:
+                    await self._simple_response(writer, 400, '無法解析請求')
+                    break
+                method, path, query, version, headers = request
+
+                if method == 'GET' and path in STREAM_ROUTES:
+                    await self._serve_stream(writer, path, query)
+                    break
+                if method == 'GET' and path == RESULT_EVENTS_ROUTE:
+                    await self._serve_result_events(writer, query, headers)
+                    break
+
+                if headers.get('transfer-encoding', '').lower() == 'chunked':
+                    await self._simple_response(writer, 501, '不支援 chunked 請求本文')
+                    break
+                try:
+                    length = int(headers.get('content-length') or 0)
+                except ValueError:
+                    await self._simple_response(writer, 400, 'Content-Length 格式錯誤')
+                    break
+                if length > self.max_body:
+                    await self._simple_response(writer, 413, '請求本文過大')
+                    break
+                if length and headers.get('expect', '').lower() == '100-continue':
+                    writer.write(b'HTTP/1.1 100 Continue\r\n\r\n')
+                body = await stream_reader.readexactly(length) if length else b''
+
+                keep_alive = await self._serve_wsgi(writer, method, path, query, version, headers, body)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # 伺服器停止時取消仍開著的連線
+            pass
+        except Exception as e:
+            self.logger.error(f"處理 HTTP 連線時發生錯誤: {e}")
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _parse_head(head):
+        """解析請求行與標頭"""
+        try:
+            lines = head.decode('latin-1').split('\r\n')
+            method, target, version = lines[0].split(' ', 2)
+        except ValueError:
+            return None
+        headers = {}
+        for line in lines[1:]:
+            if not line:
+                continue
+            name, _, value = line.partition(':')
+            name = name.strip().lower()
+            value = value.strip()
+            headers[name] = f'{headers[name]}, {value}' if name in headers else value
+        path, _, query = target.partition('?')
+        return method.upper(), path, query, version, headers
+
+    async def _simple_response(self, writer, status, message):
+        body = json.dumps({'error': message}, ensure_ascii=False).encode('utf-8')
+        writer.write(
+            f'HTTP/1.1 {status} {_REASONS.get(status, "")}\r\nContent-Type: application/json\r\n'
+            f'Content-Length: {len(body)}\r\nConnection: close\r\n\r\n'.encode('latin-1') + body
+        )
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    # ------------------------------------------------------------------
+    # WSGI（Flask）
+    # ------------------------------------------------------------------
+
+    def _environ(self, method, path, query, version, headers, body, peer):
+        environ = {
+            'REQUEST_METHOD': method,
+            'SCRIPT_NAME': '',
+            # PEP 3333：PATH_INFO 為解碼後的 latin-1 字串
+            'PATH_INFO': unquote(path, encoding='latin-1'),
+            'QUERY_STRING': query,
+            'SERVER_NAME': self.host,
+            'SERVER_PORT': str(self.port),
+            'SERVER_PROTOCOL': version,
+            'REMOTE_ADDR': peer[0] if peer else '',
+            'REMOTE_PORT': str(peer[1]) if peer else '',
+            'CONTENT_TYPE': headers.get('content-type', ''),
+            'CONTENT_LENGTH': str(len(body)) if body else '',
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        for name, value in headers.items():
+            if name in ('content-type', 'content-length'):
+                continue
+            environ['HTTP_' + name.upper().replace('-', '_')] = value
+        return environ
+
+    async def _serve_wsgi(self, writer, method, path, query, version, headers, body):
+        """
+        在執行緒池執行 Flask 應用程式並送出回應
+
+        Returns:
+            bool: 連線是否可以保持（keep-alive）
+        """
+        loop = self.loop
+        environ = self._environ(method, path, query, version, headers, body, writer.get_extra_info('peername'))
+        queue = asyncio.Queue(maxsize=16)
+        closed = threading.Event()
+        response = {}
+
+        def put(item):
+            # 佇列已滿時等待（連線送出較慢時產生回應的執行緒也會等待）
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+        def start_response(status, response_headers, exc_info=None):
+            response['status'] = status
+            response['headers'] = response_headers
+            return lambda data: put(('data', data))
+
+        def run_app():
+            try:
+                result = self.app(environ, start_response)
+                try:
+                    for chunk in result:
+                        if closed.is_set():
+                            break
+                        if chunk:
+                            put(('data', chunk))
+                finally:
+                    if hasattr(result, 'close'):
+                        result.close()
+            except Exception as e:
+                put(('error', e))
+            finally:
+                put(('end', None))
+
+        loop.run_in_executor(self.http_executor, run_app)
+
+        wants_close = (headers.get('connection', '').lower() == 'close' or
+                       (version == 'HTTP/1.0' and headers.get('connection', '').lower() != 'keep-alive'))
+        keep_alive = False
+        headers_sent = False
+        # 第一次 queue.get() 前被取消（伺服器停止）時 finally 仍需判斷是否讀完佇列
+        kind = None
+        try:
+            while True:
+                kind, value = await queue.get()
+                if kind == 'error':
+                    self.logger.error(f"WSGI 應用程式錯誤（{method} {path}）: {value}")
+                    if not headers_sent:
+                        await self._simple_response(writer, 500, '伺服器內部錯誤')
+                        headers_sent = True
+                    continue
+                if not headers_sent and 'status' in response:
+                    response_headers = list(response['headers'])
+                    names = {name.lower() for name, _ in response_headers}
+                    # 沒有 Content-Length 的回應（Flask 串流）送完後關閉連線
+                    keep_alive = 'content-length' in names and not wants_close
+                    response_headers.append(('Connection', 'keep-alive' if keep_alive else 'close'))
+                    head = f"HTTP/1.1 {response['status']}\r\n" + ''.join(
+                        f'{name}: {val}\r\n' for name, val in response_headers) + '\r\n'
+                    writer.write(head.encode('latin-1'))
+                    headers_sent = True
+                if kind == 'end':
+                    break
+                if method != 'HEAD':
+                    writer.write(value)
+                await writer.drain()
+            await writer.drain()
+        except ConnectionError:
+            keep_alive = False
+        finally:
+            if not closed.is_set() and kind != 'end':
+                # 客戶端中斷：通知產生回應的執行緒停止，並讀完佇列讓它不會卡在 put()
+                closed.set()
+                loop.create_task(self._drain_queue(queue))
+        return keep_alive
+
+    @staticmethod
+    async def _drain_queue(queue):
+        while True:
+            kind, _ = await queue.get()
+            if kind == 'end':
+                return
+
+    # ------------------------------------------------------------------
+    # 預覽串流（事件迴圈）
+    # ------------------------------------------------------------------
+
+    def _hub(self, device_id):
+        hub = self.hubs.get(device_id)
+        if hub is None:
+            hub = self.hubs[device_id] = FrameHub(self.reader, device_id, self.loop, self.encode_executor)
+        return hub
+
+    async def _serve_stream(self, writer, path, query):
+        """服務 MJPEG、SSE 畫面與 SSE 狀態串流"""
+        args = MultiDict(parse_qsl(query, keep_blank_values=True))
+        try:
+            target_device, quality, fps, detector = self.parse_stream_args(args)
+        except Exception as e:
+            await self._simple_response(writer, 400, f'串流參數錯誤: {e}')
+            return
+
+        if path == '/api/camera/mjpeg':
+            content_type = 'multipart/x-mixed-replace; boundary=frame'
+        else:
+            content_type = 'text/event-stream'
+        writer.write(
+            f'HTTP/1.1 200 OK\r\nContent-Type: {content_type}\r\nCache-Control: no-cache\r\n'
+            f'Connection: close\r\n\r\n'.encode('latin-1')
+        )
+
+        hub = self._hub(target_device)
+        try:
+            if path == '/api/camera/stream' and args.get('frames', '1') == '0':
+                hub.acquire(viewer=False)
+                try:
+                    await self._stream_status(writer, hub)
+                finally:
+                    hub.release(viewer=False)
+                return
+
+            transport = 'mjpeg' if path == '/api/camera/mjpeg' else 'sse'
+            stats = self.stream_stats[transport]
+            stats.connection_opened()
+            hub.acquire()
+            try:
+                await self._stream_frames(writer, hub, transport, quality, fps, detector, stats)
+            finally:
+                hub.release()
+                stats.connection_closed()
+        except (ConnectionError, asyncio.TimeoutError):
+            # 客戶端斷開或送出逾時
+            pass
+
+    async def _stream_frames(self, writer, hub, transport, quality, fps, detector, stats):
+        """依 FPS 上限送出畫面；連線送出較慢時跳過中間的畫面，只送最新的"""
+        min_interval = 1.0 / fps
+        wait_timeout = max(1.0, self.reader.capture_delay + 0.5)
+        last_seq = 0
+        last_sent = 0.0
+        consecutive_errors = 0
+        if transport == 'mjpeg':
+            writer.write(b'--frame\r\n')
+
+        while True:
+            entry, producer, error = await hub.wait(last_seq, wait_timeout)
+            if entry is None:
+                if error is None:
+                    continue
+                consecutive_errors += 1
+                if transport == 'sse':
+                    if consecutive_errors > 10:
+                        writer.write(f"data: {json.dumps({'error': '相機讀取失敗，請檢查連接'})}\n\n".encode('utf-8'))
+                        await writer.drain()
+                        return
+                    writer.write(f"data: {json.dumps({'error': error})}\n\n".encode('utf-8'))
+                    await asyncio.wait_for(writer.drain(), self.write_timeout)
+                continue
+            consecutive_errors = 0
+
+            # 限制傳送速率，等待後改用最新的畫面（在變化偵測之前，送出的畫面即是偵測比較的畫面）
+            elapsed = time.monotonic() - last_sent
+            if elapsed < min_interval:
+                await asyncio.sleep(min_interval - elapsed)
+                if hub.entry is not None and hub.entry[0] > entry[0]:
+                    entry, producer = hub.entry, hub.producer
+
+            if detector is not None:
+                cpu_start = time.thread_time()
+                # MJPEG 直通時只解碼縮小的灰階影像
+                image = producer.analysis_image(entry, detector.sample_width)
+                send = image is not None and detector.should_send(image)[0]
+                if not send:
+                    self._record_drop(stats, last_seq, entry[0])
+                    last_seq = entry[0]
+                    stats.record_skip(time.thread_time() - cpu_start)
+                    continue
+            last_sent = time.monotonic()
+
+            jpeg, cpu_seconds = await hub.jpeg(entry, producer, quality)
+            if jpeg is None:
+                continue
+            if transport == 'mjpeg':
+                message = (b'Content-Type: image/jpeg\r\nContent-Length: ' + str(len(jpeg)).encode() +
+                           b'\r\n\r\n' + jpeg + b'\r\n--frame\r\n')
+            else:
+                message = f"data: {json.dumps({'frame': base64.b64encode(jpeg).decode('ascii')})}\n\n".encode('utf-8')
+            writer.write(message)
+            await asyncio.wait_for(writer.drain(), self.write_timeout)
+            stats.record_frame(len(message), cpu_seconds)
+            self._record_drop(stats, last_seq, entry[0])
+            last_seq = entry[0]
+
+    @staticmethod
+    def _record_drop(stats, last_seq, seq):
+        if last_seq and seq > last_seq + 1:
+            stats.record_drop(seq - last_seq - 1)
+
+    async def _stream_status(self, writer, hub):
+        """每秒回報相機 FPS 與觀看者數（不傳送畫面）"""
+        last_seq = 0
+        last_frames_read = None
+        last_report = time.monotonic()
+        while True:
+            entry, producer, error = await hub.wait(last_seq, max(1.0, self.reader.capture_delay + 0.5))
+            if entry is None:
+                if error is not None:
+                    writer.write(f"data: {json.dumps({'error': error})}\n\n".encode('utf-8'))
+                    await asyncio.wait_for(writer.drain(), self.write_timeout)
+                continue
+            last_seq = entry[0]
+            now = time.monotonic()
+            if last_frames_read is None or producer.frames_read < last_frames_read:
+                last_frames_read = producer.frames_read
+            camera_fps = (producer.frames_read - last_frames_read) / max(now - last_report, 1e-6)
+            last_frames_read = producer.frames_read
+            last_report = now
+            # 轉送執行緒本身只佔一個訂閱，換算為實際觀看者數（含經由 Flask 的串流連線）
+            subscribers = producer.subscriber_count - 1 + hub.viewers
+            message = {'status': 'streaming', 'camera_fps': round(camera_fps, 1), 'subscribers': subscribers}
+            writer.write(f"data: {json.dumps(message)}\n\n".encode('utf-8'))
+            await asyncio.wait_for(writer.drain(), self.write_timeout)
+            await asyncio.sleep(1.0)
+
+    # ------------------------------------------------------------------
+    # OCR 結果變更事件（事件迴圈）
+    # ------------------------------------------------------------------
+
+    async def _serve_result_events(self, writer, query, headers):
+        """推送 OCR 結果變更事件（與 Flask 的 /api/ocr/results/events 相同格式）"""
+        bus = self.reader.result_events
+        args = dict(parse_qsl(query))
+        event_id = headers.get('last-event-id') or args.get('last_event_id') or bus.last_id
+        writer.write(
+            b'HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n'
+            b'Connection: close\r\n\r\n'
+        )
+        wakeup = asyncio.Event()
+        loop = self.loop
+
+        def notify():
+            # 在發布事件的執行緒（OCR 工作、照片存儲）中呼叫
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                # 事件迴圈已關閉
+                pass
+
+        bus.add_listener(notify)
+        try:
+            while True:
+                wakeup.clear()
+                events, complete = bus.events_after(event_id)
+                if not complete:
+                    event_id = bus.last_id
+                    message = bus.sse_message(event_id, 'reset', {})
+                elif events:
+                    message = ''.join(bus.sse_message(*event) for event in events)
+                    event_id = events[-1][0]
+                else:
+                    try:
+                        await asyncio.wait_for(wakeup.wait(), self.keepalive_timeout)
+                        continue
+                    except asyncio.TimeoutError:
+                        # 保持連線（SSE 註解）
+                        message = ': keepalive\n\n'
+                writer.write(message.encode('utf-8'))
+                await asyncio.wait_for(writer.drain(), self.write_timeout)
+        except (ConnectionError, asyncio.TimeoutError):
+            # 客戶端斷開或送出逾時
+            pass
+        finally:
+            bus.remove_listener(notify)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='閱讀機器人正式環境伺服器（事件迴圈串流）')
+    parser.add_argument('--host', help='監聽位址（預設：[SERVER] host 或 0.0.0.0）')
+    parser.add_argument('--port', type=int, help='監聽埠（預設：[SERVER] port 或 8502）')
+    parser.add_argument('--http-workers', type=int, help='執行 Flask 請求的執行緒數（預設：16）')
+    parser.add_argument('--encode-workers', type=int, help='預覽 JPEG 編碼執行緒數（預設：2）')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    # 匯入時以 config.ini 建立唯一的 BookReaderFlask（不使用 debug 重新載入器）
+    from book_reader_flask import app, reader, stream_stats, _parse_stream_args
+
+    server = BookReaderServer.from_config(app, reader, stream_stats, _parse_stream_args, host=args.host,
+                                          port=args.port, http_workers=args.http_workers,
+                                          encode_workers=args.encode_workers)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, server.stop)
+        await server.serve()
+
+    try:
+        asyncio.run(run())
+    finally:
+        reader.logger.info("正式環境伺服器停止，釋放相機")
+        server.shutdown_executors()
+        reader.release_camera()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+相機列表快取
+以 /sys/class/video4linux 的設備資訊列出相機（必要時以 VIDIOC_QUERYCAP 查詢設備能力），
+不開啟擷取管線也不讀取畫面，不會干擾正在串流的相機。
+結果保存在快取中，背景執行緒偵測到設備新增或移除時重新列舉，頁面載入不需任何設備 I/O。
+
+沒有 video4linux 的平台（例如 macOS 開發環境）改以開啟設備讀取一幀的方式偵測，
+只在背景執行緒或明確要求重新偵測時執行，並跳過使用中的設備。
+"""
+
+import os
+import re
+import time
+import struct
+import logging
+import threading
+
+
+SYSFS_ROOT = '/sys/class/video4linux'
+
+# struct v4l2_capability: driver[16] card[32] bus_info[32] version capabilities device_caps reserved[3]
+_V4L2_CAPABILITY = struct.Struct('16s32s32sIII12x')
+VIDIOC_QUERYCAP = (2 << 30) | (_V4L2_CAPABILITY.size << 16) | (ord('V') << 8) | 0
+V4L2_CAP_VIDEO_CAPTURE = 0x00000001
+V4L2_CAP_VIDEO_CAPTURE_MPLANE = 0x00001000
+V4L2_CAP_VIDEO_M2M_MPLANE = 0x00004000
+V4L2_CAP_VIDEO_M2M = 0x00008000
+V4L2_CAP_DEVICE_CAPS = 0x80000000
+
+# Raspberry Pi 的編解碼器與 ISP 節點也是 video4linux 設備，但不是相機
+EXCLUDED_NAMES = ('bcm2835-codec', 'bcm2835-isp', 'rpivid', 'rpi-hevc-dec', 'pispbe')
+
+
+def _read_attr(path, default=None):
+    """讀取 sysfs 屬性（不存在或無法讀取時回傳 default）"""
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return f.read().strip()
+    except OSError:
+        return default
+
+
+def query_capabilities(device_path):
+    """
+    以 VIDIOC_QUERYCAP 查詢設備能力（只開啟設備節點，不設定格式也不開始擷取）
+
+    Args:
+        device_path: 設備路徑（例如 /dev/video0）
+
+    Returns:
+        dict: {'driver', 'card', 'bus_info', 'capabilities'}，無法查詢時回傳 None
+    """
+    try:
+        # 只有 POSIX 平台有 fcntl，其他平台改用 sysfs 列出的資訊（與 query_device_caps = false 相同）
+        import fcntl
+    except ImportError:
+        return None
+    try:
+        fd = os.open(device_path, os.O_RDONLY | os.O_NONBLOCK)
+    except OSError:
+        return None
+    try:
+        buffer = bytearray(_V4L2_CAPABILITY.size)
+        fcntl.ioctl(fd, VIDIOC_QUERYCAP, buffer)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+    driver, card, bus_info, _, capabilities, device_caps = _V4L2_CAPABILITY.unpack(bytes(buffer))
+    if capabilities & V4L2_CAP_DEVICE_CAPS:
+        # 同一實體設備有多個節點時，device_caps 才是這個節點的能力
+        capabilities = device_caps
+    decode = lambda raw: raw.split(b'\0', 1)[0].decode('utf-8', errors='replace')
+    return {
+        'driver': decode(driver),
+        'card': decode(card),
+        'bus_info': decode(bus_info),
+        'capabilities': capabilities
+    }
+
+
+def is_capture_device(capabilities):
+    """是否為擷取設備（排除 metadata 節點與記憶體對記憶體的編解碼器）"""
+    if capabilities & (V4L2_CAP_VIDEO_M2M | V4L2_CAP_VIDEO_M2M_MPLANE):
+        return False
+    return bool(capabilities & (V4L2_CAP_VIDEO_CAPTURE | V4L2_CAP_VIDEO_CAPTURE_MPLANE))
+
+
+class CameraDiscovery:
+    """快取相機列表，並在背景偵測設備新增或移除"""
+
+    def __init__(self, probe=None, in_use=None, poll_interval=2.0, use_querycap=True,
+                 sysfs_root=SYSFS_ROOT, logger=None):
+        """
+        初始化相機列表快取
+
+        Args:
+            probe: 沒有 video4linux 時使用的偵測函式 probe(skip_ids) -> 相機列表
+            in_use: 回傳使用中設備編號集合的函式（偵測時跳過這些設備並直接視為可用）
+            poll_interval: 檢查設備是否新增或移除的間隔（秒，只讀取 sysfs 目錄，0 表示不檢查）
+            use_querycap: 是否以 VIDIOC_QUERYCAP 排除非擷取節點（False 時只使用 sysfs 資訊）
+            sysfs_root: video4linux 的 sysfs 目錄
+            logger: 日誌物件
+        """
+        self.probe = probe
+        self.in_use = in_use or (lambda: set())
+        self.poll_interval = poll_interval
+        self.use_querycap = use_querycap
+        self.sysfs_root = sysfs_root
+        self.logger = logger or logging.getLogger('BookReaderFlask')
+
+        self.source = 'sysfs' if os.path.isdir(sysfs_root) else 'probe'
+        self._cameras = []
+        self._signature = None
+        self._updated_at = None
+        self._refresh_count = 0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        建立初始列表並啟動背景執行緒
+
+        sysfs 列舉只需幾毫秒，直接在此完成；偵測模式需要開啟設備，改由背景執行緒執行
+        """
+        if self.source == 'sysfs':
+            self.refresh()
+        else:
+            self._wakeup.set()
+        self._thread = threading.Thread(target=self._run, name='camera-discovery', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止背景執行緒"""
+        self._stopped.set()
+        self._wakeup.set()
+
+    def get(self, refresh=False):
+        """
+        取得相機列表
+
+        Args:
+            refresh: 是否立即重新列舉（使用者按下重新偵測時）
+
+        Returns:
+            list: 相機資訊字典列表（副本）
+        """
+        if refresh:
+            self.refresh()
+        with self._lock:
+            return [dict(camera) for camera in self._cameras]
+
+    def invalidate(self):
+        """標記快取過期，由背景執行緒重新列舉"""
+        with self._lock:
+            self._signature = None
+        self._wakeup.set()
+
+    def info(self):
+        """快取狀態"""
+        with self._lock:
+            return {
+                'source': self.source,
+                'count': len(self._cameras),
+                'updated_at': self._updated_at,
+                'refresh_count': self._refresh_count
+            }
+
+    def refresh(self):
+        """重新列舉相機並更新快取"""
+        with self._refresh_lock:
+            started = time.time()
+            if self.source == 'sysfs':
+                signature = self._sysfs_signature()
+                cameras = self._enumerate_sysfs(signature)
+            else:
+                signature = None
+                cameras = self._enumerate_probe()
+            elapsed_ms = (time.time() - started) * 1000
+
+            with self._lock:
+                changed = [c['id'] for c in cameras] != [c['id'] for c in self._cameras]
+                self._cameras = cameras
+                self._signature = signature
+                self._updated_at = time.time()
+                self._refresh_count += 1
+
+            if changed or self._refresh_count == 1:
+                names = ', '.join(f"{c['id']} ({c['name']})" for c in cameras) or '無'
+                self.logger.info(f"相機列表更新（{self.source}，{elapsed_ms:.1f} ms）: {names}")
+            return cameras
+
+    def _run(self):
+        """背景執行緒：定期比對 sysfs 目錄，設備新增或移除時重新列舉"""
+        while not self._stopped.is_set():
+            woken = self._wakeup.wait(self.poll_interval if self.poll_interval > 0 else None)
+            self._wakeup.clear()
+            if self._stopped.is_set():
+                break
+            try:
+                if self.source == 'probe':
+                    # 偵測模式需要開啟設備，只在啟動與 invalidate() 時執行
+                    if woken:
+                        self.refresh()
+                    continue
+                with self._lock:
+                    cached = self._signature
+                if woken or self._sysfs_signature() != cached:
+                    self.refresh()
+            except Exception as e:
+                self.logger.warning(f"更新相機列表時發生錯誤: {e}")
+
+    def _sysfs_signature(self):
+        """sysfs 目錄中的設備節點（只讀取目錄，不存取設備）"""
+        try:
+            return tuple(sorted(os.listdir(self.sysfs_root)))
+        except OSError:
+            return ()
+
+    def _enumerate_sysfs(self, signature):
+        """
+        由 sysfs 列出相機
+
+        Args:
+            signature: sysfs 目錄中的節點名稱
+
+        Returns:
+            list: 依設備編號排序的相機資訊字典列表
+        """
+        cameras = []
+        in_use = self.in_use()
+        for node in signature:
+            match = re.fullmatch(r'video(\d+)', node)
+            if not match:
+                continue
+            device_id = int(match.group(1))
+            node_path = os.path.join(self.sysfs_root, node)
+            name = _read_attr(os.path.join(node_path, 'name'), node)
+            if name.startswith(EXCLUDED_NAMES):
+                continue
+            # UVC 相機的每個實體設備有兩個節點，index 0 為影像、1 為 metadata
+            if _read_attr(os.path.join(node_path, 'index'), '0') != '0':
+                continue
+
+            camera = {
+                'id': device_id,
+                'name': name,
+                'device_path': f'/dev/{node}',
+                'in_use': device_id in in_use
+            }
+            if self.use_querycap:
+                caps = query_capabilities(camera['device_path'])
+                if caps is not None:
+                    if not is_capture_device(caps['capabilities']):
+                        continue
+                    camera['driver'] = caps['driver']
+                    camera['bus_info'] = caps['bus_info']
+            cameras.append(camera)
+        return sorted(cameras, key=lambda c: c['id'])
+
+    def _enumerate_probe(self):
+        """以 probe 函式偵測相機（跳過使用中的設備）"""
+        in_use = set(self.in_use())
+        cameras = list(self.probe(in_use)) if self.probe else []
+        found = {camera['id'] for camera in cameras}
+        for device_id in in_use - found:
+            cameras.append({
+                'id': device_id,
+                'name': f'Camera {device_id}',
+                'device_path': f'/dev/video{device_id}'
+            })
+        for camera in cameras:
+            camera['in_use'] = camera['id'] in in_use
+        return sorted(cameras, key=lambda c: c['id'])
@@ -0,0 +1,528 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+相機影像生產者
+每個相機設備只開啟一次 VideoCapture，由單一背景執行緒持續讀取畫面到環形緩衝區，
+所有串流訂閱者與拍照功能都從緩衝區讀取，不再各自開啟設備。
+
+MJPEG 直通（mjpeg_passthrough）：要求相機輸出 MJPG 並關閉 OpenCV 的 RGB 轉換，緩衝區保存相機的 JPEG 原始資料，
+預覽直接轉送不再解碼與重新編碼；拍照與 OCR 需要像素時才解碼，變化偵測與清晰度只解碼縮小的灰階影像。
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+
+import cv2
+import numpy as np
+
+
+def frame_sharpness(frame, sample_width=640):
+    """
+    計算畫面清晰度（拉普拉斯變異數，越大越清晰；動態模糊或失焦時明顯下降）
+
+    Args:
+        frame: BGR 影像
+        sample_width: 計算前縮小到的寬度（降低運算量）
+
+    Returns:
+        float: 清晰度分數
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    if gray.shape[1] > sample_width:
+        ratio = sample_width / float(gray.shape[1])
+        gray = cv2.resize(gray, None, fx=ratio, fy=ratio, interpolation=cv2.INTER_AREA)
+    return float(cv2.Laplacian(gray, cv2.CV_64F).var())
+
+
+def is_jpeg_buffer(frame):
+    """VideoCapture 關閉 RGB 轉換時回傳的是否為 JPEG 原始資料（1 x N 或 N 的 uint8，以 FFD8 開頭）"""
+    return (frame.dtype == np.uint8 and (frame.ndim == 1 or (frame.ndim == 2 and frame.shape[0] == 1))
+            and frame.size > 2 and frame.flat[0] == 0xFF and frame.flat[1] == 0xD8)
+
+
+class MJPEGFrame:
+    """相機輸出的 MJPEG 畫面（保留 JPEG 原始資料，需要像素時才解碼，解碼結果保留供其他讀取者共用）"""
+
+    # cv2.imdecode 以 DCT 縮小解碼的旗標（比完整解碼再縮小快得多）
+    _REDUCED_GRAYSCALE = {1: cv2.IMREAD_GRAYSCALE, 2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+                          4: cv2.IMREAD_REDUCED_GRAYSCALE_4, 8: cv2.IMREAD_REDUCED_GRAYSCALE_8}
+
+    __slots__ = ('data', '_image', '_gray', '_lock')
+
+    def __init__(self, data):
+        self.data = data
+        self._image = None
+        self._gray = {}
+        self._lock = threading.Lock()
+
+    def image(self):
+        """
+        完整解析度的 BGR 影像
+
+        Returns:
+            numpy array，資料損毀時回傳 None
+        """
+        with self._lock:
+            if self._image is None:
+                self._image = cv2.imdecode(np.frombuffer(self.data, np.uint8), cv2.IMREAD_COLOR)
+            return self._image
+
+    def gray(self, factor=1):
+        """
+        縮小 factor 倍（1、2、4、8）的灰階影像（變化偵測與清晰度計算用）
+
+        Returns:
+            numpy array，資料損毀時回傳 None
+        """
+        with self._lock:
+            gray = self._gray.get(factor)
+            if gray is None:
+                gray = cv2.imdecode(np.frombuffer(self.data, np.uint8), self._REDUCED_GRAYSCALE[factor])
+                self._gray[factor] = gray
+            return gray
+
+
+class CameraFrameProducer:
+    """單一相機設備的影像生產者（背景執行緒 + 環形緩衝區）"""
+
+    def __init__(self, device_id, frame_width, frame_height, warmup_delay=0.5,
+                 buffer_size=4, idle_timeout=30.0, logger=None, capture_factory=None, mjpeg_passthrough=False):
+        """
+        初始化影像生產者
+
+        Args:
+            device_id: 相機設備編號
+            frame_width: 解析度寬度
+            frame_height: 解析度高度
+            warmup_delay: 開啟相機後等待初始化的時間（秒）
+            buffer_size: 環形緩衝區保留的畫面數量
+            idle_timeout: 沒有訂閱者且無人讀取超過此秒數後自動釋放相機（0 表示不釋放）
+            logger: 日誌物件
+            capture_factory: 建立 VideoCapture 的函數（預設 cv2.VideoCapture）
+            mjpeg_passthrough: 要求相機輸出 MJPG 並保留 JPEG 原始資料（相機或後端不支援時自動改回 BGR）
+        """
+        self.device_id = device_id
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.warmup_delay = warmup_delay
+        self.idle_timeout = idle_timeout
+        self.logger = logger or logging.getLogger('BookReaderFlask')
+        self.capture_factory = capture_factory or cv2.VideoCapture
+        self.mjpeg_passthrough = mjpeg_passthrough
+
+        # 環形緩衝區：(seq, timestamp, frame)，frame 為 BGR 影像或 MJPEGFrame（以 decode() 取得像素）
+        self._frames = deque(maxlen=max(1, buffer_size))
+        self._seq = 0
+        self._condition = threading.Condition()
+
+        # JPEG 編碼快取：(seq, quality) -> bytes，多個訂閱者共用同一次編碼
+        self._encoded = {}
+        self._encode_lock = threading.Lock()
+
+        self._subscribers = 0
+        self._last_access = time.monotonic()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        # 狀態資訊（供串流回報錯誤）
+        self.opened = False
+        self.last_error = None
+        self.consecutive_failures = 0
+        self.frames_read = 0
+        self.failed_reads = 0
+        # 目前緩衝區畫面的格式：bgr 或 mjpeg（直通）
+        self.frame_format = None
+
+    # ------------------------------------------------------------------
+    # 生命週期
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """啟動背景讀取執行緒"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._last_access = time.monotonic()
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f'camera-producer-{self.device_id}',
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        """停止背景執行緒並釋放相機"""
+        self._stop_event.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def is_alive(self):
+        """背景執行緒是否仍在運作"""
+        return self._thread is not None and self._thread.is_alive() and not self._stop_event.is_set()
+
+    # ------------------------------------------------------------------
+    # 訂閱者管理
+    # ------------------------------------------------------------------
+
+    def subscribe(self):
+        """登記一個串流訂閱者"""
+        with self._condition:
+            self._subscribers += 1
+            self._last_access = time.monotonic()
+            return self._subscribers
+
+    def unsubscribe(self):
+        """取消登記串流訂閱者"""
+        with self._condition:
+            self._subscribers = max(0, self._subscribers - 1)
+            self._last_access = time.monotonic()
+            return self._subscribers
+
+    @property
+    def subscriber_count(self):
+        """目前的串流訂閱者數量"""
+        return self._subscribers
+
+    # ------------------------------------------------------------------
+    # 讀取畫面
+    # ------------------------------------------------------------------
+
+    @property
+    def latest_seq(self):
+        """最新畫面的序號（尚無畫面時為 0）"""
+        return self._seq
+
+    def latest(self):
+        """
+        取得最新一幀（不等待）
+
+        Returns:
+            tuple: (seq, timestamp, frame)，尚無畫面則回傳 None
+        """
+        with self._condition:
+            self._last_access = time.monotonic()
+            if not self._frames:
+                return None
+            return self._frames[-1]
+
+    def recent_frames(self):
+        """
+        取得緩衝區內所有畫面（由舊到新）
+
+        Returns:
+            list: [(seq, timestamp, frame), ...]
+        """
+        with self._condition:
+            self._last_access = time.monotonic()
+            return list(self._frames)
+
+    def wait_for_frame(self, after_seq=0, timeout=1.0):
+        """
+        等待序號大於 after_seq 的新畫面
+
+        Args:
+            after_seq: 已取得的最後序號
+            timeout: 最長等待時間（秒）
+
+        Returns:
+            tuple: (seq, timestamp, frame)，逾時或已停止則回傳 None
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            self._last_access = time.monotonic()
+            while self._seq <= after_seq:
+                if self._stop_event.is_set():
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+            return self._frames[-1]
+
+    def decode(self, entry):
+        """
+        取得畫面的 BGR 影像（MJPEG 畫面在第一次需要時解碼；回傳的影像由所有讀取者共用，修改前請複製）
+
+        Args:
+            entry: wait_for_frame() / latest() 回傳的 (seq, timestamp, frame)
+
+        Returns:
+            numpy array，解碼失敗則回傳 None
+        """
+        frame = entry[2]
+        return frame.image() if isinstance(frame, MJPEGFrame) else frame
+
+    def analysis_image(self, entry, min_width):
+        """
+        取得分析用的影像（變化偵測、清晰度）：BGR 畫面直接回傳，MJPEG 畫面只解碼縮小的灰階影像
+
+        Args:
+            entry: (seq, timestamp, frame)
+            min_width: 分析所需的最小寬度（縮小後不小於此寬度）
+
+        Returns:
+            numpy array（BGR 或灰階），解碼失敗則回傳 None
+        """
+        frame = entry[2]
+        if not isinstance(frame, MJPEGFrame):
+            return frame
+        factor = 8
+        while factor > 1 and self.frame_width / factor < min_width:
+            factor //= 2
+        return frame.gray(factor)
+
+    def sharpness(self, entry, sample_width=640):
+        """畫面清晰度（見 frame_sharpness），無法解碼時回傳 0"""
+        image = self.analysis_image(entry, sample_width)
+        return frame_sharpness(image, sample_width) if image is not None else 0.0
+
+    def sharpest_frame(self, count=5, max_age=1.0):
+        """
+        從緩衝區最近的畫面中挑選最清晰的一幀（不需等待新畫面）
+
+        Args:
+            count: 最多比較的畫面數量（由新到舊）
+            max_age: 只考慮此秒數內讀取的畫面
+
+        Returns:
+            tuple: ((seq, timestamp, frame), 清晰度)，沒有夠新的畫面則回傳 (None, None)
+        """
+        now = time.time()
+        with self._condition:
+            self._last_access = time.monotonic()
+            candidates = [entry for entry in list(self._frames)[-max(1, count):] if now - entry[1] <= max_age]
+
+        # 在鎖外計算清晰度，不阻擋背景讀取執行緒
+        best_entry, best_score = None, None
+        for entry in candidates:
+            score = self.sharpness(entry)
+            if best_score is None or score > best_score:
+                best_entry, best_score = entry, score
+        return best_entry, best_score
+
+    def encode_jpeg(self, entry, quality=85):
+        """
+        將緩衝區畫面編碼為 JPEG（相同畫面與品質只編碼一次）
+
+        MJPEG 直通的畫面直接回傳相機的 JPEG（不解碼、不重新編碼，quality 不適用）。
+
+        Args:
+            entry: wait_for_frame() / latest() 回傳的 (seq, timestamp, frame)
+            quality: JPEG 品質（1-100）
+
+        Returns:
+            bytes: JPEG 資料，編碼失敗則回傳 None
+        """
+        seq, _, frame = entry
+        if isinstance(frame, MJPEGFrame):
+            return frame.data
+        key = (seq, quality)
+        with self._encode_lock:
+            cached = self._encoded.get(key)
+        if cached is not None:
+            return cached
+
+        ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok:
+            return None
+        data = buffer.tobytes()
+
+        with self._encode_lock:
+            # 只保留最新畫面的編碼結果
+            self._encoded = {k: v for k, v in self._encoded.items() if k[0] >= seq}
+            self._encoded[key] = data
+        return data
+
+    # ------------------------------------------------------------------
+    # 背景執行緒
+    # ------------------------------------------------------------------
+
+    def _is_idle(self):
+        """沒有訂閱者且長時間無人讀取"""
+        if self.idle_timeout <= 0:
+            return False
+        with self._condition:
+            return (self._subscribers == 0 and
+                    time.monotonic() - self._last_access > self.idle_timeout)
+
+    def _open(self):
+        """開啟相機設備"""
+        cap = self.capture_factory(self.device_id)
+        if not cap.isOpened():
+            cap.release()
+            return None
+        if self.mjpeg_passthrough:
+            # V4L2 需要在設定解析度前選擇像素格式；關閉 RGB 轉換後 read() 回傳 JPEG 原始資料
+            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.frame_width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.frame_height)
+        if self.mjpeg_passthrough:
+            cap.set(cv2.CAP_PROP_CONVERT_RGB, 0)
+        time.sleep(self.warmup_delay)
+        return cap
+
+    def _wrap_frame(self, cap, frame):
+        """
+        將 read() 的結果轉換為緩衝區畫面（JPEG 原始資料包裝為 MJPEGFrame）
+
+        Returns:
+            BGR 影像或 MJPEGFrame；MJPEG 直通不可用（相機不支援 MJPG，回傳其他未轉換的格式）時
+            恢復 RGB 轉換並回傳 None（捨棄這一幀）
+        """
+        if is_jpeg_buffer(frame):
+            frame_format, frame = 'mjpeg', MJPEGFrame(frame.tobytes())
+        elif frame.ndim == 3 and frame.shape[2] == 3:
+            frame_format = 'bgr'
+        else:
+            self.logger.warning(
+                f"相機設備 {self.device_id} 未輸出 MJPEG（畫面形狀 {frame.shape}），停用 MJPEG 直通"
+            )
+            cap.set(cv2.CAP_PROP_CONVERT_RGB, 1)
+            self.mjpeg_passthrough = False
+            return None
+        if frame_format != self.frame_format:
+            self.frame_format = frame_format
+            self.logger.info(f"相機設備 {self.device_id} 畫面格式: {frame_format}")
+        return frame
+
+    def _run(self):
+        """背景讀取迴圈"""
+        cap = None
+        max_consecutive_failures = 10
+
+        try:
+            while not self._stop_event.is_set():
+                if self._is_idle():
+                    self.logger.info(f"相機設備 {self.device_id} 閒置超過 {self.idle_timeout} 秒，釋放相機")
+                    break
+
+                if cap is None:
+                    cap = self._open()
+                    if cap is None:
+                        self.opened = False
+                        self.consecutive_failures += 1
+                        self.last_error = '無法打開相機'
+                        self.logger.warning(f"影像生產者無法打開相機設備 {self.device_id}")
+                        self._stop_event.wait(0.5)
+                        continue
+                    self.opened = True
+                    self.last_error = None
+                    self.consecutive_failures = 0
+                    self.logger.info(
+                        f"影像生產者已啟動: 設備 {self.device_id}, "
+                        f"解析度 {self.frame_width}x{self.frame_height}"
+                    )
+
+                ret, frame = cap.read()
+                if not ret or frame is None:
+                    self.failed_reads += 1
+                    self.consecutive_failures += 1
+                    self.last_error = '無法讀取相機畫面'
+                    if self.consecutive_failures >= max_consecutive_failures:
+                        # 連續讀取失敗，重新開啟相機
+                        self.logger.warning(f"相機設備 {self.device_id} 連續讀取失敗，重新開啟")
+                        cap.release()
+                        cap = None
+                        self.opened = False
+                        self._stop_event.wait(0.5)
+                    else:
+                        self._stop_event.wait(0.05)
+                    continue
+
+                frame = self._wrap_frame(cap, frame)
+                if frame is None:
+                    continue
+
+                self.consecutive_failures = 0
+                self.last_error = None
+                self.frames_read += 1
+                with self._condition:
+                    self._seq += 1
+                    self._frames.append((self._seq, time.time(), frame))
+                    self._condition.notify_all()
+        except Exception as e:
+            self.last_error = f'相機執行緒錯誤: {e}'
+            self.logger.error(f"影像生產者發生錯誤（設備 {self.device_id}）: {e}")
+        finally:
+            if cap is not None:
+                cap.release()
+            self.opened = False
+            self._stop_event.set()
+            with self._condition:
+                self._condition.notify_all()
+            self.logger.info(f"影像生產者已停止，已釋放相機設備 {self.device_id}")
+
+
+class FrameChangeDetector:
+    """
+    預覽畫面變化偵測器
+    將畫面縮小為灰階小圖後與上次送出的畫面比較，只有變化超過門檻或到達保活間隔時才需要送出。
+    """
+
+    def __init__(self, pixel_threshold=12, ratio_threshold=0.01, keepalive_interval=2.0, sample_width=64):
+        """
+        初始化變化偵測器
+
+        Args:
+            pixel_threshold: 單一像素灰階差異超過此值才算變化（0-255）
+            ratio_threshold: 變化像素比例超過此值才視為畫面改變（0-1）
+            keepalive_interval: 畫面未變化時的保活送出間隔（秒）
+            sample_width: 比較用小圖的寬度（像素）
+        """
+        self.pixel_threshold = pixel_threshold
+        self.ratio_threshold = ratio_threshold
+        self.keepalive_interval = keepalive_interval
+        self.sample_width = sample_width
+
+        self._last_signature = None
+        self._last_sent = 0.0
+
+    def signature(self, frame):
+        """
+        計算比較用的縮小灰階影像
+
+        Args:
+            frame: BGR 或灰階影像
+
+        Returns:
+            numpy array: 縮小後的灰階影像
+        """
+        height, width = frame.shape[:2]
+        sample_height = max(1, int(height * self.sample_width / max(width, 1)))
+        small = cv2.resize(frame, (self.sample_width, sample_height), interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small
+
+    def change_ratio(self, signature):
+        """與上次送出畫面相比的變化像素比例（尚未送出過時為 1.0）"""
+        if self._last_signature is None or self._last_signature.shape != signature.shape:
+            return 1.0
+        diff = cv2.absdiff(signature, self._last_signature)
+        return float(cv2.countNonZero(cv2.threshold(diff, self.pixel_threshold, 255, cv2.THRESH_BINARY)[1])) / diff.size
+
+    def should_send(self, frame, now=None):
+        """
+        判斷此畫面是否需要送出
+
+        Args:
+            frame: 影像
+            now: 目前時間（monotonic 秒），預設為 time.monotonic()
+
+        Returns:
+            tuple: (是否送出, 變化像素比例)
+        """
+        now = time.monotonic() if now is None else now
+        signature = self.signature(frame)
+        ratio = self.change_ratio(signature)
+
+        if ratio >= self.ratio_threshold or now - self._last_sent >= self.keepalive_interval:
+            self._last_signature = signature
+            self._last_sent = now
+            return True, ratio
+
+        return False, ratio
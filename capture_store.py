@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+拍攝暫存
+拍攝的畫面只在伺服器端編碼一次 JPEG，以拍攝 ID 保存；瀏覽器以網址顯示照片，
+OCR 以拍攝 ID 送出請求，影像不再以 base64 在瀏覽器與伺服器之間往返。
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+
+class Capture:
+    """單次拍攝（原始畫面與其 JPEG 編碼）"""
+
+    def __init__(self, capture_id, frame, jpeg_bytes, sharpness=None, frame_age=None):
+        self.id = capture_id
+        self.frame = frame
+        self.jpeg_bytes = jpeg_bytes
+        # 選用畫面的清晰度與按下拍攝時該畫面已讀取多久（秒）
+        self.sharpness = sharpness
+        self.frame_age = frame_age
+        self.created_at = time.time()
+
+
+class CaptureStore:
+    """以拍攝 ID 保存最近的拍攝（數量與存活時間有上限）"""
+
+    def __init__(self, max_captures=8, ttl=600, logger=None):
+        """
+        初始化拍攝暫存
+
+        Args:
+            max_captures: 最多保留的拍攝數量（每張保留解碼後的畫面，注意記憶體用量）
+            ttl: 拍攝保留時間（秒），逾時後無法再以 ID 送出 OCR
+            logger: 日誌物件
+        """
+        self.max_captures = max(1, max_captures)
+        self.ttl = ttl
+        self.logger = logger or logging.getLogger('BookReaderFlask')
+        self._captures = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_id():
+        """產生拍攝 ID（與結果 ID、圖片檔名使用相同格式）"""
+        return datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+
+    def add(self, capture):
+        """
+        保存拍攝
+
+        Args:
+            capture: Capture 物件
+        """
+        with self._lock:
+            self._captures[capture.id] = capture
+            self._evict()
+
+    def get(self, capture_id):
+        """
+        取得拍攝
+
+        Args:
+            capture_id: 拍攝 ID
+
+        Returns:
+            Capture 或 None（不存在或已逾時）
+        """
+        with self._lock:
+            self._evict()
+            return self._captures.get(capture_id)
+
+    def _evict(self):
+        """移除逾時與超出數量的拍攝（呼叫者需持有鎖）"""
+        deadline = time.time() - self.ttl
+        while self._captures:
+            oldest = next(iter(self._captures.values()))
+            if len(self._captures) > self.max_captures or oldest.created_at < deadline:
+                self._captures.popitem(last=False)
+            else:
+                break
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模擬相機
+取代 cv2.VideoCapture，在沒有 USB 相機的環境執行基準測試與開發：
+SyntheticCapture 依設定的 FPS 產生合成的書頁畫面，VideoFileCapture 循環播放影片檔。
+兩者都實作影像生產者使用的 isOpened / read / set / get / release 介面；
+與 V4L2 相同，設定 FOURCC 為 MJPG 並關閉 CAP_PROP_CONVERT_RGB 時 read() 回傳 JPEG 原始資料（1 x N uint8）。
+
+用法:
+    reader.capture_factory = make_capture_factory(fps=30)
+    reader.capture_factory = make_capture_factory(video='page_flip.mp4')
+"""
+
+import time
+import random
+
+import cv2
+import numpy as np
+
+
+def render_page(width, height, seed=0, lines=None):
+    """
+    產生模擬書頁影像（淺色紙張、深色文字行與頁緣的桌面背景）
+
+    Args:
+        width: 影像寬度
+        height: 影像高度
+        seed: 隨機種子（不同種子產生不同的頁面）
+        lines: 文字行數，None 表示依高度決定
+
+    Returns:
+        BGR 影像
+    """
+    rng = random.Random(seed)
+    image = np.full((height, width, 3), (70, 90, 110), np.uint8)
+    margin_x, margin_y = int(width * 0.08), int(height * 0.05)
+    cv2.rectangle(image, (margin_x, margin_y), (width - margin_x, height - margin_y), (225, 232, 236), -1)
+
+    scale = max(0.4, height / 1400.0)
+    line_height = max(12, int(34 * scale))
+    count = lines if lines is not None else (height - 2 * margin_y - 40) // line_height
+    words = ('the', 'quick', 'brown', 'fox', 'jumps', 'over', 'lazy', 'dog', 'reading', 'robot', 'page', 'light')
+    for index in range(count):
+        y = margin_y + 30 + index * line_height
+        if y > height - margin_y - 10:
+            break
+        text = ' '.join(rng.choice(words) for _ in range(12))
+        cv2.putText(image, f'{index + 1:02d} {text}', (margin_x + 20, y), cv2.FONT_HERSHEY_SIMPLEX,
+                    0.6 * scale * 1.6, (25, 25, 25), max(1, int(scale * 2)), cv2.LINE_AA)
+    return image
+
+
+class _PacedCapture:
+    """依 FPS 節奏回傳畫面的基底類別（read() 會等待到下一幀的時間，模擬相機的讀取阻塞）"""
+
+    # 模擬 MJPEG 相機硬體壓縮的 JPEG 品質
+    MJPEG_QUALITY = 80
+
+    def __init__(self, fps=30.0, drop_rate=0.0, seed=0):
+        self.fps = fps
+        self.drop_rate = drop_rate
+        self._rng = random.Random(seed)
+        self._next_frame_at = None
+        self._opened = True
+        self._props = {}
+
+    def isOpened(self):
+        return self._opened
+
+    def release(self):
+        self._opened = False
+
+    def set(self, prop, value):
+        self._props[prop] = value
+        return True
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return float(self.fps)
+        return float(self._props.get(prop, 0))
+
+    def _wait_for_frame(self):
+        if not self.fps:
+            return
+        now = time.monotonic()
+        if self._next_frame_at is None or now - self._next_frame_at > 1.0:
+            self._next_frame_at = now
+        delay = self._next_frame_at - now
+        if delay > 0:
+            time.sleep(delay)
+        self._next_frame_at += 1.0 / self.fps
+
+    def read(self):
+        if not self._opened:
+            return False, None
+        self._wait_for_frame()
+        if self.drop_rate and self._rng.random() < self.drop_rate:
+            # 模擬 USB 頻寬不足或驅動程式逾時造成的讀取失敗
+            return False, None
+        if self._mjpeg_output():
+            data = self._next_jpeg()
+            return data is not None, data
+        image = self._next_image()
+        return image is not None, image
+
+    def _mjpeg_output(self):
+        """是否要求 MJPG 且關閉 RGB 轉換（此時回傳 JPEG 原始資料）"""
+        return (int(self._props.get(cv2.CAP_PROP_FOURCC, 0)) == cv2.VideoWriter_fourcc(*'MJPG') and
+                not self._props.get(cv2.CAP_PROP_CONVERT_RGB, 1))
+
+    @classmethod
+    def _encode(cls, image):
+        ok, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, cls.MJPEG_QUALITY])
+        return buffer.reshape(1, -1) if ok else None
+
+    def _next_image(self):
+        raise NotImplementedError
+
+    def _next_jpeg(self):
+        """下一幀的 JPEG 原始資料（真實相機由硬體壓縮，子類別可快取以免壓縮成本算進基準測試）"""
+        image = self._next_image()
+        return self._encode(image) if image is not None else None
+
+
+class SyntheticCapture(_PacedCapture):
+    """合成書頁相機：畫面有輕微晃動，每 page_interval 秒換一頁"""
+
+    def __init__(self, device_id=0, fps=30.0, width=None, height=None, page_interval=0.0, jitter=2,
+                 drop_rate=0.0, seed=0):
+        """
+        Args:
+            device_id: 設備編號（只用於區分不同頁面內容）
+            fps: 畫面產生速率（0 表示不限速）
+            width, height: 解析度，None 表示使用影像生產者設定的解析度（預設 1280x720）
+            page_interval: 每隔幾秒換成另一頁（0 表示固定同一頁）
+            jitter: 每幀隨機平移的最大像素數（模擬手持或桌面震動，0 表示靜止畫面）
+            drop_rate: 讀取失敗的機率
+            seed: 隨機種子
+        """
+        super().__init__(fps=fps, drop_rate=drop_rate, seed=seed)
+        self.device_id = device_id
+        self.width = width
+        self.height = height
+        self.page_interval = page_interval
+        self.jitter = jitter
+        self.seed = seed
+        self._started = time.monotonic()
+        self._page = None
+        self._page_key = None
+        # MJPEG 輸出：同一頁面與平移量只壓縮一次
+        self._jpegs = {}
+
+    def _size(self):
+        width = self.width or int(self._props.get(cv2.CAP_PROP_FRAME_WIDTH) or 1280)
+        height = self.height or int(self._props.get(cv2.CAP_PROP_FRAME_HEIGHT) or 720)
+        return width, height
+
+    def _update_page(self):
+        width, height = self._size()
+        page_index = int((time.monotonic() - self._started) / self.page_interval) if self.page_interval else 0
+        key = (width, height, page_index)
+        if key != self._page_key:
+            self._page = render_page(width, height, seed=self.seed * 1000 + self.device_id * 100 + page_index)
+            self._page_key = key
+            self._jpegs = {}
+
+    def _offset(self):
+        if not self.jitter:
+            return 0, 0
+        return self._rng.randint(-self.jitter, self.jitter), self._rng.randint(-self.jitter, self.jitter)
+
+    def _next_image(self):
+        self._update_page()
+        dx, dy = self._offset()
+        if not dx and not dy:
+            return self._page.copy()
+        return np.roll(self._page, (dy, dx), axis=(0, 1))
+
+    def _next_jpeg(self):
+        self._update_page()
+        offset = self._offset()
+        data = self._jpegs.get(offset)
+        if data is None:
+            data = self._jpegs[offset] = self._encode(np.roll(self._page, offset[::-1], axis=(0, 1)))
+        return data.copy()
+
+
+class VideoFileCapture(_PacedCapture):
+    """循環播放影片檔（例如錄下的翻頁過程），依影片 FPS 或指定 FPS 回傳畫面"""
+
+    def __init__(self, path, fps=None, drop_rate=0.0, seed=0):
+        """
+        Args:
+            path: 影片檔路徑
+            fps: 播放速率，None 表示使用影片本身的 FPS
+            drop_rate: 讀取失敗的機率
+            seed: 隨機種子
+        """
+        self._video = cv2.VideoCapture(path)
+        if not self._video.isOpened():
+            raise IOError(f'無法開啟影片檔: {path}')
+        file_fps = self._video.get(cv2.CAP_PROP_FPS) or 30.0
+        super().__init__(fps=fps if fps is not None else file_fps, drop_rate=drop_rate, seed=seed)
+        self.path = path
+
+    def release(self):
+        super().release()
+        self._video.release()
+
+    def _next_image(self):
+        ret, frame = self._video.read()
+        if not ret:
+            # 播放完畢從頭開始
+            self._video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self._video.read()
+            if not ret:
+                return None
+        width = int(self._props.get(cv2.CAP_PROP_FRAME_WIDTH) or 0)
+        height = int(self._props.get(cv2.CAP_PROP_FRAME_HEIGHT) or 0)
+        if width and height and (frame.shape[1], frame.shape[0]) != (width, height):
+            frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+        return frame
+
+
+def make_capture_factory(video=None, fps=None, **kwargs):
+    """
+    建立可指定給 BookReaderFlask.capture_factory 的函數
+
+    Args:
+        video: 影片檔路徑，None 表示使用合成書頁
+        fps: 畫面速率，None 表示合成書頁 30 FPS、影片檔使用影片本身的 FPS
+        **kwargs: 傳給 SyntheticCapture / VideoFileCapture 的其他參數
+
+    Returns:
+        callable: factory(device_id) -> capture
+    """
+    if video:
+        return lambda device_id: VideoFileCapture(video, fps=fps, **kwargs)
+    return lambda device_id: SyntheticCapture(device_id, fps=30.0 if fps is None else fps, **kwargs)
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+照片存儲
+OCR 結果的照片以內容雜湊命名（store/<前兩碼>/<SHA-256>.jpg）：名稱不會衝突，同一張照片重複辨識只存一份，
+內容不變所以瀏覽器可長期快取。以 SQLite 索引記錄每張照片的大小與最近檢視時間，
+超過容量上限（總大小、檔案數或磁碟剩餘空間）時由背景執行緒依最近最少檢視的順序刪除：
+先刪除沒有任何結果引用的照片，仍超過上限時（evict_referenced）再刪除被引用的照片，結果保留文字、移除照片連結。
+寫入只新增檔案與一列索引，不在寫入時刪除舊照片，磁碟接近滿載時寫入延遲不會增加。
+
+舊版以時間戳記命名的 capture_*.jpg 在背景掃描時納入管理；圖片目錄中的其他檔案（批次 OCR 的來源資料夾）不會被刪除。
+"""
+
+import os
+import time
+import shutil
+import sqlite3
+import hashlib
+import logging
+import threading
+
+
+class ImageStore:
+    """以內容雜湊命名、有容量上限的照片存儲"""
+
+    STORE_DIR = 'store'
+    # 淘汰時每次從索引讀取的筆數
+    EVICT_BATCH = 256
+
+    def __init__(self, root, index_db='image_index.db', max_bytes=0, max_files=0, min_free_bytes=0,
+                 low_watermark=0.9, evict_referenced=False, compaction_interval=60.0,
+                 is_referenced=None, on_evict=None, logger=None):
+        """
+        Args:
+            root: 圖片目錄
+            index_db: 索引資料庫路徑
+            max_bytes: 照片總大小上限（0 表示不限制）
+            max_files: 照片數量上限（0 表示不限制）
+            min_free_bytes: 磁碟至少保留的剩餘空間（0 表示不檢查）
+            low_watermark: 超過上限時刪除到上限的此比例（避免每次寫入都觸發淘汰）
+            evict_referenced: 刪除沒有引用的照片後仍超過上限時，是否刪除被結果引用的照片
+            compaction_interval: 背景整理的間隔秒數（超過上限時會立即喚醒）
+            is_referenced: 函數，傳入照片路徑列表，回傳其中被結果引用的路徑集合
+            on_evict: 函數 (名稱, 路徑, 是否被引用)，照片刪除後呼叫（刪除縮圖、移除結果的照片連結）
+            logger: 日誌物件
+        """
+        # 絕對路徑：照片路徑與結果記錄的路徑一致，引用檢查才不受工作目錄與相對路徑影響
+        self.root = os.path.abspath(root)
+        self.index_db = index_db
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.min_free_bytes = min_free_bytes
+        self.low_watermark = min(max(low_watermark, 0.1), 1.0)
+        self.evict_referenced = evict_referenced
+        self.compaction_interval = compaction_interval
+        self.is_referenced = is_referenced or (lambda paths: set())
+        self.on_evict = on_evict
+        self.logger = logger or logging.getLogger('BookReaderFlask')
+
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._access_lock = threading.Lock()
+        self._pending_access = {}
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._stats = {'writes': 0, 'deduplicated': 0, 'evicted': 0, 'evicted_referenced': 0,
+                       'evicted_bytes': 0, 'compactions': 0, 'last_compaction_ms': None}
+
+        os.makedirs(os.path.join(self.root, self.STORE_DIR), exist_ok=True)
+        self._create_schema()
+        row = self._connection().execute('SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM images').fetchone()
+        self._total_files, self._total_bytes = row[0], row[1]
+
+    def _connection(self):
+        """取得目前執行緒的索引資料庫連線"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.index_db, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _create_schema(self):
+        conn = self._connection()
+        with self._write_lock, conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS images (
+                    name TEXT PRIMARY KEY,
+                    bytes INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS images_last_access ON images (last_access, name)')
+
+    # ------------------------------------------------------------------
+    # 名稱與路徑
+    # ------------------------------------------------------------------
+
+    def path(self, name):
+        """照片名稱（圖片目錄中以 / 分隔的相對路徑）轉換為檔案的絕對路徑"""
+        return os.path.join(self.root, *name.split('/'))
+
+    @classmethod
+    def is_managed(cls, name):
+        """
+        是否為本存儲管理的照片（內容雜湊命名或舊版 capture_*.jpg；內容寫入後不再變更）
+
+        Args:
+            name: 圖片目錄中的相對路徑
+        """
+        if name.startswith(cls.STORE_DIR + '/'):
+            return '..' not in name.split('/')
+        return '/' not in name and name.startswith('capture_')
+
+    # ------------------------------------------------------------------
+    # 寫入與檢視
+    # ------------------------------------------------------------------
+
+    def put(self, data, ext='.jpg'):
+        """
+        保存照片（相同內容只保存一份）
+
+        Args:
+            data: 圖片資料
+            ext: 副檔名
+
+        Returns:
+            str: 照片名稱
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        name = f'{self.STORE_DIR}/{digest[:2]}/{digest[:40]}{ext}'
+        path = self.path(name)
+        now = time.time()
+
+        conn = self._connection()
+        if os.path.exists(path) and conn.execute('SELECT 1 FROM images WHERE name = ?', (name,)).fetchone():
+            self.touch(name, now)
+            with self._access_lock:
+                self._stats['deduplicated'] += 1
+            return name
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_file = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_file, path)
+
+        with self._write_lock, conn:
+            previous = conn.execute('SELECT bytes FROM images WHERE name = ?', (name,)).fetchone()
+            conn.execute('INSERT OR REPLACE INTO images (name, bytes, created_at, last_access) VALUES (?, ?, ?, ?)',
+                         (name, len(data), now, now))
+            if previous is None:
+                self._total_files += 1
+                self._total_bytes += len(data)
+            self._stats['writes'] += 1
+
+        if self._over_quota():
+            # 淘汰交給背景執行緒，寫入不等待刪除
+            self._wakeup.set()
+        return name
+
+    def touch(self, name, now=None):
+        """
+        記錄照片被檢視（只更新記憶體，由背景執行緒批次寫入索引）
+
+        Args:
+            name: 照片名稱
+        """
+        if not self.is_managed(name):
+            return
+        with self._access_lock:
+            self._pending_access[name] = now or time.time()
+
+    def stats(self):
+        with self._access_lock:
+            stats = dict(self._stats)
+        stats.update({
+            'files': self._total_files,
+            'bytes': self._total_bytes,
+            'max_bytes': self.max_bytes,
+            'max_files': self.max_files,
+            'min_free_bytes': self.min_free_bytes,
+            'disk_free_bytes': self._disk_free()
+        })
+        return stats
+
+    # ------------------------------------------------------------------
+    # 背景整理
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """啟動背景整理執行緒（先掃描圖片目錄納入未記錄的照片）"""
+        self._thread = threading.Thread(target=self._run, name='image-store', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+
+    def _run(self):
+        try:
+            self.scan()
+        except Exception as e:
+            self.logger.error(f"掃描圖片目錄失敗: {e}")
+        while not self._stopped.is_set():
+            try:
+                self._flush_access()
+                self.compact()
+            except Exception as e:
+                self.logger.error(f"整理照片存儲失敗: {e}")
+            self._wakeup.wait(self.compaction_interval)
+            self._wakeup.clear()
+
+    def scan(self):
+        """
+        將索引與圖片目錄同步：納入未記錄的照片（舊版 capture_*.jpg、索引遺失時的 store/ 檔案），
+        移除檔案已不存在的索引，清除中斷寫入留下的暫存檔
+
+        Returns:
+            tuple: (新增筆數, 移除筆數)
+        """
+        found = {}
+        for entry in os.scandir(self.root):
+            if entry.is_file() and self.is_managed(entry.name) and not entry.name.endswith('.tmp'):
+                found[entry.name] = entry.stat()
+        store_dir = os.path.join(self.root, self.STORE_DIR)
+        stale_before = time.time() - 3600
+        for directory, _, files in os.walk(store_dir):
+            for filename in files:
+                path = os.path.join(directory, filename)
+                stat = os.stat(path)
+                if filename.endswith('.tmp'):
+                    if stat.st_mtime < stale_before:
+                        os.remove(path)
+                    continue
+                name = os.path.relpath(path, self.root).replace(os.sep, '/')
+                found[name] = stat
+
+        conn = self._connection()
+        known = {row[0] for row in conn.execute('SELECT name FROM images')}
+        added = [(name, stat.st_size, stat.st_mtime, stat.st_mtime)
+                 for name, stat in found.items() if name not in known]
+        removed = [name for name in known if name not in found]
+        if added or removed:
+            with self._write_lock, conn:
+                conn.executemany('INSERT OR IGNORE INTO images (name, bytes, created_at, last_access) '
+                                 'VALUES (?, ?, ?, ?)', added)
+                conn.executemany('DELETE FROM images WHERE name = ?', ((name,) for name in removed))
+                row = conn.execute('SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM images').fetchone()
+                self._total_files, self._total_bytes = row[0], row[1]
+            self.logger.info(f"照片存儲索引已同步: 新增 {len(added)} 張、移除 {len(removed)} 筆")
+        return len(added), len(removed)
+
+    def _flush_access(self):
+        """將記憶體中的檢視時間寫入索引"""
+        with self._access_lock:
+            pending, self._pending_access = self._pending_access, {}
+        if pending:
+            with self._write_lock, self._connection() as conn:
+                conn.executemany('UPDATE images SET last_access = MAX(last_access, ?) WHERE name = ?',
+                                 ((timestamp, name) for name, timestamp in pending.items()))
+
+    def _disk_free(self):
+        try:
+            return shutil.disk_usage(self.root).free
+        except OSError:
+            return None
+
+    def _over_quota(self):
+        """是否超過任一容量上限"""
+        if self.max_bytes and self._total_bytes > self.max_bytes:
+            return True
+        if self.max_files and self._total_files > self.max_files:
+            return True
+        if self.min_free_bytes:
+            free = self._disk_free()
+            return free is not None and free < self.min_free_bytes
+        return False
+
+    def _targets(self):
+        """
+        計算需要釋放的空間與檔案數（刪除到上限的 low_watermark 比例）
+
+        Returns:
+            tuple: (位元組數, 檔案數)
+        """
+        free_bytes, free_files = 0, 0
+        if self.max_bytes and self._total_bytes > self.max_bytes:
+            free_bytes = self._total_bytes - int(self.max_bytes * self.low_watermark)
+        if self.max_files and self._total_files > self.max_files:
+            free_files = self._total_files - int(self.max_files * self.low_watermark)
+        if self.min_free_bytes:
+            disk_free = self._disk_free()
+            if disk_free is not None and disk_free < self.min_free_bytes:
+                free_bytes = max(free_bytes, int(self.min_free_bytes / self.low_watermark) - disk_free)
+        return free_bytes, free_files
+
+    def compact(self):
+        """
+        超過容量上限時依最近最少檢視的順序刪除照片
+
+        Returns:
+            int: 刪除的照片數
+        """
+        if not self._over_quota():
+            return 0
+        start = time.perf_counter()
+        self._flush_access()
+        need_bytes, need_files = self._targets()
+        evicted = 0
+        passes = (False, True) if self.evict_referenced else (False,)
+        for include_referenced in passes:
+            if need_bytes <= 0 and need_files <= 0:
+                break
+            freed_bytes, freed_files = self._evict_pass(include_referenced, need_bytes, need_files)
+            need_bytes -= freed_bytes
+            need_files -= freed_files
+            evicted += freed_files
+
+        elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+        with self._access_lock:
+            self._stats['compactions'] += 1
+            self._stats['last_compaction_ms'] = elapsed_ms
+        if need_bytes > 0 or need_files > 0:
+            self.logger.warning(
+                f"照片存儲仍超過上限（剩餘 {need_bytes / 1048576:.1f} MB、{max(need_files, 0)} 張）："
+                f"{'其餘照片都被結果引用' if not self.evict_referenced else '沒有可刪除的照片'}"
+            )
+        if evicted:
+            self.logger.info(f"照片存儲已刪除 {evicted} 張最近最少檢視的照片（{elapsed_ms} ms）")
+        return evicted
+
+    def _evict_pass(self, include_referenced, need_bytes, need_files):
+        """
+        依最近檢視時間由舊到新刪除照片
+
+        Args:
+            include_referenced: 是否刪除被結果引用的照片（False 時只刪除沒有引用的照片）
+            need_bytes: 需要釋放的位元組數
+            need_files: 需要釋放的檔案數
+
+        Returns:
+            tuple: (釋放的位元組數, 刪除的檔案數)
+        """
+        conn = self._connection()
+        freed_bytes, freed_files = 0, 0
+        last_key = (-1.0, '')
+        while (freed_bytes < need_bytes or freed_files < need_files) and not self._stopped.is_set():
+            rows = conn.execute(
+                'SELECT name, bytes, last_access FROM images WHERE (last_access, name) > (?, ?) '
+                'ORDER BY last_access, name LIMIT ?', (*last_key, self.EVICT_BATCH)
+            ).fetchall()
+            if not rows:
+                break
+            last_key = (rows[-1][2], rows[-1][0])
+            referenced = self.is_referenced([self.path(name) for name, _, _ in rows])
+            for name, size, _ in rows:
+                path = self.path(name)
+                is_referenced = path in referenced
+                if is_referenced and not include_referenced:
+                    continue
+                self._delete(name, size, is_referenced)
+                freed_bytes += size
+                freed_files += 1
+                if freed_bytes >= need_bytes and freed_files >= need_files:
+                    break
+        return freed_bytes, freed_files
+
+    def _delete(self, name, size, referenced):
+        """刪除一張照片與其索引"""
+        path = self.path(name)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        with self._write_lock, self._connection() as conn:
+            conn.execute('DELETE FROM images WHERE name = ?', (name,))
+            self._total_files -= 1
+            self._total_bytes -= size
+        with self._access_lock:
+            self._pending_access.pop(name, None)
+            self._stats['evicted'] += 1
+            self._stats['evicted_bytes'] += size
+            if referenced:
+                self._stats['evicted_referenced'] += 1
+        if self.on_evict is not None:
+            try:
+                self.on_evict(name, path, referenced)
+            except Exception as e:
+                self.logger.warning(f"照片 {name} 刪除後的處理失敗: {e}")
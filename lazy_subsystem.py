@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+延遲建立的子系統
+啟動時只記錄建立函數，第一次使用或背景預熱時才建立（例如讀取結果資料庫、載入快取檔），
+並記錄狀態與耗時供 /readyz 回報。同時有多個執行緒要求時只建立一次，其他執行緒等待建立完成。
+"""
+
+import time
+import logging
+import threading
+
+
+class LazySubsystem:
+    """延遲建立的子系統"""
+
+    def __init__(self, name, factory, required=True, logger=None):
+        """
+        Args:
+            name: 子系統名稱（/readyz 顯示）
+            factory: 建立子系統的無參數函數
+            required: 是否為就緒的必要條件（False 表示只回報狀態）
+            logger: 日誌物件
+        """
+        self.name = name
+        self.factory = factory
+        self.required = required
+        self.logger = logger or logging.getLogger('BookReaderFlask')
+        self.state = 'pending'
+        self.error = None
+        self.load_ms = None
+        self._value = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self.state == 'ready'
+
+    def get(self):
+        """
+        取得子系統（尚未建立時建立；建立失敗時拋出例外，下次呼叫會重試）
+
+        Returns:
+            factory() 的回傳值
+        """
+        if self.state == 'ready':
+            return self._value
+        with self._lock:
+            if self.state == 'ready':
+                return self._value
+            self.state = 'loading'
+            start = time.perf_counter()
+            try:
+                value = self.factory()
+            except Exception as e:
+                self.state = 'failed'
+                self.error = str(e)
+                self.load_ms = round((time.perf_counter() - start) * 1000, 1)
+                self.logger.error(f"建立 {self.name} 失敗: {e}")
+                raise
+            self._value = value
+            self.error = None
+            self.load_ms = round((time.perf_counter() - start) * 1000, 1)
+            self.state = 'ready'
+            self.logger.info(f"{self.name} 已就緒（{self.load_ms} ms）")
+            return value
+
+    def peek(self):
+        """取得已建立的子系統，尚未建立時回傳 None（不觸發建立）"""
+        return self._value if self.state == 'ready' else None
+
+    def status(self):
+        """
+        Returns:
+            dict: {state: pending / loading / ready / failed, required, load_ms, error}
+        """
+        return {'state': self.state, 'required': self.required, 'load_ms': self.load_ms, 'error': self.error}
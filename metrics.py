@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+執行指標
+以 Prometheus 文字格式（0.0.4）輸出拍攝到 OCR 各階段的延遲分布、結果計數、傳輸大小與串流狀態，
+不需安裝 prometheus_client。計數器與直方圖在事件發生時更新；
+串流與相機等既有統計在讀取 /metrics 時由收集函式即時產生。
+"""
+
+import math
+import time
+import threading
+from contextlib import contextmanager
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# 秒：涵蓋本機步驟（數毫秒）到 OCR 推理（數十秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# 位元組：拍攝 JPEG 與 OCR 上傳大小
+BYTES_BUCKETS = (16384, 65536, 131072, 262144, 524288, 1048576, 2097152, 4194304)
+
+
+def _escape(value):
+    """跳脫標籤值中的反斜線、換行與引號"""
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value):
+    """格式化數值（整數不帶小數點，無限大以 +Inf 表示）"""
+    if value == math.inf:
+        return '+Inf'
+    if value == -math.inf:
+        return '-Inf'
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _format_labels(labels):
+    """格式化標籤（依名稱排序）"""
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in sorted(labels.items())) + '}'
+
+
+class _Metric:
+    """指標基底類別（每組標籤值一個序列）"""
+
+    TYPE = 'untyped'
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name} 的標籤必須為 {self.labelnames}，收到 {tuple(labels)}')
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        """
+        Returns:
+            list: [(後綴, 標籤字典, 數值), ...]
+        """
+        with self._lock:
+            return [('', dict(zip(self.labelnames, key)), value) for key, value in self._series.items()]
+
+
+class Counter(_Metric):
+    """只增不減的計數器"""
+
+    TYPE = 'counter'
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError('計數器只能增加')
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """可增可減的數值"""
+
+    TYPE = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """分布（累積桶、總和與次數）"""
+
+    TYPE = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['counts'][index] += 1
+                    break
+            series['sum'] += value
+            series['count'] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """計時區塊（秒），區塊拋出例外時仍會記錄"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        result = []
+        with self._lock:
+            for key, series in self._series.items():
+                labels = dict(zip(self.labelnames, key))
+                cumulative = 0
+                for bound, count in zip(self.buckets, series['counts']):
+                    cumulative += count
+                    result.append(('_bucket', dict(labels, le=_format_value(float(bound))), cumulative))
+                result.append(('_bucket', dict(labels, le='+Inf'), series['count']))
+                result.append(('_sum', labels, series['sum']))
+                result.append(('_count', labels, series['count']))
+        return result
+
+
+class MetricsRegistry:
+    """指標註冊表"""
+
+    def __init__(self, namespace=''):
+        """
+        Args:
+            namespace: 指標名稱前綴（例如 book_reader）
+        """
+        self.namespace = namespace
+        self._metrics = []
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _full_name(self, name):
+        return f'{self.namespace}_{name}' if self.namespace else name
+
+    def _register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter(self._full_name(name), help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self._register(Gauge(self._full_name(name), help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(self._full_name(name), help_text, labelnames, buckets))
+
+    def register_collector(self, collector):
+        """
+        註冊收集函式（讀取 /metrics 時呼叫，適合既有的統計物件）
+
+        Args:
+            collector: 無參數函式，回傳 [(名稱, 類型, 說明, [(標籤字典, 數值), ...]), ...]；
+                       名稱會自動加上 namespace
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self):
+        """
+        輸出 Prometheus 文字格式
+
+        Returns:
+            str
+        """
+        with self._lock:
+            metrics = list(self._metrics)
+            collectors = list(self._collectors)
+
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.TYPE}')
+            for suffix, labels, value in metric.samples():
+                lines.append(f'{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}')
+
+        for collector in collectors:
+            try:
+                families = collector()
+            except Exception as e:
+                # 單一收集函式失敗不影響其他指標
+                lines.append(f'# 收集失敗: {_escape(e)}')
+                continue
+            for name, metric_type, help_text, samples in families:
+                name = self._full_name(name)
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {metric_type}')
+                for labels, value in samples:
+                    if value is None:
+                        continue
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
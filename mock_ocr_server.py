@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模擬 DeepSeek-OCR 伺服器
+在沒有 GPU 與 OCR 模型的環境測試閱讀機器人：提供與 DeepSeek-OCR API 相同的 /ocr 與 /health 端點，
+依設定的延遲回傳模擬文字；請求帶有 stream=1（或 Accept: text/event-stream）時以分塊方式邊產生邊回傳。
+可設定延遲抖動與錯誤比例，供基準測試（book_reader_benchmark.py）模擬不穩定的伺服器。
+
+用法:
+    python mock_ocr_server.py --port 5000 --stream-format sse --chunk-delay 0.05
+    # config.ini 的 [API] api_url 設為 http://127.0.0.1:5000，streaming = true
+"""
+
+import json
+import time
+import random
+import argparse
+
+from flask import Flask, Response, request, jsonify, stream_with_context
+
+
+SAMPLE_TEXT = (
+    "第一章　晨光\n\n"
+    "清晨的陽光從窗簾的縫隙灑進房間，落在書桌上那本翻開的書上。"
+    "她揉了揉眼睛，想起昨晚讀到一半的故事，主角正站在一座古老的橋上，望著河水緩緩流向遠方。\n\n"
+    "「你還記得我們第一次見面的地方嗎？」他問。\n\n"
+    "她沒有回答，只是把書籤夾進書頁，輕輕闔上。窗外傳來麻雀的叫聲，街上的早餐店已經開始忙碌，"
+    "蒸籠冒出的白煙在冷空氣中慢慢散開。\n\n"
+)
+
+STREAM_FORMATS = ('sse', 'ndjson', 'text', 'none')
+
+
+def build_text(chars):
+    """產生指定長度的模擬 OCR 文字（重複範例段落）"""
+    repeat = chars // len(SAMPLE_TEXT) + 1
+    return (SAMPLE_TEXT * repeat)[:chars]
+
+
+def create_app(latency=1.0, chunk_delay=0.05, chunk_chars=8, chars=600, stream_format='sse',
+               jitter=0.0, error_rate=0.0, error_status=500, seed=None):
+    """
+    建立模擬 OCR 伺服器
+
+    Args:
+        latency: 開始回傳文字前的延遲（秒，模擬影像編碼與模型載入）
+        chunk_delay: 每段文字之間的延遲（秒，模擬逐 token 產生）
+        chunk_chars: 每段文字的字元數
+        chars: 回傳文字的總字元數
+        stream_format: 串流格式 sse / ndjson / text；none 表示不支援串流（一律回傳 JSON）
+        jitter: 延遲的隨機變動比例（0.2 表示 latency 在 ±20% 內變動）
+        error_rate: 回傳錯誤的機率（0 ~ 1）
+        error_status: 錯誤時的 HTTP 狀態碼（502/503/504 會觸發用戶端重試）
+        seed: 隨機種子（固定後延遲與錯誤序列可重現）
+
+    Returns:
+        Flask
+    """
+    app = Flask('mock_ocr_server')
+    stats = {'requests': 0, 'streamed': 0, 'errors': 0}
+    rng = random.Random(seed)
+
+    @app.route('/health')
+    def health():
+        return jsonify({'status': 'ok', 'stats': stats})
+
+    @app.route('/ocr', methods=['POST'])
+    def ocr():
+        upload = request.files.get('file')
+        if upload is None or not upload.read():
+            return jsonify({'error': '沒有提供圖片'}), 400
+        stats['requests'] += 1
+        delay = latency * (1 + rng.uniform(-jitter, jitter)) if jitter else latency
+
+        if error_rate and rng.random() < error_rate:
+            stats['errors'] += 1
+            time.sleep(delay)
+            return jsonify({'error': '模擬的 OCR 伺服器錯誤'}), error_status
+
+        text = build_text(chars)
+        chunks = [text[i:i + chunk_chars] for i in range(0, len(text), chunk_chars)]
+        wants_stream = (request.form.get('stream') == '1'
+                        or 'text/event-stream' in request.headers.get('Accept', ''))
+
+        if not wants_stream or stream_format == 'none':
+            # 不串流：等待全部「產生」完才回傳
+            time.sleep(delay + chunk_delay * len(chunks))
+            return jsonify({'text': text, 'prompt': request.form.get('prompt')})
+
+        stats['streamed'] += 1
+
+        def generate():
+            time.sleep(delay)
+            for chunk in chunks:
+                if stream_format == 'sse':
+                    yield f"data: {json.dumps({'delta': chunk}, ensure_ascii=False)}\n\n"
+                elif stream_format == 'ndjson':
+                    yield json.dumps({'delta': chunk}, ensure_ascii=False) + '\n'
+                else:
+                    yield chunk
+                time.sleep(chunk_delay)
+            if stream_format == 'sse':
+                yield f"data: {json.dumps({'done': True}, ensure_ascii=False)}\n\n"
+            elif stream_format == 'ndjson':
+                yield json.dumps({'done': True}, ensure_ascii=False) + '\n'
+
+        mimetype = {
+            'sse': 'text/event-stream',
+            'ndjson': 'application/x-ndjson',
+            'text': 'text/plain'
+        }[stream_format]
+        return Response(stream_with_context(generate()), mimetype=mimetype)
+
+    return app
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='模擬 DeepSeek-OCR 伺服器')
+    parser.add_argument('--host', default='127.0.0.1', help='監聽位址（預設：127.0.0.1）')
+    parser.add_argument('--port', type=int, default=5000, help='監聽埠（預設：5000）')
+    parser.add_argument('--latency', type=float, default=1.0, help='開始回傳前的延遲秒數（預設：1.0）')
+    parser.add_argument('--chunk-delay', type=float, default=0.05, help='每段文字的間隔秒數（預設：0.05）')
+    parser.add_argument('--chunk-chars', type=int, default=8, help='每段文字的字元數（預設：8）')
+    parser.add_argument('--chars', type=int, default=600, help='回傳文字的總字元數（預設：600）')
+    parser.add_argument('--stream-format', choices=STREAM_FORMATS, default='sse',
+                        help='串流格式（none 表示不支援串流，預設：sse）')
+    parser.add_argument('--jitter', type=float, default=0.0, help='延遲的隨機變動比例（預設：0）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='回傳錯誤的機率（預設：0）')
+    parser.add_argument('--error-status', type=int, default=500, help='錯誤時的 HTTP 狀態碼（預設：500）')
+    parser.add_argument('--seed', type=int, default=None, help='隨機種子')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    app = create_app(latency=args.latency, chunk_delay=args.chunk_delay, chunk_chars=args.chunk_chars,
+                     chars=args.chars, stream_format=args.stream_format, jitter=args.jitter,
+                     error_rate=args.error_rate, error_status=args.error_status, seed=args.seed)
+    print(f"模擬 OCR 伺服器: http://{args.host}:{args.port}/ocr（串流格式 {args.stream_format}）")
+    app.run(host=args.host, port=args.port, threaded=True)
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DeepSeek-OCR API 用戶端
+使用持久的 requests.Session 連線池重複使用 TCP 連線，對可安全重試的失敗以隨機退避重試，
+並以斷路器在 OCR 伺服器停擺時快速失敗，由背景執行緒定期探測伺服器是否恢復。
+支援串流回應（SSE、NDJSON 或純文字分塊），辨識結果可以邊產生邊轉送。
+"""
+
+import json
+import time
+import codecs
+import random
+import socket
+import logging
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class CircuitOpenError(Exception):
+    """斷路器開啟中，OCR 伺服器暫時無法使用"""
+
+
+class OCRStreamError(Exception):
+    """OCR 串流回應中的錯誤事件"""
+
+
+STREAM_CONTENT_TYPES = ('text/event-stream', 'application/x-ndjson', 'text/plain')
+
+
+def is_stream_response(response):
+    """
+    回應是否為串流格式（不支援串流的伺服器會忽略請求，回傳一般 JSON）
+
+    Args:
+        response: requests.Response
+
+    Returns:
+        bool
+    """
+    content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+    return content_type in STREAM_CONTENT_TYPES
+
+
+def iter_stream_text(response):
+    """
+    逐段讀取串流 OCR 回應，收到資料就立即產生（不等待固定大小的緩衝區）
+
+    支援的格式：
+    - text/event-stream：每個事件的 data 為 JSON，{"delta": "..."} 為新增文字，
+      {"done": true, "text": "..."} 結束（text 可省略），{"error": "..."} 為錯誤；data 為 [DONE] 亦表示結束
+    - application/x-ndjson：每行一個與上面相同的 JSON 物件
+    - text/plain：分塊傳送的純文字，每塊都是新增文字
+
+    Args:
+        response: 以 stream=True 取得的 requests.Response
+
+    Yields:
+        tuple: (新增文字, 伺服器提供的完整文字或 None)；完整文字只在結束事件出現
+
+    Raises:
+        OCRStreamError: 伺服器在串流中回報錯誤
+    """
+    content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+    chunks = response.iter_content(chunk_size=None)
+
+    if content_type == 'text/plain':
+        decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+        for chunk in chunks:
+            delta = decoder.decode(chunk)
+            if delta:
+                yield delta, None
+        delta = decoder.decode(b'', final=True)
+        if delta:
+            yield delta, None
+        return
+
+    sse = content_type == 'text/event-stream'
+    buffer = b''
+    for chunk in chunks:
+        buffer += chunk
+        # 以 \n 分行不會切斷 UTF-8 多位元組字元
+        *lines, buffer = buffer.split(b'\n')
+        for line in lines:
+            line = line.strip()
+            if sse:
+                if not line.startswith(b'data:'):
+                    # 事件名稱、id 與註解（keepalive）
+                    continue
+                line = line[5:].strip()
+            if not line:
+                continue
+            if line == b'[DONE]':
+                return
+            message = json.loads(line.decode('utf-8'))
+            if message.get('error'):
+                raise OCRStreamError(message['error'])
+            if message.get('delta'):
+                yield message['delta'], None
+            if message.get('done'):
+                yield '', message.get('text')
+                return
+
+
+class CircuitBreaker:
+    """
+    斷路器
+    連續失敗達門檻後開啟（closed -> open），開啟期間直接拒絕請求；
+    背景探測成功或經過 reset_timeout 後進入 half_open，允許一個試探請求；
+    試探請求超過 half_open_timeout 仍未回報結果（例如呼叫端未記錄結果）時，再放行下一個試探請求。
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=3, reset_timeout=30.0, half_open_timeout=None):
+        """
+        初始化斷路器
+
+        Args:
+            failure_threshold: 連續失敗幾次後開啟
+            reset_timeout: 開啟後多久允許試探請求（秒）
+            half_open_timeout: 試探請求多久未回報結果視為遺失（秒），None 時同 reset_timeout
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.half_open_timeout = reset_timeout if half_open_timeout is None else half_open_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._half_open_in_flight = False
+        self._half_open_started = None
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        """
+        是否允許送出請求
+
+        Returns:
+            bool: 允許時為 True
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._half_open_in_flight = False
+            if self.state == self.HALF_OPEN and self._half_open_in_flight \
+                    and time.monotonic() - self._half_open_started >= self.half_open_timeout:
+                # 試探請求的結果遺失，不讓斷路器永遠停在半開狀態
+                self._half_open_in_flight = False
+            if self.state == self.HALF_OPEN and not self._half_open_in_flight:
+                # 半開狀態只放行一個試探請求
+                self._half_open_in_flight = True
+                self._half_open_started = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        """記錄成功，關閉斷路器"""
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._half_open_in_flight = False
+
+    def record_failure(self):
+        """
+        記錄失敗
+
+        Returns:
+            bool: 此次失敗是否使斷路器開啟
+        """
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                was_open = self.state == self.OPEN
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._half_open_in_flight = False
+                return not was_open
+            return False
+
+    def mark_half_open(self):
+        """背景探測成功，允許下一個試探請求"""
+        with self._lock:
+            if self.state == self.OPEN:
+                self.state = self.HALF_OPEN
+                self._half_open_in_flight = False
+
+
+class OCRApiClient:
+    """具連線池、重試與斷路器的 OCR API 用戶端"""
+
+    # 伺服器暫時無法服務，請求確定未被處理，可安全重試
+    RETRYABLE_STATUS = (502, 503, 504)
+
+    def __init__(self, api_url, timeout=30, health_url=None, pool_connections=1, pool_maxsize=4,
+                 max_retries=2, backoff_base=0.5, backoff_max=5.0, retry_on_timeout=False,
+                 failure_threshold=3, reset_timeout=30.0, probe_interval=5.0, logger=None):
+        """
+        初始化 OCR API 用戶端
+
+        Args:
+            api_url: OCR 端點完整網址
+            timeout: 請求逾時（秒）
+            health_url: 健康檢查網址，None 時以 TCP 連線探測
+            pool_connections: 連線池數量（不同主機）
+            pool_maxsize: 每個主機保留的持久連線數量
+            max_retries: 失敗後最多重試次數
+            backoff_base: 退避基準時間（秒），第 n 次重試最多等待 base * 2^n
+            backoff_max: 單次退避上限（秒）
+            retry_on_timeout: 讀取逾時是否重試（伺服器可能仍在處理，預設不重試）
+            failure_threshold: 斷路器連續失敗門檻
+            reset_timeout: 斷路器開啟後允許試探請求的時間（秒）
+            probe_interval: 斷路器開啟時背景探測間隔（秒）
+            logger: 日誌物件
+        """
+        self.api_url = api_url
+        self.timeout = timeout
+        self.health_url = health_url
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_on_timeout = retry_on_timeout
+        self.probe_interval = probe_interval
+        self.logger = logger or logging.getLogger('BookReaderFlask')
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        # 試探請求含重試與退避的最長時間，超過仍未回報結果才放行下一個試探請求
+        half_open_timeout = max(reset_timeout, timeout * (self.max_retries + 1) + backoff_max * self.max_retries)
+        self.breaker = CircuitBreaker(failure_threshold=failure_threshold, reset_timeout=reset_timeout,
+                                      half_open_timeout=half_open_timeout)
+        self._probe_thread = None
+        self._probe_lock = threading.Lock()
+
+    def post(self, files, data=None, **kwargs):
+        """
+        送出 OCR 請求（含重試與斷路器）
+
+        Args:
+            files: requests 的 files 參數
+            data: 表單資料
+            **kwargs: 其他 requests 參數（如 stream、headers）
+
+        Returns:
+            requests.Response: 伺服器回應（包含非 2xx 的回應）
+
+        Raises:
+            CircuitOpenError: 斷路器開啟中
+            requests.RequestException: 重試後仍失敗
+        """
+        if not self.breaker.allow_request():
+            raise CircuitOpenError('OCR 伺服器暫時無法使用（斷路器開啟中）')
+
+        attempt = 0
+        while True:
+            try:
+                response = self.session.post(self.api_url, files=files, data=data,
+                                             timeout=self.timeout, **kwargs)
+            except requests.exceptions.ConnectionError as e:
+                # 連線失敗：請求未送達伺服器，可安全重試
+                if self._should_retry(attempt, e):
+                    attempt += 1
+                    continue
+                self._record_failure(e)
+                raise
+            except requests.exceptions.Timeout as e:
+                if self.retry_on_timeout and self._should_retry(attempt, e):
+                    attempt += 1
+                    continue
+                self._record_failure(e)
+                raise
+            except requests.RequestException as e:
+                # 其他請求錯誤（ChunkedEncodingError、TooManyRedirects、InvalidURL 等）不重試，
+                # 但仍需記錄失敗，否則半開狀態的試探請求永遠不會結束
+                self._record_failure(e)
+                raise
+
+            if response.status_code in self.RETRYABLE_STATUS:
+                if self._should_retry(attempt, f'HTTP {response.status_code}'):
+                    response.close()
+                    attempt += 1
+                    continue
+                self._record_failure(f'HTTP {response.status_code}')
+                return response
+
+            if response.status_code >= 500:
+                self._record_failure(f'HTTP {response.status_code}')
+            else:
+                # 2xx 與 4xx 都代表伺服器正常運作
+                self.breaker.record_success()
+            return response
+
+    def _should_retry(self, attempt, reason):
+        """
+        判斷是否重試，需要時以隨機退避等待
+
+        Args:
+            attempt: 已重試次數
+            reason: 失敗原因（記錄用）
+
+        Returns:
+            bool: 是否重試
+        """
+        if attempt >= self.max_retries:
+            return False
+        # Full jitter：在 0 與指數退避上限之間隨機等待，避免多個請求同時重試
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        self.logger.warning(f"OCR API 請求失敗（{reason}），{delay:.2f} 秒後重試（第 {attempt + 1} 次）")
+        time.sleep(delay)
+        return True
+
+    def _record_failure(self, reason):
+        """記錄失敗，斷路器開啟時啟動背景探測"""
+        if self.breaker.record_failure():
+            self.logger.error(
+                f"OCR API 連續失敗 {self.breaker.consecutive_failures} 次（{reason}），"
+                f"斷路器開啟，{self.breaker.reset_timeout} 秒內快速失敗"
+            )
+            self._start_probe()
+
+    # ------------------------------------------------------------------
+    # 背景探測
+    # ------------------------------------------------------------------
+
+    def probe(self):
+        """
+        探測 OCR 伺服器是否可連線
+
+        Returns:
+            bool: 伺服器可連線時為 True
+        """
+        probe_timeout = min(5.0, self.timeout)
+        try:
+            if self.health_url:
+                response = self.session.get(self.health_url, timeout=probe_timeout)
+                return response.status_code < 500
+            parts = urlsplit(self.api_url)
+            port = parts.port or (443 if parts.scheme == 'https' else 80)
+            with socket.create_connection((parts.hostname, port), timeout=probe_timeout):
+                return True
+        except (requests.RequestException, OSError):
+            return False
+
+    def _start_probe(self):
+        """啟動背景探測執行緒（同時只有一個）"""
+        with self._probe_lock:
+            if self._probe_thread is not None and self._probe_thread.is_alive():
+                return
+            self._probe_thread = threading.Thread(target=self._probe_loop, name='ocr-api-probe', daemon=True)
+            self._probe_thread.start()
+
+    def _probe_loop(self):
+        """斷路器開啟期間定期探測伺服器，恢復後允許試探請求"""
+        while self.breaker.state == CircuitBreaker.OPEN:
+            time.sleep(self.probe_interval)
+            if self.breaker.state != CircuitBreaker.OPEN:
+                break
+            if self.probe():
+                self.breaker.mark_half_open()
+                self.logger.info("OCR 伺服器探測成功，斷路器進入半開狀態，允許試探請求")
+                break
+            self.logger.debug("OCR 伺服器探測失敗，斷路器維持開啟")
+
+    def status(self):
+        """用戶端狀態"""
+        return {
+            'api_url': self.api_url,
+            'circuit_state': self.breaker.state,
+            'consecutive_failures': self.breaker.consecutive_failures
+        }
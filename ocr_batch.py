@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批次 OCR
+重複使用 BookReaderFlask.process_ocr() 處理整個資料夾或多檔上傳的圖片：
+以有限的工作執行緒數量同時處理、每頁完成後立即存入結果與進度紀錄（manifest），
+中斷後以同一份 manifest 重新執行時略過已完成的頁面，並回報每分鐘頁數。
+"""
+
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+
+
+class BatchItem:
+    """批次中的一張圖片（圖片資料在處理時才讀取）"""
+
+    def __init__(self, source, path=None, data=None):
+        """
+        Args:
+            source: 圖片識別名稱（manifest 以此判斷是否已完成）
+            path: 伺服器上的圖片路徑（資料夾模式）
+            data: 圖片資料（上傳模式）
+        """
+        self.source = source
+        self.path = path
+        self.data = data
+
+    def read(self):
+        """讀取圖片資料"""
+        if self.data is not None:
+            return self.data
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+
+def iter_directory(directory, recursive=False):
+    """
+    依檔名順序逐一列出資料夾中的圖片（不一次載入全部）
+
+    Args:
+        directory: 資料夾路徑
+        recursive: 是否包含子資料夾
+
+    Yields:
+        BatchItem（source 為相對於資料夾的路徑）
+    """
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        if not recursive:
+            dirs[:] = []
+        for name in sorted(files):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                path = os.path.join(root, name)
+                yield BatchItem(os.path.relpath(path, directory), path=path)
+
+
+class BatchManifest:
+    """批次進度紀錄（JSON Lines，每頁一行，中斷後可接續）"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def finished_sources(self, prompt):
+        """
+        取得以相同 prompt 已完成（completed / skipped）的圖片
+
+        Args:
+            prompt: 本次使用的 prompt（換了 prompt 的頁面需要重新處理）
+
+        Returns:
+            set: 圖片識別名稱
+        """
+        finished = set()
+        if not self.path or not os.path.exists(self.path):
+            return finished
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # 中斷時可能留下寫到一半的最後一行
+                    continue
+                if record.get('prompt') == prompt and record.get('status') in ('completed', 'skipped'):
+                    finished.add(record['source'])
+        return finished
+
+    def reset(self):
+        """刪除先前的進度紀錄（重新處理所有圖片）"""
+        if not self.path:
+            return
+        with self._lock:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+    def append(self, record):
+        """寫入一頁的處理紀錄（立即 flush，程式中斷也不會遺失已完成的頁面）"""
+        if not self.path:
+            return
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                f.flush()
+
+
+class OCRBatchRunner:
+    """以有限並行數量執行批次 OCR"""
+
+    def __init__(self, reader, items, prompt=None, workers=2, manifest_path=None, store_results=True,
+                 total=None, logger=None, on_page=None, resume=True):
+        """
+        初始化批次執行器
+
+        Args:
+            reader: BookReaderFlask 物件（使用其 process_ocr() 與 add_ocr_result()）
+            items: BatchItem 的可迭代物件（依序取用，不預先全部讀入）
+            prompt: OCR prompt（None 使用預設 prompt）
+            workers: 同時處理的圖片數量（即同時送往 OCR 伺服器的請求上限）
+            manifest_path: 進度紀錄檔路徑（None 不紀錄、無法接續）
+            store_results: 是否將結果存入 OCR 結果存儲
+            total: 圖片總數（已知時用於顯示進度）
+            logger: 日誌物件
+            on_page: 每頁完成時的回呼 on_page(record, stats)
+            resume: 是否略過 manifest 中已完成的圖片（False 時開始執行才刪除舊的 manifest，
+                    不影響同一資料夾中仍在執行的批次）
+        """
+        self.id = uuid.uuid4().hex
+        self.reader = reader
+        self.items = items
+        self.prompt = prompt.strip() if prompt and prompt.strip() else None
+        self.workers = max(1, workers)
+        self.manifest = BatchManifest(manifest_path)
+        self.store_results = store_results
+        self.logger = logger or logging.getLogger('BookReaderFlask')
+        self.on_page = on_page
+        self.resume = resume
+
+        self.status = 'pending'
+        self.created_at = datetime.now().isoformat()
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._stats = {
+            'total': total,
+            'done': 0,
+            'completed': 0,
+            'skipped': 0,
+            'errors': 0,
+            'resumed': 0
+        }
+        self._started_at = None
+        self._finished_at = None
+
+    def cancel(self):
+        """停止送出新的圖片（處理中的圖片仍會完成並寫入紀錄）"""
+        self._cancelled.set()
+
+    def run(self):
+        """
+        執行批次（阻塞直到完成或取消）
+
+        Returns:
+            dict: 統計資料
+        """
+        self.status = 'running'
+        self._started_at = time.time()
+        if not self.resume:
+            self.manifest.reset()
+        # manifest 中的 prompt 與結果的 prompt 相同：未指定時為預設 prompt
+        finished = self.manifest.finished_sources(self.prompt or self.reader.ocr_prompt)
+        if finished:
+            self.logger.info(f"批次 OCR 接續執行: 略過 {len(finished)} 張已完成的圖片")
+
+        # 最多同時有 workers * 2 張圖片在等待或處理中，資料夾再大也不會一次建立全部工作
+        window = threading.Semaphore(self.workers * 2)
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='ocr-batch') as executor:
+                for item in self.items:
+                    if self._cancelled.is_set():
+                        break
+                    if item.source in finished:
+                        with self._lock:
+                            self._stats['resumed'] += 1
+                        continue
+                    window.acquire()
+                    if self._cancelled.is_set():
+                        window.release()
+                        break
+                    future = executor.submit(self._process_item, item)
+                    future.add_done_callback(lambda _: window.release())
+        finally:
+            self._finished_at = time.time()
+            self.status = 'cancelled' if self._cancelled.is_set() else 'completed'
+
+        stats = self.stats()
+        self.logger.info(
+            f"批次 OCR {self.status}: {stats['done']} 頁（完成 {stats['completed']}、略過 {stats['skipped']}、"
+            f"錯誤 {stats['errors']}、先前已完成 {stats['resumed']}），{stats['pages_per_minute']} 頁/分鐘"
+        )
+        return stats
+
+    def _process_item(self, item):
+        """處理單張圖片並寫入結果與進度紀錄（已取消時不處理尚未開始的圖片）"""
+        if self._cancelled.is_set():
+            return None
+        start_time = time.time()
+        record = {
+            'source': item.source,
+            'prompt': self.prompt or self.reader.ocr_prompt,
+            'datetime': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+        try:
+            image_bytes = item.read()
+            frame = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if frame is None:
+                raise ValueError('無法解碼圖片')
+
+            result = self.reader.process_ocr(frame, user_prompt=self.prompt, image_bytes=image_bytes)
+            result['batch_id'] = self.id
+            result['source'] = item.source
+            if self.store_results:
+                # 資料夾中的圖片已在伺服器上，結果直接引用原檔，不另存副本
+                self.reader.add_ocr_result(frame, result, image_bytes=image_bytes, image_path=item.path)
+                record['result_id'] = result.get('id')
+            record['status'] = result.get('status')
+            if result.get('status') == 'error':
+                record['error'] = result.get('error')
+        except Exception as e:
+            self.logger.error(f"批次 OCR 處理 {item.source} 失敗: {e}")
+            record['status'] = 'error'
+            record['error'] = str(e)
+
+        record['ms'] = round((time.time() - start_time) * 1000, 1)
+        self.manifest.append(record)
+
+        with self._lock:
+            self._stats['done'] += 1
+            key = {'completed': 'completed', 'skipped': 'skipped'}.get(record['status'], 'errors')
+            self._stats[key] += 1
+        if self.on_page is not None:
+            self.on_page(record, self.stats())
+        return record
+
+    def stats(self):
+        """
+        取得批次統計
+
+        Returns:
+            dict: 狀態、各狀態頁數、經過時間與每分鐘頁數（不含先前已完成的頁面）
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        if self._started_at is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self._finished_at or time.time()) - self._started_at
+        stats.update({
+            'batch_id': self.id,
+            'status': self.status,
+            'created_at': self.created_at,
+            'workers': self.workers,
+            'elapsed_s': round(elapsed, 1),
+            'pages_per_minute': round(stats['done'] / elapsed * 60, 1) if elapsed > 0 else 0.0
+        })
+        return stats
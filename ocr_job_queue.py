@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OCR 非同步工作佇列
+/api/ocr/process 只負責排入工作並立即回傳工作 ID，由固定數量的背景工作執行緒執行 OCR，
+限制同時送往 DeepSeek-OCR 伺服器的請求數量；佇列已滿時拒絕新工作（背壓）。
+"""
+
+import time
+import uuid
+import queue
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+
+class QueueFullError(Exception):
+    """佇列已滿，無法接受新工作"""
+
+
+class OCRJob:
+    """單一 OCR 工作（狀態與事件紀錄）"""
+
+    def __init__(self, payload):
+        """
+        初始化 OCR 工作
+
+        Args:
+            payload: 交給處理函數的參數字典
+        """
+        self.id = uuid.uuid4().hex
+        self.payload = payload
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+        # 事件紀錄（供 SSE 依序推送）
+        self.events = []
+        self._condition = threading.Condition()
+        self.add_event('queued')
+        
+        # 串流辨識已收到的文字（供輪詢狀態的客戶端），與尚未推送的新增文字
+        self.partial_text = ''
+        self._pending_delta = ''
+        self._last_partial_at = 0.0
+
+    @property
+    def finished(self):
+        """工作是否已結束"""
+        return self.status in ('completed', 'failed')
+
+    def add_event(self, event, **data):
+        """
+        新增一筆事件並通知等待者
+
+        Args:
+            event: 事件名稱（queued / running / completed / failed 等）
+            **data: 事件附帶資料
+        """
+        with self._condition:
+            self.events.append(dict(data, event=event, job_id=self.id))
+            self._condition.notify_all()
+
+    def add_partial(self, delta, min_interval=0.2):
+        """
+        累積串流辨識的新增文字，每隔 min_interval 秒最多推送一筆 partial 事件
+        （逐字推送會使事件紀錄過長，完成事件本身帶有完整文字，最後未推送的部分不需補送）
+
+        Args:
+            delta: 新增文字
+            min_interval: 兩筆 partial 事件的最短間隔（秒）
+        """
+        with self._condition:
+            self.partial_text += delta
+            self._pending_delta += delta
+            now = time.monotonic()
+            if now - self._last_partial_at < min_interval:
+                return
+            self._last_partial_at = now
+            pending, self._pending_delta = self._pending_delta, ''
+        self.add_event('partial', delta=pending, length=len(self.partial_text))
+
+    def wait_for_events(self, after_index=0, timeout=15.0):
+        """
+        等待新的事件
+
+        Args:
+            after_index: 已取得的事件數量
+            timeout: 最長等待時間（秒）
+
+        Returns:
+            list: 新事件（逾時則為空列表）
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while len(self.events) <= after_index:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return []
+                self._condition.wait(remaining)
+            return self.events[after_index:]
+
+    def wait(self, timeout=None):
+        """
+        等待工作結束
+
+        Args:
+            timeout: 最長等待時間（秒），None 表示不限
+
+        Returns:
+            bool: 工作是否已結束
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while not self.finished:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            return True
+
+    def to_dict(self):
+        """工作狀態字典（不含 payload）"""
+        data = {
+            'job_id': self.id,
+            'status': self.status,
+            'created_at': datetime.fromtimestamp(self.created_at).isoformat(),
+            'started_at': datetime.fromtimestamp(self.started_at).isoformat() if self.started_at else None,
+            'finished_at': datetime.fromtimestamp(self.finished_at).isoformat() if self.finished_at else None
+        }
+        if self.status == 'running' and self.partial_text:
+            data['partial_text'] = self.partial_text
+        if self.result is not None:
+            data['result'] = self.result
+        if self.error is not None:
+            data['error'] = self.error
+        return data
+
+
+class OCRJobQueue:
+    """有界 OCR 工作佇列與工作執行緒池"""
+
+    def __init__(self, handler, worker_count=2, max_pending=10, max_finished=200, logger=None):
+        """
+        初始化工作佇列
+
+        Args:
+            handler: 處理函數 handler(job) -> 結果字典
+            worker_count: 工作執行緒數量（同時送往 OCR 伺服器的請求上限）
+            max_pending: 等待中工作的上限，超過時拒絕新工作
+            max_finished: 保留已結束工作的數量（供查詢狀態）
+            logger: 日誌物件
+        """
+        self.handler = handler
+        self.worker_count = max(1, worker_count)
+        self.max_pending = max(1, max_pending)
+        self.max_finished = max(1, max_finished)
+        self.logger = logger or logging.getLogger('BookReaderFlask')
+
+        self._queue = queue.Queue(maxsize=self.max_pending)
+        self._jobs = OrderedDict()
+        self._jobs_lock = threading.Lock()
+        self._running = 0
+        self._workers = []
+        self._started = False
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        """啟動工作執行緒（重複呼叫無作用）"""
+        with self._start_lock:
+            if self._started:
+                return
+            for index in range(self.worker_count):
+                worker = threading.Thread(target=self._worker, name=f'ocr-worker-{index}', daemon=True)
+                worker.start()
+                self._workers.append(worker)
+            self._started = True
+            self.logger.info(f"OCR 工作佇列已啟動: {self.worker_count} 個工作執行緒，等待上限 {self.max_pending}")
+
+    def submit(self, payload):
+        """
+        排入新工作
+
+        Args:
+            payload: 交給處理函數的參數字典
+
+        Returns:
+            OCRJob: 新建立的工作
+
+        Raises:
+            QueueFullError: 等待中的工作已達上限
+        """
+        self.start()
+        job = OCRJob(payload)
+        with self._jobs_lock:
+            self._jobs[job.id] = job
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._jobs_lock:
+                self._jobs.pop(job.id, None)
+            raise QueueFullError(f'OCR 工作佇列已滿（{self.max_pending} 個等待中）')
+        self.logger.info(f"OCR 工作已排入佇列: {job.id}（等待中 {self._queue.qsize()}）")
+        return job
+
+    def get(self, job_id):
+        """
+        取得工作
+
+        Args:
+            job_id: 工作 ID
+
+        Returns:
+            OCRJob 或 None
+        """
+        with self._jobs_lock:
+            return self._jobs.get(job_id)
+
+    def pending_count(self):
+        """等待中的工作數量"""
+        return self._queue.qsize()
+
+    def stats(self):
+        """佇列狀態"""
+        return {
+            'workers': self.worker_count,
+            'running': self._running,
+            'pending': self._queue.qsize(),
+            'max_pending': self.max_pending
+        }
+
+    def _prune_finished(self):
+        """只保留最近 max_finished 個已結束的工作"""
+        with self._jobs_lock:
+            finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+            for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+                del self._jobs[job_id]
+
+    def _worker(self):
+        """工作執行緒迴圈"""
+        while True:
+            job = self._queue.get()
+            try:
+                with self._jobs_lock:
+                    self._running += 1
+                job.status = 'running'
+                job.started_at = time.time()
+                job.add_event('running')
+
+                try:
+                    job.result = self.handler(job)
+                    job.status = 'completed'
+                    job.finished_at = time.time()
+                    job.add_event('completed', result=job.result)
+                    self.logger.info(f"OCR 工作完成: {job.id}（{job.finished_at - job.started_at:.2f} 秒）")
+                except Exception as e:
+                    job.error = str(e)
+                    job.status = 'failed'
+                    job.finished_at = time.time()
+                    job.add_event('failed', error=job.error)
+                    self.logger.error(f"OCR 工作失敗: {job.id}: {e}", exc_info=True)
+                finally:
+                    # 釋放影像等大型資料（結果已帶有完整文字）
+                    job.payload = None
+                    job.partial_text = ''
+            finally:
+                with self._jobs_lock:
+                    self._running -= 1
+                self._queue.task_done()
+                self._prune_finished()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OCR 結果快取
+以影像的感知雜湊（pHash）加上實際使用的 prompt 作為鍵值，同一頁重複拍攝時直接回傳先前的辨識結果，
+不再呼叫 DeepSeek-OCR 與 OpenAI。快取以 LRU 淘汰並保存到磁碟。
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+def perceptual_hash(frame, hash_size=8):
+    """
+    計算影像的感知雜湊（DCT pHash）
+
+    Args:
+        frame: BGR 或灰階影像
+        hash_size: 雜湊邊長，產生 hash_size * hash_size 位元
+
+    Returns:
+        int: 感知雜湊值
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    small = cv2.resize(gray, (hash_size * 4, hash_size * 4), interpolation=cv2.INTER_AREA)
+    dct = cv2.dct(np.float32(small))[:hash_size, :hash_size].flatten()
+    # 以低頻係數（排除直流分量）的中位數為門檻
+    median = np.median(dct[1:])
+    value = 0
+    for bit in dct > median:
+        value = (value << 1) | int(bit)
+    return value
+
+
+def hamming_distance(a, b):
+    """兩個雜湊值的漢明距離"""
+    return bin(a ^ b).count('1')
+
+
+class OCRResultCache:
+    """以感知雜湊為鍵的 OCR 結果 LRU 快取"""
+
+    def __init__(self, cache_file='ocr_cache.json', max_entries=500, max_distance=4, logger=None):
+        """
+        初始化快取
+
+        Args:
+            cache_file: 快取保存檔案（空字串表示只存在記憶體）
+            max_entries: 最多保留的項目數量，超過時淘汰最久未使用的項目
+            max_distance: 視為同一頁的最大漢明距離（64 位元雜湊）
+            logger: 日誌物件
+        """
+        self.cache_file = cache_file
+        self.max_entries = max(1, max_entries)
+        self.max_distance = max_distance
+        self.logger = logger or logging.getLogger('BookReaderFlask')
+
+        # key -> {'hash': int, 'prompt_digest': str, 'text': str, 'created_at': float}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self._load()
+
+    @staticmethod
+    def _prompt_digest(prompt):
+        """prompt 的摘要（避免在快取檔保存完整 prompt 作為鍵值）"""
+        return hashlib.sha1((prompt or '').encode('utf-8')).hexdigest()[:16]
+
+    def lookup(self, phash, prompt):
+        """
+        查詢快取
+
+        Args:
+            phash: 影像感知雜湊
+            prompt: 實際使用的 prompt
+
+        Returns:
+            tuple: (快取項目, 漢明距離)，未命中則回傳 (None, None)
+        """
+        digest = self._prompt_digest(prompt)
+        best_key = None
+        best_distance = None
+
+        with self._lock:
+            for key, entry in self._entries.items():
+                if entry['prompt_digest'] != digest:
+                    continue
+                distance = hamming_distance(phash, entry['hash'])
+                if distance <= self.max_distance and (best_distance is None or distance < best_distance):
+                    best_key = key
+                    best_distance = distance
+                    if distance == 0:
+                        break
+
+            if best_key is None:
+                self.misses += 1
+                return None, None
+
+            # 標記為最近使用
+            self._entries.move_to_end(best_key)
+            self.hits += 1
+            return dict(self._entries[best_key]), best_distance
+
+    def store(self, phash, prompt, text):
+        """
+        保存辨識結果
+
+        Args:
+            phash: 影像感知雜湊
+            prompt: 實際使用的 prompt
+            text: OCR 辨識文字
+        """
+        digest = self._prompt_digest(prompt)
+        key = f'{phash:016x}:{digest}'
+
+        with self._lock:
+            self._entries[key] = {
+                'hash': phash,
+                'prompt_digest': digest,
+                'text': text,
+                'created_at': time.time()
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        self._save()
+
+    def clear(self):
+        """清除所有快取項目"""
+        with self._lock:
+            self._entries.clear()
+        self._save()
+
+    def stats(self):
+        """快取統計"""
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+    def _load(self):
+        """從磁碟載入快取"""
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                items = json.load(f)
+            for key, entry in items[-self.max_entries:]:
+                entry['hash'] = int(entry['hash'], 16)
+                self._entries[key] = entry
+            self.logger.info(f"已載入 OCR 結果快取: {len(self._entries)} 筆")
+        except Exception as e:
+            self.logger.error(f"載入 OCR 結果快取失敗: {e}")
+            self._entries.clear()
+
+    def _save(self):
+        """保存快取到磁碟（先寫入暫存檔再替換，避免寫入中斷造成損毀）"""
+        if not self.cache_file:
+            return
+        try:
+            # 取得快照與寫入都在 _save_lock 內：多個 OCR 工作同時保存時依序寫入，
+            # 最後寫入的一定是最新的快照，不會被較舊的快照覆蓋
+            with self._save_lock:
+                with self._lock:
+                    items = [[key, dict(entry, hash=f"{entry['hash']:016x}")] for key, entry in self._entries.items()]
+                tmp_file = self.cache_file + '.tmp'
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(items, f, ensure_ascii=False)
+                os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            self.logger.error(f"保存 OCR 結果快取失敗: {e}")
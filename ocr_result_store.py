@@ -0,0 +1,509 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OCR 結果存儲
+以 SQLite（WAL 模式）保存 OCR 結果：每筆結果只新增一列（不再整份重寫 JSON 檔），
+歷史紀錄不設上限，並以遞增序號作為游標分頁查詢。
+
+全文搜尋使用 FTS5：中日韓文字先在 Python 端切成重疊的雙字詞（bigram）再寫入索引，
+因為 SQLite 內建的 unicode61 分詞器會把整段沒有空白的中文當成一個詞。
+"""
+
+import os
+import re
+import html
+import json
+import sqlite3
+import logging
+import threading
+
+
+# 中日韓文字（CJK 統一表意文字、擴充 A、相容表意文字、假名、韓文音節）
+_CJK_CHARS = '\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\u3040-\u30ff\uac00-\ud7af'
+# 連續的中日韓文字，或連續的其他文字／數字
+_TOKEN_RE = re.compile(f'[{_CJK_CHARS}]+|[^\\W_{_CJK_CHARS}]+')
+_CJK_RE = re.compile(f'[{_CJK_CHARS}]')
+
+
+def tokenize_for_index(text):
+    """
+    將文字轉換為索引用的詞序列
+
+    中日韓文字切成重疊的雙字詞，並在每段結尾加上最後一個字（讓單字查詢能以前綴比對找到）；
+    其他文字保留原詞並轉為小寫。例如「閱讀機器人」→「閱讀 讀機 機器 器人 人」。
+
+    Args:
+        text: 原始文字
+
+    Returns:
+        str: 以空白分隔的詞
+    """
+    tokens = []
+    for segment in _TOKEN_RE.findall(text or ''):
+        if _CJK_RE.match(segment):
+            tokens.extend(segment[i:i + 2] for i in range(len(segment) - 1))
+            tokens.append(segment[-1])
+        else:
+            tokens.append(segment.lower())
+    return ' '.join(tokens)
+
+
+def build_match_query(query):
+    """
+    將使用者查詢轉換為 FTS5 MATCH 語法（所有片段都必須出現）
+
+    Args:
+        query: 使用者輸入的查詢字串
+
+    Returns:
+        str: FTS5 查詢，沒有可搜尋的文字時回傳空字串
+    """
+    clauses = []
+    for segment in _TOKEN_RE.findall(query or ''):
+        if _CJK_RE.match(segment):
+            if len(segment) == 1:
+                # 單字：比對以此字開頭的雙字詞或段落結尾的單字
+                clauses.append(f'"{segment}"*')
+            else:
+                # 多字：相鄰雙字詞組成的片語，保證字元連續
+                bigrams = ' '.join(segment[i:i + 2] for i in range(len(segment) - 1))
+                clauses.append(f'"{bigrams}"')
+        else:
+            clauses.append(f'"{segment.lower()}"*')
+    return ' '.join(clauses)
+
+
+def highlight_snippet(text, query, width=60):
+    """
+    產生含 <mark> 標記的摘要（其餘文字已 HTML 轉義）
+
+    Args:
+        text: 原始文字
+        query: 使用者查詢字串
+        width: 第一個符合位置前後保留的字數
+
+    Returns:
+        str: HTML 摘要
+    """
+    text = text or ''
+    terms = sorted({segment for segment in _TOKEN_RE.findall(query or '')}, key=len, reverse=True)
+    if not terms:
+        return html.escape(text[:width * 2])
+    pattern = re.compile('|'.join(re.escape(term) for term in terms), re.IGNORECASE)
+
+    first = pattern.search(text)
+    center = first.start() if first else 0
+    start = max(0, center - width)
+    end = min(len(text), center + width)
+    window = text[start:end]
+
+    parts = []
+    last = 0
+    for match in pattern.finditer(window):
+        parts.append(html.escape(window[last:match.start()]))
+        parts.append(f'<mark>{html.escape(match.group())}</mark>')
+        last = match.end()
+    parts.append(html.escape(window[last:]))
+
+    snippet = ''.join(parts).replace('\n', ' ')
+    return ('…' if start > 0 else '') + snippet + ('…' if end < len(text) else '')
+
+
+def normalize_image_path(image_path):
+    """
+    照片路徑轉為絕對路徑（結果記錄與照片淘汰都以此形式比對）
+
+    Args:
+        image_path: 照片路徑，可為 None
+
+    Returns:
+        str 或 None: 絕對路徑
+    """
+    return os.path.abspath(image_path) if image_path else image_path
+
+
+class OCRResultStore:
+    """以 SQLite 保存的 OCR 結果（最新的在前面）"""
+
+    # 以獨立欄位保存的結果欄位，其餘欄位保存在 extra（JSON）
+    COLUMNS = ('id', 'datetime', 'status', 'text', 'image_path')
+    # PRAGMA user_version：1 = 照片路徑已轉為絕對路徑
+    SCHEMA_VERSION = 1
+
+    def __init__(self, db_path='ocr_results.db', legacy_json=None, image_root=None, logger=None):
+        """
+        初始化結果存儲
+
+        Args:
+            db_path: SQLite 資料庫檔案
+            legacy_json: 舊版 ocr_results.json 路徑，資料庫為空時自動匯入
+            image_root: 圖片目錄（[CAMERA] image_save_path），用於將舊版相對照片路徑轉為絕對路徑
+            logger: 日誌物件
+        """
+        self.db_path = db_path
+        self.image_root = image_root
+        self.logger = logger or logging.getLogger('BookReaderFlask')
+
+        # 每個執行緒使用自己的連線（WAL 模式下讀取不會被寫入阻擋）
+        self._local = threading.local()
+        # SQLite 同時只允許一個寫入者，寫入時序列化以免 database is locked
+        self._write_lock = threading.Lock()
+        # SQLite 未編譯 FTS5 時改用 LIKE 搜尋
+        self.fts_enabled = False
+        # 本程序中結果變更的次數（新增、更新、清除），與最新序號組成 /api/ocr/results 的 ETag
+        self.revision = 0
+
+        self._create_schema()
+        if legacy_json:
+            self._migrate_json(legacy_json)
+
+    def _connection(self):
+        """取得目前執行緒的資料庫連線"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _create_schema(self):
+        """建立資料表"""
+        conn = self._connection()
+        with self._write_lock, conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS ocr_results (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id TEXT UNIQUE NOT NULL,
+                    datetime TEXT,
+                    status TEXT,
+                    text TEXT,
+                    image_path TEXT,
+                    extra TEXT
+                )
+            ''')
+            # 照片淘汰時查詢引用照片的結果
+            conn.execute('CREATE INDEX IF NOT EXISTS ocr_results_image_path ON ocr_results (image_path)')
+        self._migrate_image_paths()
+
+        # 全文索引（contentless：只保存詞索引，原文在 ocr_results，rowid 對應 seq）
+        has_index = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'ocr_results_fts'"
+        ).fetchone() is not None
+        try:
+            with self._write_lock, conn:
+                conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS ocr_results_fts "
+                    "USING fts5(tokens, content='', tokenize='unicode61')"
+                )
+            self.fts_enabled = True
+        except sqlite3.OperationalError as e:
+            self.logger.warning(f"SQLite 不支援 FTS5，全文搜尋改用 LIKE: {e}")
+            return
+
+        if not has_index:
+            self._rebuild_index()
+
+    def _migrate_image_paths(self):
+        """
+        將舊版記錄的相對照片路徑（image_save_path 與檔名組成）轉為圖片目錄下的絕對路徑，
+        與照片淘汰時比對的路徑一致；只執行一次（PRAGMA user_version 記錄已轉換）
+        """
+        if self.image_root is None:
+            return
+        conn = self._connection()
+        if conn.execute('PRAGMA user_version').fetchone()[0] >= self.SCHEMA_VERSION:
+            return
+        rows = conn.execute('SELECT seq, image_path FROM ocr_results WHERE image_path IS NOT NULL').fetchall()
+        updates = []
+        for row in rows:
+            image_path = self._resolve_legacy_image_path(row['image_path'])
+            if image_path != row['image_path']:
+                updates.append((image_path, row['seq']))
+        with self._write_lock, conn:
+            conn.executemany('UPDATE ocr_results SET image_path = ? WHERE seq = ?', updates)
+            conn.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
+        if updates:
+            self.logger.info(f"已將 {len(updates)} 筆 OCR 結果的照片路徑轉為絕對路徑")
+
+    def _resolve_legacy_image_path(self, image_path):
+        """
+        舊版相對照片路徑轉換為圖片目錄下的絕對路徑（不受目前工作目錄影響）
+
+        Returns:
+            str 或 None: 絕對路徑；不在圖片目錄中的相對路徑無法判斷基準，維持原樣
+        """
+        if not image_path or os.path.isabs(image_path) or self.image_root is None:
+            return image_path
+        relative = os.path.relpath(os.path.normpath(image_path), os.path.normpath(self.image_root))
+        if relative.startswith(os.pardir):
+            return image_path
+        return os.path.join(os.path.abspath(self.image_root), relative)
+
+    def _rebuild_index(self):
+        """為既有結果建立全文索引（升級後第一次啟動時執行）"""
+        conn = self._connection()
+        rows = conn.execute('SELECT seq, text FROM ocr_results').fetchall()
+        if not rows:
+            return
+        with self._write_lock, conn:
+            conn.executemany(
+                'INSERT INTO ocr_results_fts (rowid, tokens) VALUES (?, ?)',
+                ((row['seq'], tokenize_for_index(row['text'])) for row in rows)
+            )
+        self.logger.info(f"已為 {len(rows)} 筆 OCR 結果建立全文索引")
+
+    def _migrate_json(self, json_file):
+        """
+        匯入舊版 JSON 結果檔（只在資料庫為空時執行），完成後將舊檔改名保留
+
+        Args:
+            json_file: 舊版 ocr_results.json 路徑
+        """
+        if not os.path.exists(json_file) or self.count() > 0:
+            return
+        try:
+            with open(json_file, 'r', encoding='utf-8') as f:
+                results = json.load(f)
+            # 舊檔最新的在前面，依時間順序匯入使序號遞增
+            # 舊版 ID 只精確到秒，同一秒的結果加上序號避免衝突
+            seen_ids = {}
+            with self._write_lock, self._connection() as conn:
+                for result in reversed(results):
+                    result_id = str(result.get('id', ''))
+                    seen_ids[result_id] = seen_ids.get(result_id, 0) + 1
+                    if seen_ids[result_id] > 1:
+                        result = dict(result, id=f'{result_id}_{seen_ids[result_id]}')
+                    if result.get('image_path'):
+                        result = dict(result, image_path=self._resolve_legacy_image_path(result['image_path']))
+                    cursor = conn.execute(*self._insert_statement(result))
+                    self._index_result(conn, cursor.lastrowid, result)
+            os.replace(json_file, json_file + '.migrated')
+            self.logger.info(f"已將 {len(results)} 筆 OCR 結果從 {json_file} 匯入 {self.db_path}")
+        except Exception as e:
+            self.logger.error(f"匯入舊版 OCR 結果失敗: {e}")
+
+    def _insert_statement(self, result):
+        """建立新增一筆結果的 SQL 與參數"""
+        extra = {key: value for key, value in result.items() if key not in self.COLUMNS}
+        return (
+            'INSERT INTO ocr_results (id, datetime, status, text, image_path, extra) VALUES (?, ?, ?, ?, ?, ?)',
+            (str(result['id']), result.get('datetime'), result.get('status'), result.get('text'),
+             normalize_image_path(result.get('image_path')), json.dumps(extra, ensure_ascii=False))
+        )
+
+    def _index_result(self, conn, seq, result):
+        """將一筆結果寫入全文索引（與結果在同一個交易中）"""
+        if self.fts_enabled and result.get('text'):
+            conn.execute(
+                'INSERT INTO ocr_results_fts (rowid, tokens) VALUES (?, ?)',
+                (seq, tokenize_for_index(result['text']))
+            )
+
+    @classmethod
+    def _row_to_result(cls, row):
+        """資料列轉換為結果字典"""
+        result = json.loads(row['extra']) if row['extra'] else {}
+        for column in cls.COLUMNS:
+            if row[column] is not None:
+                result[column] = row[column]
+        result['seq'] = row['seq']
+        return result
+
+    def add(self, result):
+        """
+        新增一筆結果
+
+        Args:
+            result: OCR 結果字典（必須包含唯一的 id）
+
+        Returns:
+            int: 結果序號
+        """
+        with self._write_lock, self._connection() as conn:
+            cursor = conn.execute(*self._insert_statement(result))
+            self._index_result(conn, cursor.lastrowid, result)
+            self.revision += 1
+            return cursor.lastrowid
+
+    def search(self, query, limit=20, offset=0):
+        """
+        全文搜尋（依 BM25 相關度排序）
+
+        Args:
+            query: 查詢字串
+            limit: 回傳數量
+            offset: 略過前幾筆
+
+        Returns:
+            list: 結果字典，附帶 snippet（含 <mark> 的 HTML 摘要）與 score（BM25，越小越相關；
+                  只有單字查詢時依時間排序，score 為 None）
+        """
+        conn = self._connection()
+        if self.fts_enabled:
+            match_query = build_match_query(query)
+            if not match_query:
+                return []
+            # 只有單字查詢時幾乎每頁都符合，BM25 排序要計算全部符合的頁面；
+            # 改為最新的在前面，只需讀取前幾筆
+            single_chars = all(len(segment) == 1 for segment in _TOKEN_RE.findall(query))
+            if single_chars:
+                score, order = 'NULL', 'ocr_results_fts.rowid DESC'
+            else:
+                score, order = 'ocr_results_fts.rank', 'ocr_results_fts.rank'
+            rows = conn.execute(
+                f'''
+                SELECT r.*, {score} AS score
+                FROM ocr_results_fts JOIN ocr_results r ON r.seq = ocr_results_fts.rowid
+                WHERE ocr_results_fts MATCH ?
+                ORDER BY {order}
+                LIMIT ? OFFSET ?
+                ''',
+                (match_query, limit, offset)
+            ).fetchall()
+        else:
+            if not query or not query.strip():
+                return []
+            rows = conn.execute(
+                "SELECT *, NULL AS score FROM ocr_results WHERE text LIKE ? ESCAPE '\\' "
+                "ORDER BY seq DESC LIMIT ? OFFSET ?",
+                ('%' + re.sub(r'([%_\\])', r'\\\1', query.strip()) + '%', limit, offset)
+            ).fetchall()
+
+        results = []
+        for row in rows:
+            result = self._row_to_result(row)
+            result['score'] = row['score']
+            result['snippet'] = highlight_snippet(result.get('text'), query)
+            results.append(result)
+        return results
+
+    def page(self, cursor=None, limit=20):
+        """
+        分頁查詢結果（最新的在前面）
+
+        Args:
+            cursor: 上一頁回傳的 next_cursor，None 表示第一頁
+            limit: 每頁數量
+
+        Returns:
+            tuple: (結果列表, next_cursor)，沒有下一頁時 next_cursor 為 None
+        """
+        conn = self._connection()
+        if cursor is None:
+            rows = conn.execute(
+                'SELECT * FROM ocr_results ORDER BY seq DESC LIMIT ?', (limit + 1,)
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                'SELECT * FROM ocr_results WHERE seq < ? ORDER BY seq DESC LIMIT ?', (cursor, limit + 1)
+            ).fetchall()
+
+        next_cursor = rows[limit - 1]['seq'] if len(rows) > limit else None
+        return [self._row_to_result(row) for row in rows[:limit]], next_cursor
+
+    def since(self, seq, limit=100):
+        """
+        查詢某個序號之後新增的結果（最新的在前面）
+
+        Args:
+            seq: 已取得的最新結果序號
+            limit: 最多回傳數量
+
+        Returns:
+            tuple: (結果列表, 是否完整)；新增的結果超過 limit 時只回傳最新的 limit 筆，是否完整為 False
+        """
+        rows = self._connection().execute(
+            'SELECT * FROM ocr_results WHERE seq > ? ORDER BY seq DESC LIMIT ?', (seq, limit + 1)
+        ).fetchall()
+        return [self._row_to_result(row) for row in rows[:limit]], len(rows) <= limit
+
+    def latest_seq(self):
+        """最新結果的序號（沒有結果時為 0）"""
+        return self._connection().execute('SELECT COALESCE(MAX(seq), 0) FROM ocr_results').fetchone()[0]
+
+    def get_by_seq(self, seq):
+        """
+        依序號取得結果
+
+        Returns:
+            dict 或 None
+        """
+        row = self._connection().execute('SELECT * FROM ocr_results WHERE seq = ?', (seq,)).fetchone()
+        return self._row_to_result(row) if row else None
+
+    def get(self, result_id):
+        """
+        依 ID 取得結果
+
+        Args:
+            result_id: 結果 ID
+
+        Returns:
+            dict 或 None
+        """
+        row = self._connection().execute('SELECT * FROM ocr_results WHERE id = ?', (result_id,)).fetchone()
+        return self._row_to_result(row) if row else None
+
+    def referenced_images(self, image_paths):
+        """
+        查詢哪些照片被結果引用
+
+        Args:
+            image_paths: 照片路徑列表
+
+        Returns:
+            set: 其中被至少一筆結果引用的路徑（與傳入的字串相同）
+        """
+        # 結果記錄的是絕對路徑，以絕對路徑比對，再對應回傳入的路徑
+        by_normalized = {}
+        for image_path in image_paths:
+            by_normalized.setdefault(normalize_image_path(image_path), []).append(image_path)
+        normalized = list(by_normalized)
+        referenced = set()
+        conn = self._connection()
+        # SQLite 參數數量有上限，分批查詢
+        for i in range(0, len(normalized), 500):
+            batch = normalized[i:i + 500]
+            rows = conn.execute(
+                f"SELECT DISTINCT image_path FROM ocr_results WHERE image_path IN ({','.join('?' * len(batch))})",
+                batch
+            ).fetchall()
+            for row in rows:
+                referenced.update(by_normalized[row['image_path']])
+        return referenced
+
+    def detach_image(self, image_path):
+        """
+        照片被刪除後移除結果的照片連結（保留文字，並在 extra 記錄 image_evicted）
+
+        Args:
+            image_path: 已刪除的照片路徑
+
+        Returns:
+            list: 更新的結果序號
+        """
+        with self._write_lock, self._connection() as conn:
+            rows = conn.execute('SELECT seq, extra FROM ocr_results WHERE image_path = ?',
+                                (normalize_image_path(image_path),)).fetchall()
+            for row in rows:
+                extra = json.loads(row['extra']) if row['extra'] else {}
+                extra['image_evicted'] = True
+                conn.execute('UPDATE ocr_results SET image_path = NULL, extra = ? WHERE seq = ?',
+                             (json.dumps(extra, ensure_ascii=False), row['seq']))
+            if rows:
+                self.revision += 1
+            return [row['seq'] for row in rows]
+
+    def count(self):
+        """結果總數"""
+        return self._connection().execute('SELECT COUNT(*) FROM ocr_results').fetchone()[0]
+
+    def clear(self):
+        """清除所有結果"""
+        with self._write_lock, self._connection() as conn:
+            conn.execute('DELETE FROM ocr_results')
+            if self.fts_enabled:
+                conn.execute("INSERT INTO ocr_results_fts (ocr_results_fts) VALUES ('delete-all')")
+            self.revision += 1
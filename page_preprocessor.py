@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+頁面前處理
+在送往 DeepSeek-OCR 之前裁切書頁、校正傾斜、轉為灰階或二值化、依文字高度縮小，
+並以可調整的 JPEG 品質編碼，減少上傳資料量與模型推理時間。每個步驟都會記錄耗時。
+"""
+
+import time
+import logging
+
+import cv2
+import numpy as np
+
+
+class PreprocessResult:
+    """前處理結果（編碼後的影像與各階段統計）"""
+
+    def __init__(self, image, jpeg_bytes, quality, timings, info):
+        self.image = image
+        self.jpeg_bytes = jpeg_bytes
+        self.quality = quality
+        self.timings = timings
+        self.info = info
+
+    def to_dict(self):
+        """統計資訊字典（放入 OCR 結果）"""
+        return dict(
+            self.info,
+            upload_bytes=len(self.jpeg_bytes),
+            jpeg_quality=self.quality,
+            timings_ms={stage: round(ms, 1) for stage, ms in self.timings.items()}
+        )
+
+
+class PagePreprocessor:
+    """書頁影像前處理流程"""
+
+    COLOR_MODES = ('color', 'grayscale', 'binary')
+
+    def __init__(self, crop_page=True, deskew=True, max_skew_angle=5.0, color_mode='grayscale',
+                 target_text_height=32, max_long_side=2048, jpeg_quality_max=90, jpeg_quality_min=60,
+                 max_upload_kb=300, logger=None):
+        """
+        初始化前處理流程
+
+        Args:
+            crop_page: 是否偵測書頁範圍並裁掉桌面背景
+            deskew: 是否校正文字行傾斜
+            max_skew_angle: 傾斜校正的最大角度（度）
+            color_mode: color（保留彩色）、grayscale（灰階）或 binary（自適應二值化）
+            target_text_height: 縮小到的目標文字高度（像素），0 表示不依文字高度縮放
+            max_long_side: 長邊上限（像素），0 表示不限
+            jpeg_quality_max: JPEG 品質上限
+            jpeg_quality_min: JPEG 品質下限
+            max_upload_kb: 上傳大小目標（KB），超過時逐步降低品質直到下限
+            logger: 日誌物件
+        """
+        if color_mode not in self.COLOR_MODES:
+            raise ValueError(f'不支援的 color_mode: {color_mode}（可用: {", ".join(self.COLOR_MODES)}）')
+        self.crop_page = crop_page
+        self.deskew = deskew
+        self.max_skew_angle = max_skew_angle
+        self.color_mode = color_mode
+        self.target_text_height = target_text_height
+        self.max_long_side = max_long_side
+        self.jpeg_quality_max = max(1, min(100, jpeg_quality_max))
+        self.jpeg_quality_min = max(1, min(self.jpeg_quality_max, jpeg_quality_min))
+        self.max_upload_bytes = max_upload_kb * 1024
+        self.logger = logger or logging.getLogger('BookReaderFlask')
+
+    def process(self, frame):
+        """
+        執行前處理
+
+        Args:
+            frame: BGR 影像
+
+        Returns:
+            PreprocessResult: 處理後的影像、JPEG 資料與統計
+        """
+        timings = {}
+        info = {'input_size': [frame.shape[1], frame.shape[0]]}
+        image = frame
+
+        if self.crop_page:
+            start = time.perf_counter()
+            image, info['cropped'] = self._crop_page(image)
+            timings['crop'] = (time.perf_counter() - start) * 1000
+
+        if self.deskew:
+            start = time.perf_counter()
+            image, info['skew_angle'] = self._deskew(image)
+            timings['deskew'] = (time.perf_counter() - start) * 1000
+
+        if self.color_mode != 'color':
+            start = time.perf_counter()
+            if image.ndim == 3:
+                image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            timings['grayscale'] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        image, info['text_height'], info['scale'] = self._downscale(image)
+        timings['scale'] = (time.perf_counter() - start) * 1000
+
+        if self.color_mode == 'binary':
+            start = time.perf_counter()
+            image = cv2.adaptiveThreshold(image, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                          cv2.THRESH_BINARY, 31, 15)
+            timings['binarize'] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        jpeg_bytes, quality = self.encode(image)
+        timings['encode'] = (time.perf_counter() - start) * 1000
+
+        info['output_size'] = [image.shape[1], image.shape[0]]
+        timings['total'] = sum(timings.values())
+        return PreprocessResult(image, jpeg_bytes, quality, timings, info)
+
+    @staticmethod
+    def _gray(image):
+        """轉為灰階（已是灰階時直接回傳）"""
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+
+    def _crop_page(self, image):
+        """
+        偵測書頁範圍並裁切（書頁通常比桌面亮）
+
+        Returns:
+            tuple: (影像, 是否已裁切)
+        """
+        height, width = image.shape[:2]
+        ratio = 512.0 / max(height, width)
+        small = cv2.resize(self._gray(image), None, fx=ratio, fy=ratio, interpolation=cv2.INTER_AREA)
+        small = cv2.GaussianBlur(small, (5, 5), 0)
+        _, mask = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        # 閉運算填補文字造成的空洞
+        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, np.ones((15, 15), np.uint8))
+
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        if not contours:
+            return image, False
+        page = max(contours, key=cv2.contourArea)
+        x, y, w, h = cv2.boundingRect(page)
+        area_ratio = (w * h) / float(mask.shape[0] * mask.shape[1])
+        # 書頁太小（可能偵測錯誤）或幾乎佔滿畫面（不需裁切）時保留原圖
+        if area_ratio < 0.2 or area_ratio > 0.95:
+            return image, False
+
+        margin = int(0.02 * max(w, h))
+        x0 = max(0, int((x - margin) / ratio))
+        y0 = max(0, int((y - margin) / ratio))
+        x1 = min(width, int((x + w + margin) / ratio))
+        y1 = min(height, int((y + h + margin) / ratio))
+        return image[y0:y1, x0:x1], True
+
+    def _deskew(self, image):
+        """
+        以水平投影變異數估計文字行傾斜角度並校正（文字行對齊水平時投影最集中）
+
+        Returns:
+            tuple: (影像, 校正角度)
+        """
+        height, width = image.shape[:2]
+        ratio = min(1.0, 800.0 / max(height, width))
+        small = cv2.resize(self._gray(image), None, fx=ratio, fy=ratio, interpolation=cv2.INTER_AREA)
+        _, binary = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+        center = (binary.shape[1] / 2.0, binary.shape[0] / 2.0)
+
+        best_angle, best_score = 0.0, None
+        for angle in np.arange(-self.max_skew_angle, self.max_skew_angle + 0.01, 0.5):
+            matrix = cv2.getRotationMatrix2D(center, float(angle), 1.0)
+            rotated = cv2.warpAffine(binary, matrix, (binary.shape[1], binary.shape[0]), flags=cv2.INTER_NEAREST)
+            score = float(np.var(rotated.sum(axis=1, dtype=np.float64)))
+            if best_score is None or score > best_score:
+                best_angle, best_score = float(angle), score
+
+        if abs(best_angle) < 0.5:
+            return image, 0.0
+
+        matrix = cv2.getRotationMatrix2D((width / 2.0, height / 2.0), best_angle, 1.0)
+        rotated = cv2.warpAffine(image, matrix, (width, height), flags=cv2.INTER_LINEAR,
+                                 borderMode=cv2.BORDER_REPLICATE)
+        return rotated, best_angle
+
+    def _estimate_text_height(self, gray):
+        """
+        以連通元件高度的中位數估計文字高度
+
+        Returns:
+            float 或 None（文字元件太少時無法估計）
+        """
+        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+        count, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+        height, width = gray.shape[:2]
+        heights = [
+            stats[i, cv2.CC_STAT_HEIGHT] for i in range(1, count)
+            if 4 <= stats[i, cv2.CC_STAT_HEIGHT] <= height * 0.2
+            and stats[i, cv2.CC_STAT_WIDTH] <= width * 0.2
+            and stats[i, cv2.CC_STAT_AREA] >= 10
+        ]
+        if len(heights) < 20:
+            return None
+        return float(np.median(heights))
+
+    def _downscale(self, image):
+        """
+        依文字高度與長邊上限縮小影像（不放大）
+
+        Returns:
+            tuple: (影像, 估計的文字高度, 縮放比例)
+        """
+        height, width = image.shape[:2]
+        scale = 1.0
+        text_height = None
+
+        if self.target_text_height > 0:
+            text_height = self._estimate_text_height(self._gray(image))
+            if text_height:
+                scale = min(scale, self.target_text_height / text_height)
+        if self.max_long_side > 0:
+            scale = min(scale, self.max_long_side / float(max(height, width)))
+
+        if scale < 0.95:
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        else:
+            scale = 1.0
+        return image, text_height, round(scale, 3)
+
+    def encode(self, image):
+        """
+        JPEG 編碼，超過上傳大小目標時逐步降低品質
+
+        Returns:
+            tuple: (JPEG 資料, 使用的品質)
+        """
+        quality = self.jpeg_quality_max
+        while True:
+            _, encoded = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            if len(encoded) <= self.max_upload_bytes or quality <= self.jpeg_quality_min:
+                return encoded.tobytes(), quality
+            quality = max(self.jpeg_quality_min, quality - 10)
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+頁面分塊 OCR
+高解析度、雙欄或文字密集的頁面整張送出時推論時間大幅增加，且長頁面偶爾被截斷。
+依版面將頁面切成欄與段落區塊（優先在空白處切開，找不到空白時區塊之間重疊），
+同時送出 OCR 後依閱讀順序接回文字，並去除重疊區域重複辨識的文字。
+
+橫排：先依欄間空白分欄（左到右），每欄再切成上下區塊。
+直排：先依上下空白分段（上到下），每段再切成直條（右到左）。
+"""
+
+import difflib
+import logging
+
+import cv2
+import numpy as np
+
+
+class Tile:
+    """頁面中的一個區塊"""
+
+    def __init__(self, image, box, group, index, overlaps_previous=False):
+        """
+        Args:
+            image: 區塊影像
+            box: (x, y, w, h) 在頁面中的位置
+            group: 所屬的欄（橫排）或段（直排）編號
+            index: 依閱讀順序的編號
+            overlaps_previous: 是否與同一欄（段）的前一個區塊重疊（接回文字時需要去除重複）
+        """
+        self.image = image
+        self.box = box
+        self.group = group
+        self.index = index
+        self.overlaps_previous = overlaps_previous
+
+    def to_dict(self):
+        return {
+            'index': self.index,
+            'group': self.group,
+            'box': [int(v) for v in self.box],
+            'overlaps_previous': self.overlaps_previous
+        }
+
+
+class PageTiler:
+    """依版面切割頁面並接回辨識文字"""
+
+    LAYOUTS = ('auto', 'horizontal', 'vertical')
+
+    def __init__(self, max_columns=2, max_tile_side=1024, overlap=0.05, min_gap=0.015, layout='auto',
+                 text_detector=None, logger=None):
+        """
+        初始化分塊器
+
+        Args:
+            max_columns: 最多分成幾欄（直排為幾段）
+            max_tile_side: 區塊在閱讀方向上的長度上限（像素），超過時再切成多個區塊
+            overlap: 找不到空白可切時，相鄰區塊重疊的比例（相對於 max_tile_side）
+            min_gap: 欄間空白的最小寬度（相對於頁面寬度）
+            layout: auto（依文字方向判斷）、horizontal（橫排）或 vertical（直排）
+            text_detector: TextPresenceDetector，layout 為 auto 時判斷文字方向
+            logger: 日誌物件
+        """
+        if layout not in self.LAYOUTS:
+            raise ValueError(f'不支援的 layout: {layout}（可用: {", ".join(self.LAYOUTS)}）')
+        self.max_columns = max(1, max_columns)
+        self.max_tile_side = max(128, max_tile_side)
+        self.overlap = max(0.0, min(0.3, overlap))
+        self.min_gap = min_gap
+        self.layout = layout
+        self.text_detector = text_detector
+        self.logger = logger or logging.getLogger('BookReaderFlask')
+
+    def split(self, image):
+        """
+        將頁面切成區塊
+
+        Args:
+            image: BGR 或灰階影像
+
+        Returns:
+            tuple: (依閱讀順序排列的 Tile 列表, 版面資訊字典)
+        """
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        _, ink = cv2.threshold(gray, 0, 1, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+        height, width = ink.shape
+
+        layout = self.layout
+        if layout == 'auto':
+            layout = 'horizontal'
+            if self.text_detector is not None:
+                layout = self.text_detector.detect(gray)['orientation']
+
+        # 統一以「分組軸、區塊軸」處理：橫排分組軸為 x（欄）、區塊軸為 y（上到下）；
+        # 直排分組軸為 y（段）、區塊軸為 x（右到左，以翻轉的轉置矩陣處理）
+        work = ink if layout == 'horizontal' else ink.T[::-1]
+        groups = self._split_groups(work.sum(axis=0), work.shape[0])
+
+        tiles = []
+        for group_index, (g0, g1) in enumerate(groups):
+            segments = self._split_segments(work[:, g0:g1].sum(axis=1), g1 - g0)
+            for s0, s1, overlaps in segments:
+                if layout == 'horizontal':
+                    box = (g0, s0, g1 - g0, s1 - s0)
+                else:
+                    box = (width - s1, g0, s1 - s0, g1 - g0)
+                x, y, w, h = box
+                tiles.append(Tile(image[y:y + h, x:x + w], box, group_index, len(tiles), overlaps))
+
+        info = {
+            'layout': layout,
+            'groups': len(groups),
+            'tiles': len(tiles),
+            'size': [width, height]
+        }
+        return tiles, info
+
+    def _split_groups(self, profile, depth):
+        """
+        依分組軸的空白（欄間距）分組
+
+        Args:
+            profile: 分組軸上每個位置的墨水像素數
+            depth: 區塊軸的長度（用於計算墨水比例）
+
+        Returns:
+            list: [(起點, 終點), ...]
+        """
+        length = len(profile)
+        if self.max_columns == 1:
+            return [(0, length)]
+
+        # 平滑後墨水比例極低的位置視為空白
+        kernel = max(3, int(length * 0.005)) | 1
+        density = np.convolve(profile / float(depth), np.ones(kernel) / kernel, mode='same')
+        blank = density < 0.005
+        min_gap = max(3, int(length * self.min_gap))
+
+        # 只考慮頁面內部的空白（排除左右邊界），依寬度由大到小選擇
+        gaps = []
+        start = None
+        for pos, is_blank in enumerate(np.append(blank, False)):
+            if is_blank and start is None:
+                start = pos
+            elif not is_blank and start is not None:
+                if pos - start >= min_gap and start > length * 0.15 and pos < length * 0.85:
+                    gaps.append((pos - start, (start + pos) // 2))
+                start = None
+        gaps.sort(reverse=True)
+
+        total_ink = float(profile.sum()) or 1.0
+        cuts = []
+        for _, center in gaps:
+            if len(cuts) >= self.max_columns - 1:
+                break
+            candidate = sorted(cuts + [center])
+            bounds = [0] + candidate + [length]
+            # 每一欄都要有足夠的文字，避免把插圖或頁碼切成一欄
+            if all(profile[a:b].sum() / total_ink >= 0.15 for a, b in zip(bounds, bounds[1:])):
+                cuts = candidate
+
+        bounds = [0] + cuts + [length]
+        return list(zip(bounds, bounds[1:]))
+
+    def _split_segments(self, profile, breadth):
+        """
+        沿區塊軸將一組切成長度不超過 max_tile_side 的區塊，優先在文字行之間的空白處切開
+
+        Args:
+            profile: 區塊軸上每個位置的墨水像素數
+            breadth: 分組軸的寬度
+
+        Returns:
+            list: [(起點, 終點, 是否與前一區塊重疊), ...]
+        """
+        length = len(profile)
+        overlap = int(self.max_tile_side * self.overlap)
+        density = profile / float(max(1, breadth))
+        segments = []
+        start = 0
+        overlaps = False
+        while length - start > self.max_tile_side:
+            # 在區塊後半段尋找文字行間距，取最靠近上限的空白讓區塊盡量大
+            lo = start + int(self.max_tile_side * 0.6)
+            hi = start + self.max_tile_side
+            blank = np.flatnonzero(density[lo:hi] < 0.002)
+            if len(blank):
+                cut = lo + int(blank[-1])
+                segments.append((start, cut, overlaps))
+                start, overlaps = cut, False
+            else:
+                # 沒有空白可切（例如圖表或字距極密）：在上限處切開並與下一區塊重疊
+                segments.append((start, hi, overlaps))
+                start, overlaps = hi - overlap, True
+        segments.append((start, length, overlaps))
+        return segments
+
+    @staticmethod
+    def merge_overlap(previous, current, window=200, min_match=6):
+        """
+        接回重疊區塊的文字：在前一段結尾與下一段開頭找出最長的共同片段，從該處接續
+
+        切在文字行中間時，被切開的那一行在前一段結尾與下一段開頭可能都辨識錯誤，
+        因此捨棄前一段共同片段之後與下一段共同片段之前的文字。
+
+        Args:
+            previous: 前一區塊的文字
+            current: 下一區塊的文字
+            window: 比對前一段結尾與下一段開頭的字元數
+            min_match: 視為重疊的最短共同片段長度
+
+        Returns:
+            tuple: (接回的文字, 去除的重複字元數)
+        """
+        tail = previous[-window:]
+        head = current[:window]
+        match = difflib.SequenceMatcher(None, tail, head, autojunk=False).find_longest_match(
+            0, len(tail), 0, len(head)
+        )
+        # 共同片段必須靠近接縫（前一段結尾、下一段開頭），避免誤接到重複出現的詞句
+        slack = window // 2
+        if match.size < min_match or len(tail) - (match.a + match.size) > slack or match.b > slack:
+            return '\n'.join(filter(None, [previous.rstrip(), current.lstrip()])), 0
+        cut = len(previous) - len(tail) + match.a
+        merged = previous[:cut] + current[match.b:]
+        return merged, len(previous) + len(current) - len(merged)
+
+    def stitch(self, tiles, texts):
+        """
+        依閱讀順序接回各區塊的文字
+
+        Args:
+            tiles: split() 回傳的 Tile 列表
+            texts: 與 tiles 對應的辨識文字
+
+        Returns:
+            tuple: (完整文字, 去除的重複字元數)
+        """
+        groups = []
+        removed = 0
+        for tile, text in zip(tiles, texts):
+            text = (text or '').strip()
+            if not groups or tile.group != groups[-1][0]:
+                groups.append([tile.group, text])
+                continue
+            if tile.overlaps_previous:
+                merged, dropped = self.merge_overlap(groups[-1][1], text)
+                groups[-1][1] = merged
+                removed += dropped
+            else:
+                groups[-1][1] = '\n'.join(filter(None, [groups[-1][1], text]))
+        return '\n\n'.join(text for _, text in groups if text), removed
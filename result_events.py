@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OCR 結果變更事件
+add_ocr_result() 存檔、照片被淘汰、清除結果時發布事件，/api/ocr/results/events 以 Server-Sent Events
+推送給所有開著的網頁，網頁只需套用變更，不必重新下載整份歷史。
+
+最近的事件保留在記憶體中；事件 ID 含程序識別碼，瀏覽器重新連線時（Last-Event-ID）補送錯過的事件，
+錯過的事件已不在緩衝區或伺服器已重新啟動時改送 reset，網頁重新載入歷史。
+"""
+
+import json
+import uuid
+import threading
+from collections import deque
+
+
+class ResultEventBus:
+    """OCR 結果變更事件的發布與訂閱"""
+
+    def __init__(self, max_events=200):
+        """
+        Args:
+            max_events: 保留在記憶體中供重新連線補送的事件數
+        """
+        self.token = uuid.uuid4().hex[:8]
+        self._events = deque(maxlen=max_events)
+        self._next_number = 1
+        self._condition = threading.Condition()
+        self._listeners = []
+
+    @property
+    def last_id(self):
+        """最新事件的 ID（沒有事件時為序號 0）"""
+        with self._condition:
+            return f'{self.token}-{self._next_number - 1}'
+
+    def publish(self, event, **data):
+        """
+        發布事件
+
+        Args:
+            event: 事件名稱（added / updated / cleared）
+            data: 事件內容（必須可轉為 JSON）
+        """
+        with self._condition:
+            number = self._next_number
+            self._next_number += 1
+            self._events.append((number, event, data))
+            self._condition.notify_all()
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener()
+
+    def events_after(self, event_id):
+        """
+        取得某個事件之後的事件
+
+        Args:
+            event_id: 已收到的最後一個事件 ID，None 表示只要之後的新事件
+
+        Returns:
+            tuple: (事件列表 [(ID, 名稱, 內容)], 是否完整)；事件已不在緩衝區或 ID 來自其他程序時為 (空列表, False)
+        """
+        with self._condition:
+            if event_id is None:
+                return [], True
+            number = self._parse(event_id)
+            oldest = self._events[0][0] if self._events else self._next_number
+            if number is None or number >= self._next_number or number < oldest - 1:
+                return [], False
+            return [(f'{self.token}-{n}', event, data) for n, event, data in self._events if n > number], True
+
+    def wait(self, event_id, timeout=15.0):
+        """
+        等待某個事件之後的事件（Flask 開發伺服器的 SSE 使用；正式環境伺服器以 add_listener 在事件迴圈中等待）
+
+        Returns:
+            tuple: 同 events_after()，逾時時回傳 (空列表, True)
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._parse(event_id) != self._next_number - 1, timeout)
+        return self.events_after(event_id)
+
+    def add_listener(self, callback):
+        """新增事件通知函數（在發布事件的執行緒中呼叫，不可阻塞）"""
+        with self._condition:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self._condition:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    @staticmethod
+    def sse_message(event_id, event, data):
+        """
+        轉換為 Server-Sent Events 訊息
+
+        Returns:
+            str: 含 id、event 與 data 的訊息
+        """
+        return f'id: {event_id}\nevent: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n'
+
+    def _parse(self, event_id):
+        """事件 ID 轉換為序號，來自其他程序（伺服器重新啟動前）的 ID 回傳 None"""
+        token, _, number = (event_id or '').partition('-')
+        if token != self.token or not number.isdigit():
+            return None
+        return int(number)
@@ -4,6 +4,9 @@ let cameraEventSource = null;
 let isProcessing = false;
 let currentFrame = null;
 
+// 預覽傳輸方式：mjpeg（<img> 直接顯示 multipart JPEG，SSE 只傳狀態）或 sse（base64 JSON）
+const previewTransport = document.body.dataset.previewTransport || 'mjpeg';
+
 // DOM 元素
 const elements = {
     enablePreview: document.getElementById('enable-preview'),
@@ -20,6 +23,7 @@ const elements = {
     ocrResultContent: document.getElementById('ocr-result-content'),
     closeResultBtn: document.getElementById('close-result-btn'),
     resultsHistory: document.getElementById('results-history'),
+    resultsSearch: document.getElementById('results-search'),
     loadingOverlay: document.getElementById('loading-overlay'),
     capturedImageArea: document.getElementById('captured-image-area'),
     capturedImage: document.getElementById('captured-image'),
@@ -38,10 +42,24 @@ let currentAppliedRotation = null;
 // 防抖計時器
 let rotationUpdateTimer = null;
 
+// OCR 結果歷史分頁游標（null 表示沒有更多結果）
+let resultsNextCursor = null;
+
+// 目前顯示的歷史第一頁的 ETag（未變更時不重新繪製）與最新結果序號（增量同步）
+let resultsEtag = null;
+let latestResultSeq = 0;
+
+// OCR 結果變更事件（新增的結果由伺服器推送）
+let resultEventSource = null;
+
+// 搜尋防抖計時器
+let searchTimer = null;
+
 // 初始化
 document.addEventListener('DOMContentLoaded', function() {
     initializeEventListeners();
     loadOCRResults();
+    connectResultEvents();
     
     // 初始化預覽容器引用
     if (elements.cameraPreview) {
@@ -135,6 +153,14 @@ function initializeEventListeners() {
     // 清除結果
     elements.clearResultsBtn.addEventListener('click', handleClearResults);
     
+    // 搜尋 OCR 結果（輸入停止 300ms 後才送出查詢）
+    if (elements.resultsSearch) {
+        elements.resultsSearch.addEventListener('input', function() {
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(() => searchOCRResults(this.value.trim()), 300);
+        });
+    }
+    
     // 關閉結果
     elements.closeResultBtn.addEventListener('click', function() {
         elements.ocrResultArea.style.display = 'none';
@@ -163,6 +189,11 @@ function _startCameraStreamInternal() {
         console.warn('currentCameraId 無效，使用預設值 0');
     }
     
+    if (previewTransport === 'mjpeg') {
+        _startMjpegStream();
+        return;
+    }
+    
     // 構建 URL，包含相機 ID 參數和時間戳（避免緩存）
     let streamUrl = '/api/camera/stream';
     streamUrl += `?camera_id=${currentCameraId}`;
@@ -232,19 +263,95 @@ function _startCameraStreamInternal() {
     };
 }
 
+// MJPEG 預覽：<img> 直接接收 multipart JPEG，SSE 只用於狀態與錯誤
+function _startMjpegStream() {
+    const params = `camera_id=${currentCameraId}&t=${Date.now()}`;
+    console.log('開始 MJPEG 相機串流:', params);
+    
+    elements.cameraPreview.onerror = function() {
+        console.warn('MJPEG 串流中斷');
+        elements.cameraPreview.style.display = 'none';
+        elements.cameraError.style.display = 'block';
+    };
+    elements.cameraPreview.src = `/api/camera/mjpeg?${params}`;
+    elements.cameraPreview.style.display = 'block';
+    
+    cameraEventSource = new EventSource(`/api/camera/stream?frames=0&${params}`);
+    
+    cameraEventSource.onmessage = function(event) {
+        const data = JSON.parse(event.data);
+        
+        if (data.status) {
+            // 只在旋轉角度改變時才更新
+            const rotation = elements.imageRotation ? parseInt(elements.imageRotation.value) || 0 : 0;
+            if (currentAppliedRotation !== rotation) {
+                updatePreviewRotation(rotation);
+            }
+            elements.cameraPreview.style.display = 'block';
+            elements.cameraError.style.display = 'none';
+        } else if (data.error) {
+            console.warn('相機串流錯誤:', data.error);
+            elements.cameraPreview.style.display = 'none';
+            elements.cameraError.style.display = 'block';
+            const errorDetails = elements.cameraError.querySelector('.error-details');
+            if (errorDetails) {
+                errorDetails.textContent = data.error;
+            }
+        }
+    };
+    
+    cameraEventSource.onerror = function(error) {
+        console.error('相機狀態通道連接錯誤:', error);
+        setTimeout(() => {
+            if (cameraEventSource && cameraEventSource.readyState === EventSource.CLOSED) {
+                console.log('狀態通道已關閉，嘗試重新連接...');
+                stopCameraStream();
+                if (elements.enablePreview.checked) {
+                    setTimeout(() => {
+                        startCameraStream();
+                    }, 1000);
+                }
+            }
+        }, 3000);
+    };
+}
+
+// 將 MJPEG 預覽的最後一幀保留為靜態圖片（同時中止 multipart 連線）
+function freezeMjpegPreview() {
+    const img = elements.cameraPreview;
+    if (!img.src || !img.src.includes('/api/camera/mjpeg')) {
+        return;
+    }
+    img.onerror = null;
+    try {
+        if (img.naturalWidth > 0) {
+            const canvas = document.createElement('canvas');
+            canvas.width = img.naturalWidth;
+            canvas.height = img.naturalHeight;
+            canvas.getContext('2d').drawImage(img, 0, 0);
+            img.src = canvas.toDataURL('image/jpeg', 0.9);
+            return;
+        }
+    } catch (error) {
+        console.warn('保留最後一幀失敗:', error);
+    }
+    img.removeAttribute('src');
+}
+
 // 停止相機串流
 function stopCameraStream() {
     if (cameraEventSource) {
         cameraEventSource.close();
         cameraEventSource = null;
     }
+    freezeMjpegPreview();
     // 不要隱藏預覽畫面，保留最後一幀畫面
     // 只清除 currentFrame，防止使用過期的畫面進行 OCR
     currentFrame = null;
 }
 
-// 處理影像旋轉和 resize（在 Canvas 上處理）
-async function processImage(base64Image, rotation, maxSize) {
+// 處理影像旋轉和 resize（在 Canvas 上處理，只用於顯示；送交 OCR 的旋轉縮小由伺服器處理）
+async function processImage(imageSrc, rotation, maxSize) {
     return new Promise((resolve, reject) => {
         const img = new Image();
         img.onload = function() {
@@ -305,7 +412,7 @@ async function processImage(base64Image, rotation, maxSize) {
             reject(new Error('圖片載入失敗'));
         };
         
-        img.src = 'data:image/jpeg;base64,' + base64Image;
+        img.src = imageSrc;
     });
 }
 
@@ -320,7 +427,7 @@ async function handleCapture() {
     console.log('handleCapture: cameraEventSource =', cameraEventSource ? '存在' : '不存在');
     console.log('handleCapture: enablePreview.checked =', elements.enablePreview.checked);
     
-    if (!currentFrame) {
+    if (previewTransport !== 'mjpeg' && !currentFrame) {
         const errorMsg = '無法拍攝：相機畫面不可用\n\n' +
             '可能的原因：\n' +
             '1. 相機預覽未啟用（請勾選「啟用相機預覽」）\n' +
@@ -335,23 +442,34 @@ async function handleCapture() {
     elements.captureBtn.disabled = true;
     
     try {
-        // 步驟 1: 使用當前串流的畫面（避免相機資源衝突）
-        const capturedFrameBase64 = currentFrame;
-        console.log('handleCapture: 使用 currentFrame，長度 =', capturedFrameBase64 ? capturedFrameBase64.length : 0);
-        showLoading('正在處理影像...');
-        
-        // 步驟 2: 處理影像（旋轉和 resize）
+        // 步驟 1: 取得畫面
+        // MJPEG 預覽時由伺服器從共用的影像生產者拍攝並保留在伺服器端，只取得拍攝 ID；
+        // SSE 預覽時使用當前串流的畫面
         const rotation = parseInt(elements.imageRotation.value) || 0;
         const maxSize = parseInt(elements.modelMaxSize.value) || 1024;
-        
         console.log('處理參數: rotation =', rotation, 'maxSize =', maxSize);
-        console.log('原始圖片 base64 長度:', capturedFrameBase64.length);
         
-        const processedFrameBase64 = await processImage(capturedFrameBase64, rotation, maxSize);
-        console.log('處理後圖片 base64 長度:', processedFrameBase64.length);
+        const ocrRequest = {
+            rotation: rotation,
+            max_size: maxSize
+        };
+        let imageSrc;
+        if (previewTransport === 'mjpeg') {
+            showLoading('正在拍攝照片...');
+            const capture = await captureFrameFromServer();
+            console.log('handleCapture: 拍攝 ID =', capture.capture_id);
+            ocrRequest.capture_id = capture.capture_id;
+            imageSrc = capture.image_url;
+        } else {
+            console.log('handleCapture: 使用 currentFrame，長度 =', currentFrame ? currentFrame.length : 0);
+            ocrRequest.frame = currentFrame;
+            imageSrc = 'data:image/jpeg;base64,' + currentFrame;
+        }
         
-        // 步驟 3: 立即顯示處理後的照片
-        elements.capturedImage.src = 'data:image/jpeg;base64,' + processedFrameBase64;
+        // 步驟 2 & 3: 顯示旋轉後的照片（旋轉與縮小送交 OCR 時由伺服器處理，瀏覽器不重新上傳影像）
+        showLoading('正在處理影像...');
+        const displayBase64 = await processImage(imageSrc, rotation, maxSize);
+        elements.capturedImage.src = 'data:image/jpeg;base64,' + displayBase64;
         elements.capturedImageArea.style.display = 'block';
         
         // 滾動到拍攝照片區域
@@ -362,19 +480,16 @@ async function handleCapture() {
         
         // 獲取使用者輸入的 prompt
         // 如果為空，後端會使用預設 prompt（從 config.ini 讀取）
-        const userPrompt = elements.ocrPrompt.value.trim();
-        
-        // 發送 OCR 請求（使用處理後的影像）
         // prompt 會附加到每次 OCR 請求中，傳遞給 DeepSeek-OCR API
+        ocrRequest.prompt = elements.ocrPrompt.value.trim();
+        
+        // 發送 OCR 請求（以拍攝 ID 或畫面，附帶旋轉與縮小參數）
         const ocrResponse = await fetch('/api/ocr/process', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
             },
-            body: JSON.stringify({
-                frame: processedFrameBase64,
-                prompt: userPrompt  // 空字串時後端會使用預設 prompt
-            })
+            body: JSON.stringify(ocrRequest)
         });
         
         if (!ocrResponse.ok) {
@@ -382,7 +497,13 @@ async function handleCapture() {
             throw new Error(errorData.error || 'OCR 處理失敗');
         }
         
-        const result = await ocrResponse.json();
+        // 後端將 OCR 排入工作佇列並立即回傳工作 ID，等待工作完成
+        let result = await ocrResponse.json();
+        if (ocrResponse.status === 202 && result.job_id) {
+            console.log('OCR 工作已排入佇列:', result.job_id, result.queue);
+            showLoading('等待 OCR 辨識...');
+            result = await waitForOCRJob(result);
+        }
         
         // 詳細日誌：記錄 OCR 結果
         console.log('OCR API 回應狀態碼:', ocrResponse.status);
@@ -394,8 +515,10 @@ async function handleCapture() {
         // 顯示 OCR 結果
         displayOCRResult(result);
         
-        // 重新載入歷史記錄
-        loadOCRResults();
+        // 新結果已由事件推送加入歷史；事件連線中斷時只取得新增的結果
+        if (!resultEventSource || resultEventSource.readyState !== EventSource.OPEN) {
+            syncNewResults();
+        }
         
     } catch (error) {
         console.error('處理錯誤:', error);
@@ -407,6 +530,94 @@ async function handleCapture() {
     }
 }
 
+// 等待 OCR 工作完成（優先使用 SSE 推送，連線失敗時改為輪詢狀態）
+function waitForOCRJob(job) {
+    return new Promise((resolve, reject) => {
+        let settled = false;
+        const source = new EventSource(job.events_url);
+        const finish = (callback, value) => {
+            if (settled) {
+                return;
+            }
+            settled = true;
+            source.close();
+            callback(value);
+        };
+        
+        source.addEventListener('queued', () => showLoading('等待 OCR 佇列...'));
+        source.addEventListener('running', () => showLoading('正在執行 OCR 辨識...'));
+        // 串流辨識：邊收到文字邊顯示（每個畫面更新一次）
+        let partialText = '';
+        let renderScheduled = false;
+        source.addEventListener('partial', event => {
+            if (!partialText) {
+                hideLoading();
+            }
+            partialText += JSON.parse(event.data).delta;
+            if (!renderScheduled) {
+                renderScheduled = true;
+                requestAnimationFrame(() => {
+                    renderScheduled = false;
+                    if (!settled) {
+                        displayOCRResult({ status: 'streaming', text: partialText });
+                    }
+                });
+            }
+        });
+        source.addEventListener('completed', event => {
+            finish(resolve, JSON.parse(event.data).result);
+        });
+        source.addEventListener('failed', event => {
+            finish(reject, new Error(JSON.parse(event.data).error || 'OCR 處理失敗'));
+        });
+        source.onerror = function() {
+            if (settled) {
+                return;
+            }
+            console.warn('OCR 工作事件連接中斷，改為輪詢狀態');
+            source.close();
+            pollOCRJob(job.status_url).then(
+                result => finish(resolve, result),
+                error => finish(reject, error)
+            );
+        };
+    });
+}
+
+// 輪詢 OCR 工作狀態直到完成
+async function pollOCRJob(statusUrl) {
+    while (true) {
+        const response = await fetch(statusUrl);
+        const data = await response.json().catch(() => ({}));
+        if (!response.ok) {
+            throw new Error(data.error || '查詢 OCR 工作狀態失敗');
+        }
+        if (data.status === 'completed') {
+            return data.result;
+        }
+        if (data.status === 'failed') {
+            throw new Error(data.error || 'OCR 處理失敗');
+        }
+        if (data.partial_text) {
+            hideLoading();
+            displayOCRResult({ status: 'streaming', text: data.partial_text });
+        }
+        await new Promise(resolve => setTimeout(resolve, 1000));
+    }
+}
+
+// 由伺服器拍攝一張照片，回傳拍攝 ID 與圖片網址（影像保留在伺服器端）
+async function captureFrameFromServer() {
+    const response = await fetch('/api/camera/capture', {
+        method: 'POST'
+    });
+    const data = await response.json().catch(() => ({}));
+    if (!response.ok || !data.success) {
+        throw new Error(data.error || '拍攝照片失敗');
+    }
+    return data;
+}
+
 // 過濾 OCR 文字中的系統訊息
 function filterSystemMessages(text) {
     if (!text) return '';
@@ -461,6 +672,11 @@ function filterSystemMessages(text) {
 
 // 顯示 OCR 結果
 function displayOCRResult(result) {
+    if (result.status === 'streaming') {
+        displayStreamingOCRText(result.text);
+        return;
+    }
+    
     console.log('displayOCRResult: result =', result);
     console.log('displayOCRResult: result.status =', result.status);
     console.log('displayOCRResult: result.text =', result.text);
@@ -518,13 +734,47 @@ function displayOCRResult(result) {
     elements.ocrResultArea.scrollIntoView({ behavior: 'smooth', block: 'nearest' });
 }
 
-// 載入 OCR 結果歷史
-async function loadOCRResults() {
+// 串流辨識中：顯示目前已收到的文字（完成後由 displayOCRResult 以最終結果取代）
+function displayStreamingOCRText(text) {
+    elements.ocrResultArea.style.display = 'block';
+    const wasStreaming = elements.ocrResultContent.querySelector('.result-streaming') !== null;
+    elements.ocrResultContent.innerHTML = `
+        <div class="result-streaming">⏳ 辨識中...（已收到 ${text.length} 字元）</div>
+        <div class="result-item-text" style="margin-top: 15px; white-space: pre-wrap; word-wrap: break-word;">${escapeHtml(filterSystemMessages(text))}</div>
+    `;
+    if (!wasStreaming) {
+        elements.ocrResultArea.scrollIntoView({ behavior: 'smooth', block: 'nearest' });
+    }
+}
+
+// 載入 OCR 結果歷史（append 為 true 時載入下一頁並附加在後面）
+async function loadOCRResults(append = false) {
     try {
-        const response = await fetch('/api/ocr/results');
-        const results = await response.json();
+        let url = '/api/ocr/results';
+        if (append && resultsNextCursor !== null) {
+            url += `?cursor=${resultsNextCursor}`;
+        }
+        // no-cache：瀏覽器以 If-None-Match 重新驗證，歷史未變更時伺服器回傳 304 不重傳內容
+        const response = await fetch(url, { cache: 'no-cache' });
+        const etag = response.headers.get('ETag');
+        if (!append && etag && etag === resultsEtag) {
+            return;
+        }
+        const data = await response.json();
+        const results = data.results || [];
+        resultsNextCursor = data.next_cursor;
+        if (!append) {
+            resultsEtag = etag;
+            latestResultSeq = data.latest_seq || 0;
+        }
+        
+        // 移除舊的「載入更多」按鈕
+        const oldLoadMore = document.getElementById('load-more-results-btn');
+        if (oldLoadMore) {
+            oldLoadMore.remove();
+        }
         
-        if (results.length === 0) {
+        if (!append && results.length === 0) {
             elements.resultsHistory.innerHTML = `
                 <div class="empty-state">
                     <p>尚無 OCR 結果</p>
@@ -538,13 +788,129 @@ async function loadOCRResults() {
             html += createResultItemHTML(result, index);
         });
         
-        elements.resultsHistory.innerHTML = html;
+        if (append) {
+            elements.resultsHistory.insertAdjacentHTML('beforeend', html);
+        } else {
+            elements.resultsHistory.innerHTML = html;
+        }
+        
+        if (resultsNextCursor !== null) {
+            elements.resultsHistory.insertAdjacentHTML('beforeend', `
+                <button id="load-more-results-btn" class="btn btn-secondary">載入更多結果</button>
+            `);
+            document.getElementById('load-more-results-btn').addEventListener('click', () => loadOCRResults(true));
+        }
         
     } catch (error) {
         console.error('載入 OCR 結果失敗:', error);
     }
 }
 
+// 只取得目前顯示的最新結果之後新增的結果（新增太多時重新載入）
+async function syncNewResults() {
+    if (elements.resultsSearch.value.trim()) {
+        return;
+    }
+    try {
+        const response = await fetch(`/api/ocr/results?since=${latestResultSeq}`, { cache: 'no-cache' });
+        const data = await response.json();
+        if (!data.complete) {
+            resultsEtag = null;
+            loadOCRResults();
+            return;
+        }
+        // 由舊到新插入，最新的在最上面
+        (data.results || []).slice().reverse().forEach(applyResultAdded);
+    } catch (error) {
+        console.error('同步 OCR 結果失敗:', error);
+    }
+}
+
+// 訂閱 OCR 結果變更事件（其他分頁或機器拍攝的結果也會即時出現）
+function connectResultEvents() {
+    if (!window.EventSource) {
+        return;
+    }
+    // 斷線時瀏覽器自動重新連線，並以 Last-Event-ID 取得錯過的事件
+    resultEventSource = new EventSource('/api/ocr/results/events');
+    resultEventSource.addEventListener('added', event => applyResultAdded(JSON.parse(event.data).result));
+    resultEventSource.addEventListener('updated', event => applyResultUpdated(JSON.parse(event.data).result));
+    resultEventSource.addEventListener('cleared', () => {
+        latestResultSeq = 0;
+        if (!elements.resultsSearch.value.trim()) {
+            loadOCRResults();
+        }
+    });
+    // 錯過的事件無法補送（例如伺服器重新啟動），重新驗證歷史
+    resultEventSource.addEventListener('reset', () => {
+        if (!elements.resultsSearch.value.trim()) {
+            loadOCRResults();
+        }
+    });
+}
+
+// 將新增的結果插入歷史最上面（搜尋中或已顯示時略過）
+function applyResultAdded(result) {
+    if (elements.resultsSearch.value.trim() || !result.seq || result.seq <= latestResultSeq) {
+        return;
+    }
+    latestResultSeq = result.seq;
+    // 歷史已與伺服器不同，下次載入時重新繪製
+    resultsEtag = null;
+    const emptyState = elements.resultsHistory.querySelector('.empty-state');
+    if (emptyState) {
+        emptyState.remove();
+    }
+    elements.resultsHistory.insertAdjacentHTML('afterbegin', createResultItemHTML(result, 0));
+}
+
+// 更新歷史中已顯示的結果（例如照片因容量上限被刪除）
+function applyResultUpdated(result) {
+    const item = elements.resultsHistory.querySelector(`.result-item[data-result-seq="${result.seq}"]`);
+    if (item) {
+        item.outerHTML = createResultItemHTML(result, 0);
+        resultsEtag = null;
+    }
+}
+
+// 搜尋 OCR 結果（空白查詢時回到完整歷史）
+async function searchOCRResults(query) {
+    if (!query) {
+        loadOCRResults();
+        return;
+    }
+    
+    try {
+        const response = await fetch(`/api/ocr/search?q=${encodeURIComponent(query)}`);
+        const data = await response.json();
+        
+        // 使用者已輸入新的查詢，忽略過時的回應
+        if (elements.resultsSearch.value.trim() !== query) {
+            return;
+        }
+        // 歷史被搜尋結果取代，回到完整歷史時必須重新繪製
+        resultsEtag = null;
+        
+        if (!data.results || data.results.length === 0) {
+            elements.resultsHistory.innerHTML = `
+                <div class="empty-state">
+                    <p>找不到「${escapeHtml(query)}」</p>
+                </div>
+            `;
+            return;
+        }
+        
+        let html = '';
+        data.results.forEach((result, index) => {
+            html += createResultItemHTML(result, index);
+        });
+        elements.resultsHistory.innerHTML = html;
+        
+    } catch (error) {
+        console.error('搜尋 OCR 結果失敗:', error);
+    }
+}
+
 // 創建結果項目 HTML
 function createResultItemHTML(result, index) {
     let statusClass = '';
@@ -562,16 +928,28 @@ function createResultItemHTML(result, index) {
     }
     
     let imageHTML = '';
-    if (result.image_url) {
+    if (result.image_url && result.thumbnail_urls) {
+        // 列表只載入縮圖（依顯示寬度挑選），點擊開啟原始照片
+        const widths = Object.keys(result.thumbnail_urls).map(Number).sort((a, b) => a - b);
+        const srcset = widths.map(width => `${result.thumbnail_urls[width]} ${width}w`).join(', ');
+        imageHTML = `<a href="${result.image_url}" target="_blank" rel="noopener">` +
+            `<img src="${result.thumbnail_urls[widths[0]]}" srcset="${srcset}" sizes="(max-width: 1024px) 100vw, 50vw" ` +
+            `loading="lazy" decoding="async" alt="拍攝圖片" class="result-item-image" onerror="this.style.display='none'"></a>`;
+    } else if (result.image_url) {
         // 使用 image_url（如果可用）
-        imageHTML = `<img src="${result.image_url}" alt="拍攝圖片" class="result-item-image" onerror="this.style.display='none'">`;
+        imageHTML = `<img src="${result.image_url}" alt="拍攝圖片" class="result-item-image" loading="lazy" onerror="this.style.display='none'">`;
     } else if (result.image_path) {
         // 嘗試載入圖片（如果路徑可用）
         imageHTML = `<img src="/static/${result.image_path}" alt="拍攝圖片" class="result-item-image" onerror="this.style.display='none'">`;
     }
     
     let contentHTML = '';
-    if (result.status === 'completed' && result.text) {
+    if (result.snippet) {
+        // 搜尋結果摘要（伺服器端已轉義，只包含 <mark> 標記）
+        contentHTML = `
+            <div class="result-item-text">${result.snippet}</div>
+        `;
+    } else if (result.status === 'completed' && result.text) {
         // 過濾掉系統訊息，只保留 OCR 內容
         const cleanText = filterSystemMessages(result.text);
         contentHTML = `
@@ -588,7 +966,7 @@ function createResultItemHTML(result, index) {
     }
     
     return `
-        <div class="result-item">
+        <div class="result-item" data-result-seq="${result.seq || ''}">
             <div class="result-item-header">
                 <div class="result-item-title">
                     📄 ${result.datetime || result.id || 'Unknown'}
@@ -678,7 +1056,8 @@ async function handleRefreshCameras() {
     }
     
     try {
-        const response = await fetch('/api/camera/list');
+        // refresh=1：立即重新列舉（不開啟相機）
+        const response = await fetch('/api/camera/list?refresh=1');
         const data = await response.json();
         
         // 更新下拉選單
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本機文字偵測
+以 OpenCV 在本機判斷畫面是否包含文字（取代每頁都呼叫 OpenAI 的預分析），在 Raspberry Pi 上只需數毫秒。
+
+方法：縮小後取 Canny 邊緣，分別以水平與垂直的長條結構元素連接相鄰字元（支援橫排與直排），
+保留形狀像文字行的連通區域，以文字行覆蓋的面積比例作為分數。
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+
+class TextPresenceDetector:
+    """本機文字存在偵測器"""
+
+    TEXT = 'text'
+    BLANK = 'blank'
+    UNCERTAIN = 'uncertain'
+
+    def __init__(self, text_threshold=0.04, blank_threshold=0.01, sample_width=480):
+        """
+        初始化文字偵測器
+
+        Args:
+            text_threshold: 文字行面積比例高於此值判定為有文字
+            blank_threshold: 文字行面積比例低於此值且沒有任何文字行時判定為空白；其餘為不確定
+            sample_width: 偵測前縮小到的寬度
+        """
+        self.text_threshold = text_threshold
+        self.blank_threshold = min(blank_threshold, text_threshold)
+        self.sample_width = sample_width
+
+    def detect(self, frame):
+        """
+        判斷畫面是否包含文字
+
+        Args:
+            frame: BGR 或灰階影像
+
+        Returns:
+            dict: verdict（text / blank / uncertain）、score（文字行面積比例）、
+                  orientation（horizontal / vertical）、lines（文字行數量）、ms（耗時）
+        """
+        start = time.perf_counter()
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        if gray.shape[1] > self.sample_width:
+            ratio = self.sample_width / float(gray.shape[1])
+            gray = cv2.resize(gray, None, fx=ratio, fy=ratio, interpolation=cv2.INTER_AREA)
+
+        # 輕微模糊抑制感光雜訊與紙張紋理，保留筆畫邊緣
+        edges = cv2.Canny(cv2.GaussianBlur(gray, (3, 3), 0), 50, 150)
+
+        horizontal = self._text_line_stats(edges, vertical=False)
+        vertical = self._text_line_stats(edges, vertical=True)
+        score, lines, orientation = max(
+            (horizontal[0], horizontal[1], 'horizontal'),
+            (vertical[0], vertical[1], 'vertical')
+        )
+
+        if score >= self.text_threshold:
+            verdict = self.TEXT
+        elif score < self.blank_threshold and lines == 0:
+            # 只要偵測到任何文字行（例如只有章節標題的頁面）就不判定為空白
+            verdict = self.BLANK
+        else:
+            verdict = self.UNCERTAIN
+
+        return {
+            'verdict': verdict,
+            'score': round(score, 4),
+            'orientation': orientation,
+            'lines': lines,
+            'ms': round((time.perf_counter() - start) * 1000, 1)
+        }
+
+    @staticmethod
+    def _text_line_stats(edges, vertical=False):
+        """
+        以長條結構元素連接字元後，統計形狀像文字行的區域
+
+        Returns:
+            tuple: (文字行面積比例, 文字行數量)
+        """
+        height, width = edges.shape[:2]
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 11) if vertical else (11, 3))
+        joined = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, kernel)
+
+        count, _, stats, _ = cv2.connectedComponentsWithStats(joined, connectivity=8)
+        if count <= 1:
+            return 0.0, 0
+
+        w = stats[1:, cv2.CC_STAT_WIDTH].astype(np.float64)
+        h = stats[1:, cv2.CC_STAT_HEIGHT].astype(np.float64)
+        area = stats[1:, cv2.CC_STAT_AREA].astype(np.float64)
+        length, thickness = (h, w) if vertical else (w, h)
+        extent = max(height, width)
+
+        # 文字行：細長、粗細合理、長度足夠，且邊緣像素有一定密度（排除單一長直線）
+        is_line = (
+            (length >= 3 * thickness)
+            & (thickness >= 3) & (thickness <= extent * 0.1)
+            & (length >= extent * 0.05)
+            & (area >= 0.3 * w * h)
+        )
+        line_area = float((w * h)[is_line].sum())
+        return line_area / float(height * width), int(is_line.sum())
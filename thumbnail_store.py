@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+結果歷史縮圖
+OCR 結果存檔時在背景執行緒產生一到數種寬度的 JPEG 縮圖，歷史列表不需下載原始解析度的照片；
+舊的歷史結果（或背景尚未完成的縮圖）在第一次要求時產生。
+縮圖依來源圖片在圖片目錄中的相對路徑存放：<縮圖目錄>/<寬度>/<相對路徑>。
+"""
+
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+from werkzeug.security import safe_join
+
+
+class ThumbnailStore:
+    """縮圖產生與存放"""
+
+    def __init__(self, source_dir, thumb_dir, sizes=(320, 640), jpeg_quality=75, logger=None):
+        """
+        Args:
+            source_dir: 來源圖片目錄（拍攝照片存放的目錄）
+            thumb_dir: 縮圖目錄
+            sizes: 縮圖寬度（像素），來源較窄時不放大
+            jpeg_quality: 縮圖 JPEG 品質
+            logger: 日誌物件
+        """
+        self.source_dir = os.path.abspath(source_dir)
+        self.thumb_dir = os.path.abspath(thumb_dir)
+        self.sizes = tuple(sorted(set(int(size) for size in sizes if int(size) > 0)))
+        self.jpeg_quality = jpeg_quality
+        self.logger = logger or logging.getLogger('BookReaderFlask')
+        # 單一執行緒，縮圖不與 OCR 與預覽編碼搶 CPU；執行緒在第一次使用時才建立
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='thumbnail')
+        self._lock = threading.Lock()
+        self._stats = {'generated': 0, 'on_demand': 0, 'failed': 0}
+
+    def relative_name(self, image_path):
+        """
+        取得圖片在來源目錄中的相對路徑
+
+        Returns:
+            str: 以 / 分隔的相對路徑，不在來源目錄中時回傳 None
+        """
+        relative = os.path.relpath(os.path.abspath(image_path), self.source_dir)
+        if relative.startswith(os.pardir) or os.path.isabs(relative):
+            return None
+        return relative.replace(os.sep, '/')
+
+    def path(self, filename, size):
+        """
+        縮圖檔案路徑（一律為 JPEG）
+
+        Returns:
+            str: 路徑，filename 不安全（跳出目錄）時回傳 None
+        """
+        base, ext = os.path.splitext(filename)
+        name = filename if ext.lower() in ('.jpg', '.jpeg') else base + ext.replace('.', '_') + '.jpg'
+        return safe_join(self.thumb_dir, str(size), name)
+
+    def schedule(self, filename, image=None):
+        """
+        在背景產生所有寬度的縮圖（不阻塞 OCR 結果存檔）
+
+        Args:
+            filename: 來源圖片的相對路徑
+            image: 已解碼的來源影像（提供時不需再從檔案讀取）
+        """
+        self._executor.submit(self._generate_all, filename, image)
+
+    def get(self, filename, size):
+        """
+        取得縮圖路徑，尚未產生或來源已更新時立即產生
+
+        Args:
+            filename: 來源圖片的相對路徑
+            size: 縮圖寬度（必須是設定的寬度之一）
+
+        Returns:
+            str: 縮圖路徑，來源不存在或無法產生時回傳 None
+        """
+        if size not in self.sizes:
+            return None
+        source = safe_join(self.source_dir, filename)
+        target = self.path(filename, size)
+        if source is None or target is None or not os.path.isfile(source):
+            return None
+        if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(source):
+            return target
+        image = cv2.imread(source)
+        if image is None or not self._write(image, target, size):
+            return None
+        with self._lock:
+            self._stats['on_demand'] += 1
+        return target
+
+    def remove(self, filename):
+        """
+        刪除來源圖片的所有縮圖（來源照片被刪除時呼叫）
+
+        Args:
+            filename: 來源圖片的相對路徑
+        """
+        for size in self.sizes:
+            target = self.path(filename, size)
+            if target is not None:
+                try:
+                    os.remove(target)
+                except FileNotFoundError:
+                    pass
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, sizes=list(self.sizes))
+
+    def _generate_all(self, filename, image):
+        try:
+            if image is None:
+                source = safe_join(self.source_dir, filename)
+                image = cv2.imread(source) if source is not None else None
+                if image is None:
+                    raise IOError(f'無法讀取 {filename}')
+            for size in self.sizes:
+                target = self.path(filename, size)
+                if target is not None:
+                    self._write(image, target, size)
+            with self._lock:
+                self._stats['generated'] += 1
+        except Exception as e:
+            with self._lock:
+                self._stats['failed'] += 1
+            self.logger.warning(f"產生縮圖失敗（{filename}）: {e}")
+
+    def _write(self, image, target, size):
+        """縮小並寫入縮圖（先寫暫存檔再替換，同時要求的請求不會讀到寫到一半的檔案）"""
+        height, width = image.shape[:2]
+        if width > size:
+            image = cv2.resize(image, (size, max(1, round(height * size / width))), interpolation=cv2.INTER_AREA)
+        ok, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            return False
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp_file = f'{target}.{threading.get_ident()}.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(buffer.tobytes())
+        os.replace(tmp_file, target)
+        return True